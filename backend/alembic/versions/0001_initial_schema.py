@@ -0,0 +1,140 @@
+"""initial schema
+
+The tables as the application created them with Base.metadata.create_all.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+booking_status = sa.Enum('PENDING', 'CONFIRMED', 'COMPLETED', 'CANCELLED', name='bookingstatus')
+
+
+def upgrade() -> None:
+    op.create_table('puja_types',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name_local', sa.String(length=255), nullable=False),
+    sa.Column('name_en', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('detailed_description', sa.Text(), nullable=True),
+    sa.Column('benefits', sa.Text(), nullable=True),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('min_price', sa.Float(), nullable=False),
+    sa.Column('max_price', sa.Float(), nullable=True),
+    sa.Column('default_price', sa.Float(), nullable=False),
+    sa.Column('is_virtual', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=15), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('USER', 'PANDIT', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('city', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_phone'), 'users', ['phone'], unique=True)
+    op.create_table('pandits',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=False),
+    sa.Column('photo_url', sa.String(length=500), nullable=True),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('approved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('virtual_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('stream_url', sa.String(length=500), nullable=False),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+    sa.Column('puja_type_id', sa.UUID(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['puja_type_id'], ['puja_types.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('bookings',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('pandit_id', sa.UUID(), nullable=True),
+    sa.Column('puja_type_id', sa.UUID(), nullable=False),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('stream_url', sa.String(length=500), nullable=True),
+    sa.Column('status', booking_status, nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['pandit_id'], ['pandits.id'], ),
+    sa.ForeignKeyConstraint(['puja_type_id'], ['puja_types.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('consultations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('pandit_id', sa.UUID(), nullable=False),
+    sa.Column('consultation_date', sa.DateTime(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    # bookingstatus already exists, created with the bookings table
+    sa.Column('status', booking_status.with_variant(
+        postgresql.ENUM(name='bookingstatus', create_type=False), 'postgresql'
+    ), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['pandit_id'], ['pandits.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('payments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('provider', sa.String(length=50), nullable=False),
+    sa.Column('provider_payment_id', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'SUCCESS', 'FAILED', 'REFUNDED', name='paymentstatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('booking_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('payments')
+    op.drop_table('consultations')
+    op.drop_table('bookings')
+    op.drop_table('virtual_sessions')
+    op.drop_table('pandits')
+    op.drop_index(op.f('ix_users_phone'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('puja_types')
+    bind = op.get_bind()
+    for enum_name in ('paymentstatus', 'bookingstatus', 'userrole'):
+        sa.Enum(name=enum_name).drop(bind, checkfirst=True)
@@ -0,0 +1,39 @@
+"""query indexes
+
+Composite indexes for the hot list queries: a user's bookings newest first,
+a pandit's schedule, bookings by status, a pandit's consultations, and
+payment lookups by provider id. benchmarks/explain_indexes.py checks that
+the planner picks them up.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_pandit_id_scheduled_at', 'bookings', ['pandit_id', 'scheduled_at'], unique=False)
+    op.create_index('ix_bookings_status_scheduled_at', 'bookings', ['status', 'scheduled_at'], unique=False)
+    op.create_index('ix_bookings_user_id_created_at', 'bookings', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_consultations_pandit_id_consultation_date', 'consultations', ['pandit_id', 'consultation_date'], unique=False)
+    op.create_index(op.f('ix_pandits_approved'), 'pandits', ['approved'], unique=False)
+    op.create_index(op.f('ix_payments_provider_payment_id'), 'payments', ['provider_payment_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payments_provider_payment_id'), table_name='payments')
+    op.drop_index(op.f('ix_pandits_approved'), table_name='pandits')
+    op.drop_index('ix_consultations_pandit_id_consultation_date', table_name='consultations')
+    op.drop_index('ix_bookings_user_id_created_at', table_name='bookings')
+    op.drop_index('ix_bookings_status_scheduled_at', table_name='bookings')
+    op.drop_index('ix_bookings_pandit_id_scheduled_at', table_name='bookings')
@@ -0,0 +1,46 @@
+"""keyset pagination indexes
+
+List endpoints page newest first on (created_at, id), so created_at becomes
+NOT NULL (rows without one are backfilled) and each list query gets an
+index whose trailing columns are (created_at, id). The approved pandit list
+filters on approved first, which makes the old single-column index redundant.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+PAGED_TABLES = ('users', 'pandits', 'bookings')
+
+
+def upgrade() -> None:
+    for table in PAGED_TABLES:
+        op.execute(f"UPDATE {table} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.drop_index('ix_pandits_approved', table_name='pandits')
+    op.create_index('ix_pandits_approved_created_at_id', 'pandits', ['approved', 'created_at', 'id'], unique=False)
+    op.create_index('ix_bookings_created_at_id', 'bookings', ['created_at', 'id'], unique=False)
+    op.create_index('ix_bookings_pandit_id_created_at_id', 'bookings', ['pandit_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_pandit_id_created_at_id', table_name='bookings')
+    op.drop_index('ix_bookings_created_at_id', table_name='bookings')
+    op.drop_index('ix_pandits_approved_created_at_id', table_name='pandits')
+    op.create_index('ix_pandits_approved', 'pandits', ['approved'], unique=False)
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    for table in PAGED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,51 @@
+"""admin counters
+
+Single-row table of the admin dashboard totals, kept up to date by
+app.counters on every write. Seeded here from the current tables.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('admin_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('total_pandits', sa.Integer(), nullable=False),
+    sa.Column('total_bookings', sa.Integer(), nullable=False),
+    sa.Column('total_revenue', sa.Float(), nullable=False),
+    sa.Column('pending_approvals', sa.Integer(), nullable=False),
+    sa.Column('active_virtual_sessions', sa.Integer(), nullable=False),
+    sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""
+        INSERT INTO admin_counters (
+            id, total_users, total_pandits, total_bookings, total_revenue,
+            pending_approvals, active_virtual_sessions, reconciled_at
+        )
+        SELECT 1,
+            (SELECT count(*) FROM users WHERE role = 'USER'),
+            (SELECT count(*) FROM pandits),
+            (SELECT count(*) FROM bookings),
+            (SELECT coalesce(sum(amount), 0) FROM payments WHERE status = 'SUCCESS'),
+            (SELECT count(*) FROM pandits WHERE approved = false),
+            (SELECT count(*) FROM virtual_sessions WHERE is_active = true),
+            CURRENT_TIMESTAMP
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('admin_counters')
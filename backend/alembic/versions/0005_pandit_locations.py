@@ -0,0 +1,45 @@
+"""pandit locations
+
+Latitude/longitude on pandit profiles for the nearby-pandits search.
+Existing pandits are placed at their city's centroid from the bundled
+gazetteer (app/data/cities.json); cities it does not list stay empty.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.gazetteer import gazetteer
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('pandits', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('pandits', sa.Column('longitude', sa.Float(), nullable=True))
+    places = list(gazetteer.entries())
+    # The city of that name in the pandit's own state first...
+    for city, state, (lat, lng) in places:
+        op.execute(sa.text(
+            "UPDATE pandits SET latitude = :lat, longitude = :lng "
+            "WHERE latitude IS NULL AND lower(city) = :city AND lower(state) = :state"
+        ).bindparams(lat=lat, lng=lng, city=city, state=state))
+    # ...then the first city of that name anywhere
+    for city, _, (lat, lng) in places:
+        op.execute(sa.text(
+            "UPDATE pandits SET latitude = :lat, longitude = :lng "
+            "WHERE latitude IS NULL AND lower(city) = :city"
+        ).bindparams(lat=lat, lng=lng, city=city))
+
+
+def downgrade() -> None:
+    op.drop_column('pandits', 'longitude')
+    op.drop_column('pandits', 'latitude')
@@ -0,0 +1,48 @@
+"""pandit availability
+
+Weekly working hours and blocked dates per pandit, read by app.availability
+to check bookings and consultations for conflicts and to list free slots.
+Pandits without working hours use DEFAULT_WORKING_HOURS.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pandit_working_hours',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('pandit_id', sa.UUID(), nullable=False),
+    sa.Column('weekday', sa.SmallInteger(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.ForeignKeyConstraint(['pandit_id'], ['pandits.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pandit_working_hours_pandit_id'), 'pandit_working_hours', ['pandit_id'], unique=False)
+    op.create_table('pandit_blocked_dates',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('pandit_id', sa.UUID(), nullable=False),
+    sa.Column('blocked_on', sa.Date(), nullable=False),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['pandit_id'], ['pandits.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('pandit_id', 'blocked_on', name='uq_pandit_blocked_dates_pandit_id_blocked_on')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pandit_blocked_dates')
+    op.drop_index(op.f('ix_pandit_working_hours_pandit_id'), table_name='pandit_working_hours')
+    op.drop_table('pandit_working_hours')
@@ -0,0 +1,37 @@
+"""user token version
+
+users.token_version, bumped when a user's role changes so access tokens
+carrying the old role are refused. Databases created before migrations
+existed (stamped at 0001) get the column here; existing rows start at 0.
+Databases whose 0001 already created it only gain the server default.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def _has_token_version() -> bool:
+    columns = sa.inspect(op.get_bind()).get_columns('users')
+    return any(column['name'] == 'token_version' for column in columns)
+
+
+def upgrade() -> None:
+    if _has_token_version():
+        op.alter_column('users', 'token_version', server_default='0')
+    else:
+        op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,52 @@
+"""admin counter shards
+
+Spreads the admin dashboard totals over rows 1-16 so concurrent writers
+bump different rows instead of all queueing on row 1's lock; the existing
+totals stay on row 1 and the new shards start at zero. Row 0 holds no
+counts and is what reconciliation locks.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# app.counters.COUNTERS_SHARDS
+SHARDS = 16
+
+
+def upgrade() -> None:
+    op.execute(sa.text("""
+        INSERT INTO admin_counters (
+            id, total_users, total_pandits, total_bookings, total_revenue,
+            pending_approvals, active_virtual_sessions
+        )
+        SELECT ids.id, 0, 0, 0, 0, 0, 0
+        FROM (SELECT 0 AS id UNION ALL {shards}) AS ids
+        WHERE ids.id NOT IN (SELECT id FROM admin_counters)
+    """.format(shards=" UNION ALL ".join(f"SELECT {shard}" for shard in range(1, SHARDS + 1)))))
+    op.execute("UPDATE admin_counters SET reconciled_at = (SELECT reconciled_at FROM admin_counters WHERE id = 1) WHERE id = 0")
+
+
+def downgrade() -> None:
+    # Fold the shards back into row 1
+    op.execute("""
+        UPDATE admin_counters SET
+            total_users = (SELECT sum(total_users) FROM admin_counters),
+            total_pandits = (SELECT sum(total_pandits) FROM admin_counters),
+            total_bookings = (SELECT sum(total_bookings) FROM admin_counters),
+            total_revenue = (SELECT sum(total_revenue) FROM admin_counters),
+            pending_approvals = (SELECT sum(pending_approvals) FROM admin_counters),
+            active_virtual_sessions = (SELECT sum(active_virtual_sessions) FROM admin_counters)
+        WHERE id = 1
+    """)
+    op.execute("DELETE FROM admin_counters WHERE id <> 1")
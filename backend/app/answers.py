@@ -0,0 +1,57 @@
+import os
+import threading
+from typing import Hashable, Optional
+
+from .cache import TTLCache
+from .catalog import CATALOG_TTL_SECONDS, puja_catalog
+from .intents import matcher as intent_matcher
+from .search import tokenize
+
+CHATBOT_CACHE_MAX_SIZE = int(os.getenv("CHATBOT_CACHE_MAX_SIZE", "10000"))
+
+
+def question_key(question: str) -> str:
+    """Normalized question: case-folded words without punctuation or stopwords, sorted"""
+    return " ".join(sorted(tokenize(question)))
+
+
+def answers_version() -> Hashable:
+    """What cached replies were built from: the catalog and the intent table"""
+    intent_matcher.reload_if_changed()
+    return puja_catalog.version, intent_matcher.version
+
+
+class AnswerCache:
+    """LRU cache of chatbot replies by normalized question.
+
+    Emptied when the catalog version or intent table changes; entries also
+    expire after CATALOG_TTL_SECONDS, for changes made in other workers.
+    """
+
+    def __init__(self, maxsize: int = CHATBOT_CACHE_MAX_SIZE, ttl: float = CATALOG_TTL_SECONDS):
+        self._replies = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version: Hashable = None
+        self._lock = threading.Lock()
+
+    def _sync(self, version: Hashable) -> None:
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._replies.clear()
+                    self._version = version
+
+    def get(self, question: str) -> Optional[dict]:
+        self._sync(answers_version())
+        return self._replies.get(question_key(question))
+
+    def set(self, question: str, reply: dict, version: Hashable) -> None:
+        """Cache a reply built at version, unless the catalog has moved on since"""
+        self._sync(answers_version())
+        if version == self._version:
+            self._replies.set(question_key(question), reply)
+
+    def stats(self) -> dict:
+        return self._replies.stats()
+
+
+answer_cache = AnswerCache()
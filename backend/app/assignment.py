@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import models
+from .availability import DEFAULT_DURATION_MINUTES, PanditCalendar, booking_interval, load_calendars
+from .database import SessionLocal
+from .gazetteer import gazetteer
+
+logger = logging.getLogger(__name__)
+
+# How often unassigned bookings are matched to pandits (seconds, 0 disables)
+AUTO_ASSIGN_SECONDS = float(os.getenv("AUTO_ASSIGN_SECONDS", "0"))
+# Assignments written back per transaction
+AUTO_ASSIGN_BATCH_SIZE = int(os.getenv("AUTO_ASSIGN_BATCH_SIZE", "500"))
+
+# Cost of one more engagement already on a pandit's calendar...
+LOAD_COST = 1.0
+# ...of a pandit who has never been booked for the puja type...
+UNFAMILIAR_COST = 2.0
+# ...and of a pandit in another city (virtual pujas only; in person they must match)
+OTHER_CITY_COST = 0.5
+# Marks pairs that cannot be assigned; far above any real cost
+_INFEASIBLE = 1e9
+
+
+def min_cost_assignment(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """(row, column) pairs of a minimum-cost matching covering the smaller side.
+
+    The Hungarian method with potentials (shortest augmenting paths), one row
+    at a time, each step scanning the columns with numpy: O(n² m) for n ≤ m.
+    """
+    if cost.shape[0] > cost.shape[1]:
+        return sorted((row, column) for column, row in min_cost_assignment(cost.T))
+    n, m = cost.shape
+    if n == 0:
+        return []
+    # 1-based as in the textbook formulation: column 0 is the row being placed
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for row in range(1, n + 1):
+        row_of[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while row_of[column] != 0:
+            used[column] = True
+            current = row_of[column]
+            free = ~used
+            free[0] = False
+            slack = cost[current - 1] - u[current] - v[1:]
+            better = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_slack, np.inf)
+            following = int(np.argmin(candidates))
+            delta = candidates[following]
+            # Rows on the tree are distinct, so the fancy-index += is safe
+            u[row_of[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            column = following
+        # Flip the augmenting path back to the root
+        while column:
+            previous = way[column]
+            row_of[column] = row_of[previous]
+            column = previous
+    return sorted((int(row_of[column]) - 1, column - 1) for column in range(1, m + 1) if row_of[column])
+
+
+def city_key(city: Optional[str], state: Optional[str] = None) -> Optional[Hashable]:
+    """What two cities must share to count as one: the gazetteer centroid, or the folded name"""
+    if not city or not city.strip():
+        return None
+    return gazetteer.locate(city, state) or " ".join(city.casefold().split())
+
+
+@dataclass(frozen=True)
+class PendingBooking:
+    id: UUID
+    puja_type_id: UUID
+    start: datetime
+    end: datetime
+    city: Optional[Hashable]  # the devotee's city_key()
+    is_virtual: bool
+
+
+def plan_assignments(
+    bookings: Iterable[PendingBooking],
+    pandits: Dict[UUID, Optional[Hashable]],
+    calendars: Dict[UUID, PanditCalendar],
+    experience: Set[Tuple[UUID, UUID]]
+) -> List[Tuple[PendingBooking, UUID]]:
+    """Match bookings to pandits (id -> city_key) who are free for them.
+
+    Bookings are grouped by day and, in person, by city; the groups are
+    independent except through the pandits' calendars. Within a group each
+    round solves a min-cost matching, so a pandit takes at most one booking
+    per round; the accepted ones are added to the calendars and rounds
+    repeat until none is placed. Costs are load (engagements on the
+    calendar), unfamiliarity with the puja type and, for virtual pujas,
+    being in another city. Calendars are updated in place.
+    """
+    bookings = list(bookings)
+    everyone = sorted(pandits)
+    load = np.array([len(calendars[pandit_id].busy) for pandit_id in everyone], dtype=float)
+    # Cities and puja types as small integers, so costs are computed a group at a time
+    city_ids: Dict[Optional[Hashable], int] = {None: -1}
+    pandit_city = np.array([city_ids.setdefault(pandits[pandit_id], len(city_ids)) for pandit_id in everyone])
+    type_ids = {puja_type_id: index for index, puja_type_id in enumerate({b.puja_type_id for b in bookings})}
+    familiar = np.zeros((len(type_ids), len(everyone)), dtype=bool)
+    column_of = {pandit_id: column for column, pandit_id in enumerate(everyone)}
+    for pandit_id, puja_type_id in experience:
+        if pandit_id in column_of and puja_type_id in type_ids:
+            familiar[type_ids[puja_type_id], column_of[pandit_id]] = True
+    by_city: Dict[int, List[int]] = defaultdict(list)
+    for column, city in enumerate(pandit_city):
+        by_city[city].append(column)
+
+    groups: Dict[Tuple[bool, int, date], List[PendingBooking]] = defaultdict(list)
+    for booking in bookings:
+        city = city_ids.get(booking.city, -1)
+        groups[booking.is_virtual, -1 if booking.is_virtual else city, booking.start.date()].append(booking)
+
+    planned = []
+    for (is_virtual, city, _), group in sorted(groups.items()):
+        if is_virtual:
+            columns = np.arange(len(everyone))
+        else:
+            columns = np.array(by_city.get(city, []) if city >= 0 else [], dtype=int)
+        remaining = sorted(group, key=lambda booking: (booking.start, str(booking.id)))
+        while remaining and len(columns):
+            rows = len(remaining)
+            types = np.array([type_ids[booking.puja_type_id] for booking in remaining])
+            base = LOAD_COST * load[columns] + UNFAMILIAR_COST * ~familiar[types][:, columns]
+            if is_virtual:
+                cities = np.array([city_ids.get(booking.city, -1) for booking in remaining])
+                base += OTHER_CITY_COST * (pandit_city[columns][None, :] != cities[:, None])
+            # Each booking only needs its `rows` cheapest free pandits: in an optimal
+            # matching a booking using any other could swap to one the rest leave free
+            cost = np.full(base.shape, _INFEASIBLE)
+            for row, order in enumerate(np.argsort(base, axis=1, kind="stable")):
+                booking = remaining[row]
+                found = 0
+                for position in order:
+                    if calendars[everyone[columns[position]]].conflict(booking.start, booking.end) is None:
+                        cost[row, position] = base[row, position]
+                        found += 1
+                        if found == rows:
+                            break
+            kept = np.flatnonzero((cost < _INFEASIBLE).any(axis=0))
+            placed = set()
+            for row, position in min_cost_assignment(cost[:, kept]):
+                if cost[row, kept[position]] >= _INFEASIBLE:
+                    continue
+                booking, column = remaining[row], columns[kept[position]]
+                calendars[everyone[column]].busy.add(booking.start, booking.end, booking.id)
+                load[column] += 1
+                planned.append((booking, everyone[column]))
+                placed.add(row)
+            if not placed:
+                break
+            remaining = [booking for row, booking in enumerate(remaining) if row not in placed]
+    return planned
+
+
+def _pending_bookings(db: Session) -> List[PendingBooking]:
+    rows = db.execute(
+        select(
+            models.Booking.id, models.Booking.puja_type_id, models.Booking.scheduled_at, models.PujaType.is_virtual,
+            func.coalesce(models.PujaType.duration_minutes, DEFAULT_DURATION_MINUTES),
+            models.User.city, models.User.state
+        )
+        .join(models.PujaType, models.Booking.puja_type_id == models.PujaType.id)
+        .join(models.User, models.Booking.user_id == models.User.id)
+        .where(
+            models.Booking.pandit_id.is_(None),
+            models.Booking.status == models.BookingStatus.PENDING,
+            models.Booking.scheduled_at > datetime.utcnow(),
+        )
+        .order_by(models.Booking.scheduled_at, models.Booking.id)
+    )
+    return [
+        PendingBooking(booking_id, puja_type_id, *booking_interval(scheduled_at, minutes), city_key(city, state), bool(is_virtual))
+        for booking_id, puja_type_id, scheduled_at, is_virtual, minutes, city, state in rows
+    ]
+
+
+def _write_batch(db: Session, batch: List[Tuple[PendingBooking, UUID]]) -> int:
+    """Write one batch of assignments in one transaction; returns how many still held.
+
+    The pandits are locked as reserve() locks them and their calendars
+    reloaded, so bookings made since the plan are respected; bookings that
+    were assigned or cancelled meanwhile (or are locked by a request
+    changing them) are left alone.
+    """
+    pandit_ids = sorted({pandit_id for _, pandit_id in batch})
+    db.execute(
+        select(models.Pandit.id).where(models.Pandit.id.in_(pandit_ids)).order_by(models.Pandit.id).with_for_update()
+    )
+    still_pending = set(db.scalars(
+        select(models.Booking.id)
+        .where(
+            models.Booking.id.in_([booking.id for booking, _ in batch]),
+            models.Booking.pandit_id.is_(None),
+            models.Booking.status == models.BookingStatus.PENDING,
+        )
+        .with_for_update(skip_locked=True)
+    ))
+    calendars = load_calendars(
+        db, pandit_ids, min(booking.start for booking, _ in batch), max(booking.end for booking, _ in batch)
+    )
+    assignments = []
+    for booking, pandit_id in batch:
+        calendar = calendars[pandit_id]
+        if booking.id in still_pending and calendar.conflict(booking.start, booking.end) is None:
+            calendar.busy.add(booking.start, booking.end, booking.id)
+            assignments.append({"id": booking.id, "pandit_id": pandit_id})
+    if assignments:
+        db.execute(update(models.Booking), assignments)
+    db.commit()
+    return len(assignments)
+
+
+def auto_assign(db: Session, batch_size: int = AUTO_ASSIGN_BATCH_SIZE) -> dict:
+    """Assign approved pandits to the pending bookings that have none; returns a report with timings"""
+    started = time.perf_counter()
+    bookings = _pending_bookings(db)
+    pandits = {
+        pandit_id: city_key(city, state)
+        for pandit_id, city, state in db.execute(
+            select(models.Pandit.id, models.Pandit.city, models.Pandit.state).where(models.Pandit.approved == True)
+        )
+    }
+    calendars, experience = {}, set()
+    if bookings and pandits:
+        calendars = load_calendars(
+            db, list(pandits), min(booking.start for booking in bookings), max(booking.end for booking in bookings)
+        )
+        experience = set(db.execute(
+            select(models.Booking.pandit_id, models.Booking.puja_type_id)
+            .where(models.Booking.pandit_id.is_not(None), models.Booking.status != models.BookingStatus.CANCELLED)
+            .distinct()
+        ))
+    # Reading is done: release the snapshot before the (longer) planning step
+    db.rollback()
+    loaded = time.perf_counter()
+
+    planned = plan_assignments(bookings, pandits, calendars, experience)
+    solved = time.perf_counter()
+
+    assigned = 0
+    batches = 0
+    for offset in range(0, len(planned), batch_size):
+        assigned += _write_batch(db, planned[offset:offset + batch_size])
+        batches += 1
+    written = time.perf_counter()
+
+    return {
+        "pending": len(bookings),
+        "pandits": len(pandits),
+        "assigned": assigned,
+        # Planned, but booked, assigned or cancelled by someone else before the write
+        "conflicts": len(planned) - assigned,
+        "batches": batches,
+        "load_ms": (loaded - started) * 1000,
+        "plan_ms": (solved - loaded) * 1000,
+        "write_ms": (written - solved) * 1000,
+    }
+
+
+def _assign_in_new_session() -> dict:
+    db = SessionLocal()
+    try:
+        return auto_assign(db)
+    finally:
+        db.close()
+
+
+async def assign_periodically(interval: float = AUTO_ASSIGN_SECONDS) -> None:
+    """Background task: assign pandits to unassigned bookings every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            report = await run_in_threadpool(_assign_in_new_session)
+        except Exception:
+            logger.exception("Booking auto-assignment failed")
+            continue
+        if report["pending"]:
+            logger.info("Booking auto-assignment: %s", report)
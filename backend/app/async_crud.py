@@ -0,0 +1,113 @@
+from sqlalchemy import select
+from sqlalchemy.orm import undefer_group
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Set, Tuple
+from uuid import UUID
+from . import models, schemas
+from .counters import admin_stats_query, as_stats, counters_query
+from .crud import PANDIT_LOADERS, select_bookings, select_pandits
+from .pagination import PageParams, keyset, page_of
+
+# Async counterparts of the hot read paths in crud.py. Relationships that the
+# response models serialize are loaded eagerly with the same loader options,
+# since lazy loads cannot run on an AsyncSession.
+
+
+# Puja Types
+async def get_all_puja_types(db: AsyncSession, with_details: bool = False) -> List[models.PujaType]:
+    """Get all puja types, loading the deferred long texts only if asked to"""
+    query = select(models.PujaType)
+    if with_details:
+        query = query.options(undefer_group("details"))
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def get_puja_type_by_id(db: AsyncSession, puja_id: UUID) -> Optional[models.PujaType]:
+    """Get puja type by ID, including its detailed description and benefits"""
+    result = await db.execute(
+        select(models.PujaType)
+        .options(undefer_group("details"))
+        .where(models.PujaType.id == puja_id)
+    )
+    return result.scalars().first()
+
+
+# Pandits
+async def get_all_pandits(
+    db: AsyncSession,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.PanditFilters] = None,
+    approved_only: bool = False
+) -> dict:
+    """Get a page of pandits with their user rows, newest first"""
+    result = await db.execute(keyset(select_pandits(filters, approved_only), models.Pandit, page))
+    return page_of(result.scalars().all(), page)
+
+
+async def get_approved_pandits(db: AsyncSession) -> List[models.Pandit]:
+    """Get every approved pandit with its user row"""
+    result = await db.execute(select_pandits(None, approved_only=True))
+    return result.scalars().all()
+
+
+async def get_pandit_locations(db: AsyncSession) -> List[Tuple[UUID, float, float]]:
+    """(id, latitude, longitude) of every approved pandit with a known location"""
+    result = await db.execute(
+        select(models.Pandit.id, models.Pandit.latitude, models.Pandit.longitude)
+        .where(models.Pandit.approved == True, models.Pandit.latitude.is_not(None), models.Pandit.longitude.is_not(None))
+    )
+    return result.all()
+
+
+async def get_pandits_by_ids(db: AsyncSession, pandit_ids: List[UUID]) -> List[models.Pandit]:
+    """Get pandits (with their user rows) by ID, in no particular order"""
+    if not pandit_ids:
+        return []
+    result = await db.execute(select(models.Pandit).options(*PANDIT_LOADERS).where(models.Pandit.id.in_(pandit_ids)))
+    return result.scalars().all()
+
+
+async def get_pandit_ids_for_puja_type(db: AsyncSession, puja_type_id: UUID) -> Set[UUID]:
+    """Pandits who have been booked (bookings cancelled excepted) for a puja type"""
+    result = await db.execute(
+        select(models.Booking.pandit_id).distinct()
+        .where(
+            models.Booking.puja_type_id == puja_type_id,
+            models.Booking.pandit_id.is_not(None),
+            models.Booking.status != models.BookingStatus.CANCELLED,
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def get_pandit_by_id(db: AsyncSession, pandit_id: UUID) -> Optional[models.Pandit]:
+    """Get pandit by ID with its user row"""
+    result = await db.execute(
+        select(models.Pandit)
+        .options(*PANDIT_LOADERS)
+        .where(models.Pandit.id == pandit_id)
+    )
+    return result.scalars().first()
+
+
+# Bookings
+async def get_user_bookings(
+    db: AsyncSession,
+    user_id: UUID,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.BookingFilters] = None
+) -> dict:
+    """Get a page of a user's bookings, newest first"""
+    result = await db.execute(keyset(select_bookings(filters, user_id=user_id), models.Booking, page))
+    return page_of(result.scalars().all(), page)
+
+
+# Admin Stats
+async def get_admin_stats(db: AsyncSession) -> dict:
+    """Get admin dashboard statistics from the maintained counters"""
+    counters = (await db.execute(counters_query())).one_or_none()
+    if counters is None:
+        # Not reconciled yet: count the source tables instead
+        return as_stats((await db.execute(admin_stats_query())).one())
+    return as_stats(counters)
@@ -1,14 +1,18 @@
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
 from . import models, schemas
+from .cache import TTLCache
 from .database import get_db
+from .hashing import get_password_hash, verify_password, verify_password_async
 
 load_dotenv()
 
@@ -17,31 +21,102 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
 
 # Security scheme
 security = HTTPBearer()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    # Truncate password to 72 bytes for bcrypt compatibility
-    password_bytes = plain_password.encode('utf-8')[:72]
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the user fields request handlers read"""
+    id: UUID
+    name: str
+    phone: str
+    email: Optional[str]
+    role: models.UserRole
+    city: Optional[str]
+    state: Optional[str]
+    created_at: Optional[datetime]
+    token_version: int = 0
 
+    @classmethod
+    def from_model(cls, user: models.User) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            phone=user.phone,
+            email=user.email,
+            role=user.role,
+            city=user.city,
+            state=user.state,
+            created_at=user.created_at,
+            token_version=user.token_version or 0,
+        )
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Identity and role carried as signed claims in an access token"""
+    id: UUID
+    phone: str
+    role: models.UserRole
+    token_version: int = 0
+
+
+# Authenticated users keyed by token subject (phone). Entries are per process,
+# so a role change made by another worker is picked up within the TTL.
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+# Lowest token version still accepted per phone, as far as this process knows.
+# Raised when a role change bumps users.token_version so stale claims are refused.
+_min_token_versions = {}
+
+
+def invalidate_cached_user(phone: str, token_version: Optional[int] = None) -> None:
+    """Forget a cached user, e.g. after their role changes.
+
+    Passing the user's new token_version also rejects access tokens issued
+    before it.
+    """
+    user_cache.pop(phone)
+    if token_version:
+        _note_token_version(phone, token_version)
+
+
+def _note_token_version(phone: str, token_version: int) -> None:
+    if token_version > _min_token_versions.get(phone, 0):
+        _min_token_versions[phone] = token_version
+
+
+def _reject_stale_token(token_version: int, current_version: int) -> None:
+    if token_version < current_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked, please sign in again",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    # Truncate password to 72 bytes for bcrypt compatibility
-    password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
 
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    user: Optional[models.User] = None
+) -> str:
+    """Create JWT access token.
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+    When user is given its id, role and token version are embedded as claims,
+    letting get_current_claims authorize without a database lookup.
+    """
     to_encode = data.copy()
+    if user is not None:
+        to_encode.update({
+            "uid": str(user.id),
+            "role": user.role.value,
+            "ver": user.token_version or 0,
+        })
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -79,11 +154,27 @@ def verify_token(token: str, token_type: str = "access") -> dict:
         )
 
 
+def _cached_user(db: Session, phone: str) -> AuthenticatedUser:
+    """The user row from the user cache, loading it on a miss"""
+    user = user_cache.get(phone)
+    if user is None:
+        db_user = db.query(models.User).filter(models.User.phone == phone).first()
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        user = AuthenticatedUser.from_model(db_user)
+        user_cache.set(phone, user)
+        _note_token_version(phone, user.token_version)
+    return user
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> models.User:
-    """Get current authenticated user"""
+) -> AuthenticatedUser:
+    """Get current authenticated user (served from the user cache when possible)"""
     token = credentials.credentials
     payload = verify_token(token, "access")
     
@@ -94,17 +185,102 @@ def get_current_user(
             detail="Could not validate credentials"
         )
     
-    user = db.query(models.User).filter(models.User.phone == phone).first()
-    if user is None:
+    user = _cached_user(db, phone)
+    
+    # Tokens without a version predate claims; their role comes from the row anyway
+    _reject_stale_token(payload.get("ver", user.token_version), user.token_version)
+    
+    return user
+
+
+def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """Get identity and role from the token's signed claims.
+
+    Tokens issued without claims fall back to get_current_user. Admin and
+    pandit claims are checked against the cached user row, so a revoked or
+    demoted account loses its role on every worker within the cache TTL;
+    plain user claims need no lookup.
+    """
+    payload = verify_token(credentials.credentials, "access")
+    
+    phone: str = payload.get("sub")
+    if phone is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
+            detail="Could not validate credentials"
         )
     
-    return user
+    if "uid" not in payload or "role" not in payload:
+        user = get_current_user(credentials, db)
+        return TokenClaims(
+            id=user.id,
+            phone=user.phone,
+            role=user.role,
+            token_version=user.token_version
+        )
+    
+    token_version = payload.get("ver", 0)
+    _reject_stale_token(token_version, _min_token_versions.get(phone, 0))
+    try:
+        claims = TokenClaims(
+            id=UUID(payload["uid"]),
+            phone=phone,
+            role=models.UserRole(payload["role"]),
+            token_version=token_version
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    if claims.role != models.UserRole.USER:
+        claims = _check_role_claim(claims, db)
+    return claims
+
+
+def _check_role_claim(claims: TokenClaims, db: Session) -> TokenClaims:
+    """Refuse a role claim the user's row has since moved past.
+
+    _min_token_versions only knows about role changes made by this process;
+    the row (cached for USER_CACHE_TTL_SECONDS) carries those made by any
+    worker, so an approval or revocation holds everywhere within the TTL.
+    A role changed on the row without a version bump replaces the claimed one.
+    """
+    user = _cached_user(db, claims.phone)
+    _reject_stale_token(claims.token_version, user.token_version)
+    if user.role != claims.role:
+        claims = replace(claims, role=user.role)
+    return claims
+
+
+def get_admin_claims(
+    claims: TokenClaims = Depends(get_current_claims)
+) -> TokenClaims:
+    """Verify the token belongs to an admin (get_current_claims checked it against the row)"""
+    if claims.role != models.UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return claims
 
 
-def get_current_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+def get_pandit_claims(
+    claims: TokenClaims = Depends(get_current_claims)
+) -> TokenClaims:
+    """Verify the token belongs to a pandit (get_current_claims checked it against the row)"""
+    if claims.role != models.UserRole.PANDIT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a pandit account"
+        )
+    return claims
+
+
+def get_current_admin(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     """Verify current user is an admin"""
     if current_user.role != models.UserRole.ADMIN:
         raise HTTPException(
@@ -114,7 +290,7 @@ def get_current_admin(current_user: models.User = Depends(get_current_user)) ->
     return current_user
 
 
-def get_current_pandit(current_user: models.User = Depends(get_current_user)) -> models.User:
+def get_current_pandit(current_user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     """Verify current user is a pandit"""
     if current_user.role != models.UserRole.PANDIT:
         raise HTTPException(
@@ -132,3 +308,15 @@ def authenticate_user(db: Session, phone: str, password: str) -> Optional[models
     if not verify_password(password, user.hashed_password):
         return None
     return user
+
+
+async def authenticate_user_async(db: Session, phone: str, password: str) -> Optional[models.User]:
+    """Authenticate user with phone and password, checking the hash on the hashing pool"""
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.phone == phone).first()
+    )
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
@@ -0,0 +1,275 @@
+import os
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Length of a booking whose puja type does not say how long it takes
+DEFAULT_DURATION_MINUTES = int(os.getenv("DEFAULT_DURATION_MINUTES", "120"))
+CONSULTATION_MINUTES = int(os.getenv("CONSULTATION_MINUTES", "30"))
+# Every day's working hours for pandits who have not set their own
+DEFAULT_WORKING_HOURS = os.getenv("DEFAULT_WORKING_HOURS", "06:00-21:00")
+# Longest date range the free-slots endpoint covers
+MAX_RANGE_DAYS = 31
+
+# No booking is longer than this, so one starting this long before a window cannot reach into it
+_LOOKBACK = timedelta(days=1)
+
+
+def _parse_hours(text: str) -> Tuple[time, time]:
+    start, end = (time.fromisoformat(part.strip()) for part in text.split("-"))
+    return start, end
+
+
+_DEFAULT_WINDOW = _parse_hours(DEFAULT_WORKING_HOURS)
+
+
+class _Node:
+    __slots__ = ("start", "end", "item", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, item, priority: float):
+        self.start = start
+        self.end = end
+        self.item = item
+        self.priority = priority
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+class IntervalTree:
+    """Half-open intervals [start, end) in a treap ordered by start.
+
+    Each node also holds the latest end in its subtree, so a search skips
+    every subtree ending before the query starts: finding whether anything
+    overlaps takes O(log n) expected time, listing k overlaps O(log n + k).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]] = (), seed: int = 0):
+        self._root: Optional[_Node] = None
+        self._size = 0
+        self._random = random.Random(seed)
+        for start, end, item in intervals:
+            self.add(start, end, item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, start, end, item=None) -> None:
+        self._root = self._insert(self._root, _Node(start, end, item, self._random.random()))
+        self._size += 1
+
+    def _insert(self, root: Optional[_Node], node: _Node) -> _Node:
+        if root is None:
+            return node
+        if node.priority > root.priority:
+            node.left, node.right = self._split(root, node.start)
+            _update(node)
+            return node
+        if node.start < root.start:
+            root.left = self._insert(root.left, node)
+        else:
+            root.right = self._insert(root.right, node)
+        _update(root)
+        return root
+
+    def _split(self, node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+        """Nodes starting before key, and the rest"""
+        if node is None:
+            return None, None
+        if node.start < key:
+            node.right, rest = self._split(node.right, key)
+            _update(node)
+            return node, rest
+        before, node.left = self._split(node.left, key)
+        _update(node)
+        return before, node
+
+    def overlaps(self, start, end) -> bool:
+        """Whether any interval overlaps [start, end)"""
+        node = self._root
+        while node is not None:
+            if node.start < end and node.end > start:
+                return True
+            # If the left subtree reaches past start but holds no overlap,
+            # its late-ending interval starts at or after end, and so does
+            # everything to the right
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            else:
+                node = node.right
+        return False
+
+    def overlapping(self, start, end) -> List[Tuple[Any, Any, Any]]:
+        """(start, end, item) of every interval overlapping [start, end), by start"""
+        found: List[Tuple[Any, Any, Any]] = []
+        self._collect(self._root, start, end, found)
+        return found
+
+    def _collect(self, node: Optional[_Node], start, end, found: list) -> None:
+        if node is None or node.max_end <= start:
+            return
+        self._collect(node.left, start, end, found)
+        if node.start < end:
+            if node.end > start:
+                found.append((node.start, node.end, node.item))
+            self._collect(node.right, start, end, found)
+
+
+def _update(node: _Node) -> None:
+    node.max_end = node.end
+    if node.left is not None and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+
+@dataclass
+class PanditCalendar:
+    """A pandit's working hours, blocked dates and busy intervals over a period"""
+    pandit_id: UUID
+    working_hours: Dict[int, List[Tuple[time, time]]] = field(default_factory=dict)
+    blocked: Set[date] = field(default_factory=set)
+    busy: IntervalTree = field(default_factory=IntervalTree)
+
+    def windows(self, day: date) -> List[Tuple[datetime, datetime]]:
+        """The working windows of a day (none if it is blocked)"""
+        if day in self.blocked:
+            return []
+        hours = self.working_hours.get(day.weekday()) if self.working_hours else [_DEFAULT_WINDOW]
+        return [(datetime.combine(day, start), datetime.combine(day, end)) for start, end in sorted(hours or [])]
+
+    def conflict(self, start: datetime, end: datetime) -> Optional[str]:
+        """Why the pandit cannot take [start, end), or None if they can"""
+        if start.date() in self.blocked:
+            return "Pandit is not available on this date"
+        if not any(opens <= start and end <= closes for opens, closes in self.windows(start.date())):
+            return "Requested time is outside the pandit's working hours"
+        if self.busy.overlaps(start, end):
+            return "Pandit is already booked at this time"
+        return None
+
+    def free_slots(self, date_from: date, date_to: date, min_minutes: int = 0) -> List[Tuple[datetime, datetime]]:
+        """Free stretches of working time from date_from to date_to (inclusive), at least min_minutes long"""
+        shortest = timedelta(minutes=min_minutes)
+        slots = []
+        day = date_from
+        while day <= date_to:
+            for opens, closes in self.windows(day):
+                free_from = opens
+                for busy_from, busy_to, _ in self.busy.overlapping(opens, closes):
+                    if busy_from - free_from >= shortest and busy_from > free_from:
+                        slots.append((free_from, busy_from))
+                    free_from = max(free_from, busy_to)
+                if closes - free_from >= shortest and closes > free_from:
+                    slots.append((free_from, closes))
+            day += timedelta(days=1)
+        return slots
+
+
+def _naive(moment: datetime) -> datetime:
+    """Times are stored without a zone, so aware ones are compared in UTC"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def booking_interval(scheduled_at: datetime, duration_minutes: Optional[int]) -> Tuple[datetime, datetime]:
+    scheduled_at = _naive(scheduled_at)
+    return scheduled_at, scheduled_at + timedelta(minutes=duration_minutes or DEFAULT_DURATION_MINUTES)
+
+
+def consultation_interval(consultation_date: datetime) -> Tuple[datetime, datetime]:
+    consultation_date = _naive(consultation_date)
+    return consultation_date, consultation_date + timedelta(minutes=CONSULTATION_MINUTES)
+
+
+def load_calendars(
+    db: Session,
+    pandit_ids: List[UUID],
+    start: datetime,
+    end: datetime,
+    exclude_booking: Optional[UUID] = None
+) -> Dict[UUID, PanditCalendar]:
+    """Calendars of several pandits covering [start, end), in three queries"""
+    calendars = {pandit_id: PanditCalendar(pandit_id) for pandit_id in pandit_ids}
+    if not calendars:
+        return calendars
+    hours = db.execute(
+        select(
+            models.PanditWorkingHours.pandit_id, models.PanditWorkingHours.weekday,
+            models.PanditWorkingHours.start_time, models.PanditWorkingHours.end_time
+        ).where(models.PanditWorkingHours.pandit_id.in_(pandit_ids))
+    )
+    for pandit_id, weekday, opens, closes in hours:
+        calendars[pandit_id].working_hours.setdefault(weekday, []).append((opens, closes))
+    blocked = db.execute(
+        select(models.PanditBlockedDate.pandit_id, models.PanditBlockedDate.blocked_on)
+        .where(
+            models.PanditBlockedDate.pandit_id.in_(pandit_ids),
+            models.PanditBlockedDate.blocked_on >= start.date(),
+            models.PanditBlockedDate.blocked_on <= end.date(),
+        )
+    )
+    for pandit_id, blocked_on in blocked:
+        calendars[pandit_id].blocked.add(blocked_on)
+
+    bookings = (
+        select(
+            models.Booking.pandit_id, models.Booking.id, models.Booking.scheduled_at,
+            func.coalesce(models.PujaType.duration_minutes, DEFAULT_DURATION_MINUTES)
+        )
+        .join(models.PujaType, models.Booking.puja_type_id == models.PujaType.id)
+        .where(
+            models.Booking.pandit_id.in_(pandit_ids),
+            models.Booking.status != models.BookingStatus.CANCELLED,
+            models.Booking.scheduled_at >= start - _LOOKBACK,
+            models.Booking.scheduled_at < end,
+        )
+    )
+    if exclude_booking is not None:
+        bookings = bookings.where(models.Booking.id != exclude_booking)
+    for pandit_id, booking_id, scheduled_at, minutes in db.execute(bookings):
+        calendars[pandit_id].busy.add(*booking_interval(scheduled_at, minutes), booking_id)
+    consultations = db.execute(
+        select(models.Consultation.pandit_id, models.Consultation.id, models.Consultation.consultation_date)
+        .where(
+            models.Consultation.pandit_id.in_(pandit_ids),
+            models.Consultation.status != models.BookingStatus.CANCELLED,
+            models.Consultation.consultation_date >= start - _LOOKBACK,
+            models.Consultation.consultation_date < end,
+        )
+    )
+    for pandit_id, consultation_id, consultation_date in consultations:
+        calendars[pandit_id].busy.add(*consultation_interval(consultation_date), consultation_id)
+    return calendars
+
+
+def load_calendar(db: Session, pandit_id: UUID, start: datetime, end: datetime, **kwargs) -> PanditCalendar:
+    return load_calendars(db, [pandit_id], start, end, **kwargs)[pandit_id]
+
+
+def reserve(
+    db: Session,
+    pandit_id: UUID,
+    start: datetime,
+    end: datetime,
+    exclude_booking: Optional[UUID] = None
+) -> None:
+    """Check the pandit is free for [start, end), raising 409 if not.
+
+    Locks the pandit's row until the caller's transaction ends, so that
+    concurrent bookings for the same pandit are checked one at a time and
+    the second sees the first.
+    """
+    db.execute(select(models.Pandit.id).where(models.Pandit.id == pandit_id).with_for_update())
+    calendar = load_calendar(db, pandit_id, start, end, exclude_booking=exclude_booking)
+    conflict = calendar.conflict(start, end)
+    if conflict is not None:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from . import async_crud, schemas
+from .database import READ_YOUR_WRITES_SECONDS, AsyncSessionLocal, open_async_read_session
+
+# Safety net for multi-process deployments: an admin write only bumps the
+# version in the process that handled it, so other workers refresh on expiry
+# (and reload the search, name and location indexes this often)
+CATALOG_TTL_SECONDS = float(os.getenv("CATALOG_TTL_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+_list_adapter = TypeAdapter(List[schemas.PujaTypeSummary])
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag from a content hash of the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, body: bytes) -> "CachedBody":
+        return cls(body=body, etag=make_etag(body))
+
+
+@dataclass
+class CatalogSnapshot:
+    """One version of the catalog, serialized once and served until replaced.
+
+    The listing holds summaries only; every puja's full detail body is
+    serialized alongside it, so a detail request (and its 404 for an unknown
+    ID) is answered without a query.
+    """
+    version: int
+    loaded_at: float
+    listing: CachedBody
+    pujas: Dict[str, CachedBody] = field(default_factory=dict)
+
+
+class PujaCatalog:
+    """Process-local cache of the puja catalog as ready-to-send JSON bytes.
+
+    Admin writes call invalidate(), which bumps the version; the next read
+    reloads from the database (the primary, for a short window, so a lagging
+    replica cannot repopulate the old catalog).
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL_SECONDS):
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._primary_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Drop the cached catalog after a puja type was created or changed"""
+        self.version += 1
+        self._snapshot = None
+        self._primary_until = time.monotonic() + READ_YOUR_WRITES_SECONDS
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version:
+            return None
+        if time.monotonic() - snapshot.loaded_at > self.ttl:
+            return None
+        return snapshot
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """The current catalog, loading it from the database if needed"""
+        snapshot = self._current()
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            snapshot = self._current()
+            if snapshot is None:
+                snapshot = await self._load()
+        return snapshot
+
+    async def puja(self, puja_id: UUID) -> Optional[CachedBody]:
+        """The full detail body of one puja type, or None if it does not exist"""
+        snapshot = await self.snapshot()
+        return snapshot.pujas.get(str(puja_id))
+
+    async def _open_session(self):
+        if time.monotonic() < self._primary_until:
+            return AsyncSessionLocal()
+        return await open_async_read_session()
+
+    async def _load(self) -> CatalogSnapshot:
+        version = self.version
+        db = await self._open_session()
+        try:
+            pujas = await async_crud.get_all_puja_types(db, with_details=True)
+        finally:
+            await db.close()
+        summaries = [schemas.PujaTypeSummary.model_validate(puja) for puja in pujas]
+        snapshot = CatalogSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            listing=CachedBody.of(_list_adapter.dump_json(summaries)),
+            pujas={str(puja.id): _detail_body(puja) for puja in pujas},
+        )
+        # A write that landed while loading has already moved the version on
+        if version == self.version:
+            self._snapshot = snapshot
+        return snapshot
+
+
+def _detail_body(puja) -> CachedBody:
+    return CachedBody.of(schemas.PujaTypeResponse.model_validate(puja).model_dump_json().encode("utf-8"))
+
+
+puja_catalog = PujaCatalog()
+
+
+async def reload_periodically(indexes: Iterable, interval: float = CATALOG_TTL_SECONDS) -> None:
+    """Background task: reload each in-memory index every ``interval`` seconds.
+
+    Picks up admin writes handled by other worker processes; an index
+    skips a reload that raced a write of its own and catches up next time.
+    """
+    indexes = list(indexes)
+    while True:
+        await asyncio.sleep(interval)
+        for index in indexes:
+            try:
+                await index.load()
+            except Exception:
+                logger.exception("Reloading %s failed", type(index).__name__)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    # Weak comparison, as If-None-Match requires
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """200 with the cached bytes, or 304 when the client already holds them"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import Select, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# How often the counters are recounted from the source tables (0 disables)
+COUNTERS_RECONCILE_SECONDS = float(os.getenv("COUNTERS_RECONCILE_SECONDS", "300"))
+
+# The totals are spread over shard rows 1..COUNTERS_SHARDS (seeded by migration
+# 0009), each write bumping one at random, so concurrent writers rarely wait
+# on the same row lock; reads add them up. Row 0 holds no counts: reconcile
+# locks it to run one at a time without blocking writers.
+COUNTERS_SHARDS = 16
+RECONCILE_ROW_ID = 0
+STAT_FIELDS = (
+    "total_users",
+    "total_pandits",
+    "total_bookings",
+    "total_revenue",
+    "pending_approvals",
+    "active_virtual_sessions",
+)
+
+
+def admin_stats_query() -> Select:
+    """Every admin total recounted from the source tables in one statement"""
+    return select(
+        select(func.count(models.User.id))
+        .where(models.User.role == models.UserRole.USER)
+        .scalar_subquery().label("total_users"),
+        select(func.count(models.Pandit.id)).scalar_subquery().label("total_pandits"),
+        select(func.count(models.Booking.id)).scalar_subquery().label("total_bookings"),
+        select(func.coalesce(func.sum(models.Payment.amount), 0))
+        .where(models.Payment.status == models.PaymentStatus.SUCCESS)
+        .scalar_subquery().label("total_revenue"),
+        select(func.count(models.Pandit.id))
+        .where(models.Pandit.approved == False)
+        .scalar_subquery().label("pending_approvals"),
+        select(func.count(models.VirtualSession.id))
+        .where(models.VirtualSession.is_active == True)
+        .scalar_subquery().label("active_virtual_sessions"),
+    )
+
+
+def counters_query() -> Select:
+    """The counters summed over their shards; no row when none are stored yet"""
+    table = models.AdminCounters.__table__
+    return select(*(func.sum(table.c[field]).label(field) for field in STAT_FIELDS)).having(func.count() > 0)
+
+
+def _drift_query() -> Select:
+    """The recount and the stored totals in one statement, so both see the same snapshot"""
+    table = models.AdminCounters.__table__
+    return admin_stats_query().add_columns(*(
+        select(func.coalesce(func.sum(table.c[field]), 0)).scalar_subquery().label(f"stored_{field}")
+        for field in STAT_FIELDS
+    ))
+
+
+def as_stats(row) -> dict:
+    """AdminStats fields from a counters_query() or admin_stats_query() row"""
+    stats = {field: getattr(row, field) for field in STAT_FIELDS}
+    stats["total_revenue"] = float(stats["total_revenue"] or 0)
+    return stats
+
+
+# What each row contributes to the counters, from the attributes it depends on.
+# Column defaults are not applied until the INSERT, so None means "default".
+def _user(role) -> Dict[str, float]:
+    return {"total_users": int(role in (None, models.UserRole.USER))}
+
+
+def _pandit(approved) -> Dict[str, float]:
+    return {"total_pandits": 1, "pending_approvals": int(not approved)}
+
+
+def _booking() -> Dict[str, float]:
+    return {"total_bookings": 1}
+
+
+def _payment(status, amount) -> Dict[str, float]:
+    return {"total_revenue": (amount or 0) if status == models.PaymentStatus.SUCCESS else 0}
+
+
+def _virtual_session(is_active) -> Dict[str, float]:
+    return {"active_virtual_sessions": int(is_active is None or bool(is_active))}
+
+
+TRACKED = {
+    models.User: (("role",), _user),
+    models.Pandit: (("approved",), _pandit),
+    models.Booking: ((), _booking),
+    models.Payment: (("status", "amount"), _payment),
+    models.VirtualSession: (("is_active",), _virtual_session),
+}
+
+
+def _stored_value(session: Session, obj, attr: str):
+    """The attribute's value as of the last load, reading it back if it was never loaded"""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    if not history.added:
+        # Unchanged and unloaded: loading it now yields the stored value
+        return getattr(obj, attr)
+    # Assigned without being loaded first (e.g. after the commit expired it)
+    mapper = type(obj)
+    return session.execute(select(getattr(mapper, attr)).where(mapper.id == obj.id)).scalar()
+
+
+def pending_deltas(session: Session) -> Counter:
+    """Net change to each counter from the objects about to be flushed"""
+    deltas = Counter()
+    with session.no_autoflush:
+        _collect_deltas(session, deltas)
+    return deltas
+
+
+def _collect_deltas(session: Session, deltas: Counter) -> None:
+    for obj in session.new:
+        rule = TRACKED.get(type(obj))
+        if rule:
+            attrs, contribution = rule
+            deltas.update(contribution(*(getattr(obj, attr) for attr in attrs)))
+    for obj in session.dirty:
+        rule = TRACKED.get(type(obj))
+        if not rule or not rule[0]:
+            continue
+        attrs, contribution = rule
+        state = inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+            continue
+        deltas.update(contribution(*(getattr(obj, attr) for attr in attrs)))
+        deltas.subtract(contribution(*(_stored_value(session, obj, attr) for attr in attrs)))
+    for obj in session.deleted:
+        rule = TRACKED.get(type(obj))
+        if rule:
+            attrs, contribution = rule
+            deltas.subtract(contribution(*(_stored_value(session, obj, attr) for attr in attrs)))
+
+
+def apply_deltas(session: Session, deltas: Dict[str, float]) -> None:
+    """Add to a random counters shard in the session's transaction.
+
+    Flushes do this themselves; UPDATE statements that bypass the unit of
+    work (guarded transitions) call it with what they changed.
+    """
+    deltas = {field: amount for field, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    table = models.AdminCounters.__table__
+    session.connection().execute(
+        update(table)
+        .where(table.c.id == random.randint(1, COUNTERS_SHARDS))
+        .values({field: table.c[field] + amount for field, amount in deltas.items()})
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def bump_counters(session: Session, flush_context, instances) -> None:
+    """Apply the flush's counter deltas in the same transaction as the rows themselves"""
+    apply_deltas(session, pending_deltas(session))
+
+
+def reconcile(db: Session) -> dict:
+    """Recount every total from the source tables and add the drift to the counters.
+
+    Writers bump a shard in the same transaction as their rows, so a single
+    statement reading both the recount and the shards' sum sees them agree
+    except for real drift. The drift is added like any other delta rather
+    than overwriting the shards, so no writer waits for the recount and no
+    concurrent bump is lost. Reconciles queue on row 0, which writers never
+    touch, so that two workers do not correct the same drift twice.
+    Returns the drift that was corrected.
+    """
+    marker = db.execute(
+        select(models.AdminCounters).where(models.AdminCounters.id == RECONCILE_ROW_ID).with_for_update()
+    ).scalar_one_or_none()
+    if marker is None:
+        # Tables created without the migrations: seed the rows
+        existing = set(db.scalars(select(models.AdminCounters.id)))
+        db.add_all(
+            models.AdminCounters(id=row_id) for row_id in range(COUNTERS_SHARDS + 1) if row_id not in existing
+        )
+        db.flush()
+        marker = db.get(models.AdminCounters, RECONCILE_ROW_ID)
+    row = db.execute(_drift_query()).one()
+    actual = as_stats(row)
+    drift = {field: actual[field] - (getattr(row, f"stored_{field}") or 0) for field in STAT_FIELDS}
+    apply_deltas(db, drift)
+    marker.reconciled_at = datetime.utcnow()
+    db.commit()
+    return drift
+
+
+def _reconcile_in_new_session() -> dict:
+    db = SessionLocal()
+    try:
+        return reconcile(db)
+    finally:
+        db.close()
+
+
+async def reconcile_periodically(interval: float = COUNTERS_RECONCILE_SECONDS) -> None:
+    """Background task: reconcile the counters every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            drift = await run_in_threadpool(_reconcile_in_new_session)
+        except Exception:
+            logger.exception("Admin counters reconciliation failed")
+            continue
+        corrected = {field: amount for field, amount in drift.items() if amount}
+        if corrected:
+            logger.warning("Admin counters drifted, corrected: %s", corrected)
@@ -1,15 +1,34 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer_group
+from sqlalchemy import Select, func, select, update
+from datetime import date
+from typing import Dict, List, Optional
 from uuid import UUID
 from . import models, schemas
 from .auth import get_password_hash
+from .counters import admin_stats_query, apply_deltas, as_stats, counters_query
+from .gazetteer import gazetteer
+from .pagination import PageParams, keyset, page_of
+
+# Loader options for the list endpoints, chosen per relationship so that
+# serializing the nested response models never lazy-loads row by row:
+# - a pandit has exactly one user, so it is joined into the same query;
+# - booking rows repeat a handful of puja types and users, so those are
+#   fetched once each with a follow-up IN query rather than joined (which
+#   would copy the wide puja description columns onto every booking row).
+PANDIT_LOADERS = (joinedload(models.Pandit.user, innerjoin=True),)
+BOOKING_LOADERS = (selectinload(models.Booking.puja_type), selectinload(models.Booking.user))
 
 
 # User CRUD
-def create_user(db: Session, user: schemas.UserCreate, role: models.UserRole = models.UserRole.USER) -> models.User:
-    """Create a new user"""
-    hashed_password = get_password_hash(user.password)
+def create_user(
+    db: Session,
+    user: schemas.UserCreate,
+    role: models.UserRole = models.UserRole.USER,
+    hashed_password: Optional[str] = None
+) -> models.User:
+    """Create a new user (pass hashed_password when it was already hashed off-thread)"""
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         name=user.name,
         phone=user.phone,
@@ -21,7 +40,6 @@ def create_user(db: Session, user: schemas.UserCreate, role: models.UserRole = m
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
@@ -35,25 +53,51 @@ def get_user_by_id(db: Session, user_id: UUID) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-    """Get all users"""
-    return db.query(models.User).offset(skip).limit(limit).all()
+def select_users(filters: Optional[schemas.UserFilters] = None) -> Select:
+    """Users matching the list filters (shared by the sync and async paths)"""
+    query = select(models.User)
+    if filters is None:
+        return query
+    if filters.role:
+        query = query.where(models.User.role == models.UserRole(filters.role.value))
+    if filters.city:
+        query = query.where(func.lower(models.User.city) == filters.city.lower())
+    if filters.date_from:
+        query = query.where(models.User.created_at >= filters.date_from)
+    if filters.date_to:
+        query = query.where(models.User.created_at < filters.date_to)
+    return query
+
+
+def get_all_users(
+    db: Session,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.UserFilters] = None
+) -> dict:
+    """Get a page of users, newest first"""
+    rows = db.execute(keyset(select_users(filters), models.User, page)).scalars().all()
+    return page_of(rows, page)
 
 
 # Pandit CRUD
 def create_pandit(db: Session, user_id: UUID, pandit: schemas.PanditCreate) -> models.Pandit:
-    """Create a pandit profile"""
+    """Create a pandit profile, placed at its city's centroid unless coordinates are given"""
+    if pandit.latitude is not None and pandit.longitude is not None:
+        location = (pandit.latitude, pandit.longitude)
+    else:
+        location = gazetteer.locate(pandit.city, pandit.state) or (None, None)
     db_pandit = models.Pandit(
         user_id=user_id,
         city=pandit.city,
         state=pandit.state,
+        latitude=location[0],
+        longitude=location[1],
         bio=pandit.bio,
         photo_url=pandit.photo_url,
         approved=False
     )
     db.add(db_pandit)
     db.commit()
-    db.refresh(db_pandit)
     return db_pandit
 
 
@@ -67,31 +111,78 @@ def get_pandit_by_id(db: Session, pandit_id: UUID) -> Optional[models.Pandit]:
     return db.query(models.Pandit).filter(models.Pandit.id == pandit_id).first()
 
 
-def get_all_pandits(db: Session, approved_only: bool = False) -> List[models.Pandit]:
-    """Get all pandits"""
-    query = db.query(models.Pandit)
+def select_pandits(filters: Optional[schemas.PanditFilters] = None, approved_only: bool = False) -> Select:
+    """Pandits (with their user rows) matching the list filters"""
+    query = select(models.Pandit).options(*PANDIT_LOADERS)
     if approved_only:
-        query = query.filter(models.Pandit.approved == True)
-    return query.all()
+        query = query.where(models.Pandit.approved == True)
+    if filters is not None and filters.city:
+        query = query.where(func.lower(models.Pandit.city) == filters.city.lower())
+    if filters is not None and filters.state:
+        query = query.where(func.lower(models.Pandit.state) == filters.state.lower())
+    return query
+
+
+def get_all_pandits(
+    db: Session,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.PanditFilters] = None,
+    approved_only: bool = False
+) -> dict:
+    """Get a page of pandits with their user rows, newest first"""
+    rows = db.execute(keyset(select_pandits(filters, approved_only), models.Pandit, page)).scalars().all()
+    return page_of(rows, page)
 
 
 def approve_pandit(db: Session, pandit_id: UUID, approved: bool) -> Optional[models.Pandit]:
-    """Approve or reject pandit"""
-    pandit = get_pandit_by_id(db, pandit_id)
-    if pandit:
-        pandit.approved = approved
-        db.commit()
-        db.refresh(pandit)
+    """Approve or reject pandit; None if missing or already in that state"""
+    pandit = db.scalars(
+        update(models.Pandit)
+        .where(models.Pandit.id == pandit_id, models.Pandit.approved != approved)
+        .values(approved=approved)
+        .returning(models.Pandit),
+        execution_options={"populate_existing": True},
+    ).one_or_none()
+    if pandit is not None:
+        apply_deltas(db, {"pending_approvals": -1 if approved else 1})
+    db.commit()
     return pandit
 
 
+def get_pandit_schedule(db: Session, pandit_id: UUID) -> dict:
+    """Get a pandit's weekly working hours and upcoming blocked dates"""
+    working_hours = (
+        db.query(models.PanditWorkingHours)
+        .filter(models.PanditWorkingHours.pandit_id == pandit_id)
+        .order_by(models.PanditWorkingHours.weekday, models.PanditWorkingHours.start_time)
+        .all()
+    )
+    blocked_dates = (
+        db.query(models.PanditBlockedDate)
+        .filter(models.PanditBlockedDate.pandit_id == pandit_id, models.PanditBlockedDate.blocked_on >= date.today())
+        .order_by(models.PanditBlockedDate.blocked_on)
+        .all()
+    )
+    return {"working_hours": working_hours, "blocked_dates": blocked_dates}
+
+
+def set_pandit_schedule(db: Session, pandit_id: UUID, schedule: schemas.PanditSchedule) -> dict:
+    """Replace a pandit's working hours and blocked dates"""
+    db.query(models.PanditWorkingHours).filter(models.PanditWorkingHours.pandit_id == pandit_id).delete()
+    db.query(models.PanditBlockedDate).filter(models.PanditBlockedDate.pandit_id == pandit_id).delete()
+    db.add_all(models.PanditWorkingHours(pandit_id=pandit_id, **hours.dict()) for hours in schedule.working_hours)
+    blocked_on = {blocked.blocked_on: blocked for blocked in schedule.blocked_dates}
+    db.add_all(models.PanditBlockedDate(pandit_id=pandit_id, **blocked.dict()) for blocked in blocked_on.values())
+    db.commit()
+    return get_pandit_schedule(db, pandit_id)
+
+
 # Puja Type CRUD
 def create_puja_type(db: Session, puja: schemas.PujaTypeCreate) -> models.PujaType:
     """Create a new puja type"""
     db_puja = models.PujaType(**puja.dict())
     db.add(db_puja)
     db.commit()
-    db.refresh(db_puja)
     return db_puja
 
 
@@ -100,9 +191,12 @@ def get_puja_type_by_id(db: Session, puja_id: UUID) -> Optional[models.PujaType]
     return db.query(models.PujaType).filter(models.PujaType.id == puja_id).first()
 
 
-def get_all_puja_types(db: Session) -> List[models.PujaType]:
-    """Get all puja types"""
-    return db.query(models.PujaType).all()
+def get_all_puja_types(db: Session, with_details: bool = False) -> List[models.PujaType]:
+    """Get all puja types, loading the deferred long texts only if asked to"""
+    query = db.query(models.PujaType)
+    if with_details:
+        query = query.options(undefer_group("details"))
+    return query.all()
 
 
 def update_puja_type(db: Session, puja_id: UUID, puja_update: schemas.PujaTypeUpdate) -> Optional[models.PujaType]:
@@ -113,10 +207,19 @@ def update_puja_type(db: Session, puja_id: UUID, puja_update: schemas.PujaTypeUp
         for key, value in update_data.items():
             setattr(puja, key, value)
         db.commit()
-        db.refresh(puja)
     return puja
 
 
+def get_booking_counts(db: Session) -> Dict[UUID, int]:
+    """Number of bookings (cancelled ones excepted) of each puja type"""
+    rows = db.execute(
+        select(models.Booking.puja_type_id, func.count(models.Booking.id))
+        .where(models.Booking.status != models.BookingStatus.CANCELLED)
+        .group_by(models.Booking.puja_type_id)
+    )
+    return {puja_type_id: count for puja_type_id, count in rows}
+
+
 # Booking CRUD
 def create_booking(db: Session, user_id: UUID, booking: schemas.BookingCreate) -> models.Booking:
     """Create a new booking"""
@@ -134,7 +237,6 @@ def create_booking(db: Session, user_id: UUID, booking: schemas.BookingCreate) -
     )
     db.add(db_booking)
     db.commit()
-    db.refresh(db_booking)
     return db_booking
 
 
@@ -143,41 +245,106 @@ def get_booking_by_id(db: Session, booking_id: UUID) -> Optional[models.Booking]
     return db.query(models.Booking).filter(models.Booking.id == booking_id).first()
 
 
-def get_user_bookings(db: Session, user_id: UUID) -> List[models.Booking]:
-    """Get all bookings for a user"""
-    return db.query(models.Booking).filter(models.Booking.user_id == user_id).all()
+def select_bookings(
+    filters: Optional[schemas.BookingFilters] = None,
+    user_id: Optional[UUID] = None,
+    pandit_id: Optional[UUID] = None
+) -> Select:
+    """Bookings (with their puja type and user rows) matching the list filters"""
+    query = select(models.Booking).options(*BOOKING_LOADERS)
+    if user_id is not None:
+        query = query.where(models.Booking.user_id == user_id)
+    if pandit_id is not None:
+        query = query.where(models.Booking.pandit_id == pandit_id)
+    if filters is None:
+        return query
+    if filters.status:
+        query = query.where(models.Booking.status == models.BookingStatus(filters.status.value))
+    if filters.date_from:
+        query = query.where(models.Booking.scheduled_at >= filters.date_from)
+    if filters.date_to:
+        query = query.where(models.Booking.scheduled_at < filters.date_to)
+    if filters.puja_type_id:
+        query = query.where(models.Booking.puja_type_id == filters.puja_type_id)
+    if filters.city:
+        query = query.join(models.Booking.pandit).where(func.lower(models.Pandit.city) == filters.city.lower())
+    return query
+
+
+def get_bookings_page(db: Session, query: Select, page: PageParams) -> dict:
+    """Run a select_bookings query one keyset page at a time"""
+    rows = db.execute(keyset(query, models.Booking, page)).scalars().all()
+    return page_of(rows, page)
+
+
+def get_user_bookings(
+    db: Session,
+    user_id: UUID,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.BookingFilters] = None
+) -> dict:
+    """Get a page of a user's bookings, newest first"""
+    return get_bookings_page(db, select_bookings(filters, user_id=user_id), page)
 
 
-def get_pandit_bookings(db: Session, pandit_id: UUID) -> List[models.Booking]:
-    """Get all bookings for a pandit"""
-    return db.query(models.Booking).filter(models.Booking.pandit_id == pandit_id).all()
+def get_pandit_bookings(
+    db: Session,
+    pandit_id: UUID,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.BookingFilters] = None
+) -> dict:
+    """Get a page of a pandit's bookings, newest first"""
+    return get_bookings_page(db, select_bookings(filters, pandit_id=pandit_id), page)
 
 
-def get_all_bookings(db: Session) -> List[models.Booking]:
-    """Get all bookings"""
-    return db.query(models.Booking).all()
+def get_all_bookings(
+    db: Session,
+    page: PageParams = PageParams(),
+    filters: Optional[schemas.BookingFilters] = None
+) -> dict:
+    """Get a page of all bookings, newest first"""
+    return get_bookings_page(db, select_bookings(filters), page)
+
+
+def booking_statuses_before(status: models.BookingStatus) -> List[models.BookingStatus]:
+    """Statuses a booking may move to `status` from"""
+    return [source for source, targets in models.BOOKING_TRANSITIONS.items() if status in targets]
+
+
+def _update_booking_where(db: Session, booking_id: UUID, values: dict, *criteria) -> Optional[models.Booking]:
+    """One UPDATE ... RETURNING of a booking matching the criteria; None if it is missing or they fail"""
+    booking = db.scalars(
+        update(models.Booking)
+        .where(models.Booking.id == booking_id, *criteria)
+        .values(**values)
+        .returning(models.Booking),
+        execution_options={"populate_existing": True},
+    ).one_or_none()
+    db.commit()
+    return booking
 
 
 def update_booking(db: Session, booking_id: UUID, booking_update: schemas.BookingUpdate) -> Optional[models.Booking]:
-    """Update booking"""
-    booking = get_booking_by_id(db, booking_id)
-    if booking:
-        update_data = booking_update.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(booking, key, value)
-        db.commit()
-        db.refresh(booking)
-    return booking
+    """Update booking; a status change only applies from a status it may follow"""
+    values = booking_update.dict(exclude_unset=True)
+    criteria = []
+    if values.get("status") is not None:
+        criteria.append(models.Booking.status.in_(booking_statuses_before(values["status"])))
+    return _update_booking_where(db, booking_id, values, *criteria)
 
 
-def cancel_booking(db: Session, booking_id: UUID) -> Optional[models.Booking]:
-    """Cancel a booking"""
-    booking = get_booking_by_id(db, booking_id)
-    if booking:
-        booking.status = models.BookingStatus.CANCELLED
-        db.commit()
-        db.refresh(booking)
-    return booking
+def cancel_booking(db: Session, booking_id: UUID, user_id: Optional[UUID] = None) -> Optional[models.Booking]:
+    """Cancel a booking (of `user_id`, if given) that is not completed or cancelled already"""
+    criteria = [models.Booking.status.in_(booking_statuses_before(models.BookingStatus.CANCELLED))]
+    if user_id is not None:
+        criteria.append(models.Booking.user_id == user_id)
+    return _update_booking_where(db, booking_id, {"status": models.BookingStatus.CANCELLED}, *criteria)
+
+
+def confirm_booking(db: Session, booking_id: UUID) -> Optional[models.Booking]:
+    """Confirm a booking that is still pending (e.g. once it is paid); None if it moved on"""
+    criteria = [models.Booking.status.in_(booking_statuses_before(models.BookingStatus.CONFIRMED))]
+    return _update_booking_where(db, booking_id, {"status": models.BookingStatus.CONFIRMED}, *criteria)
 
 
 # Payment CRUD
@@ -191,7 +358,6 @@ def create_payment(db: Session, booking_id: UUID, provider: str, amount: float)
     )
     db.add(db_payment)
     db.commit()
-    db.refresh(db_payment)
     return db_payment
 
 
@@ -213,7 +379,6 @@ def update_payment_status(
         if provider_payment_id:
             payment.provider_payment_id = provider_payment_id
         db.commit()
-        db.refresh(payment)
     return payment
 
 
@@ -230,7 +395,6 @@ def create_consultation(db: Session, user_id: UUID, consultation: schemas.Consul
     )
     db.add(db_consultation)
     db.commit()
-    db.refresh(db_consultation)
     return db_consultation
 
 
@@ -245,7 +409,6 @@ def create_virtual_session(db: Session, session: schemas.VirtualSessionCreate) -
     db_session = models.VirtualSession(**session.dict())
     db.add(db_session)
     db.commit()
-    db.refresh(db_session)
     return db_session
 
 
@@ -261,32 +424,9 @@ def get_active_virtual_sessions(db: Session) -> List[models.VirtualSession]:
 
 # Admin Stats
 def get_admin_stats(db: Session) -> dict:
-    """Get admin dashboard statistics"""
-    total_users = db.query(func.count(models.User.id)).filter(
-        models.User.role == models.UserRole.USER
-    ).scalar()
-    
-    total_pandits = db.query(func.count(models.Pandit.id)).scalar()
-    
-    total_bookings = db.query(func.count(models.Booking.id)).scalar()
-    
-    total_revenue = db.query(func.sum(models.Payment.amount)).filter(
-        models.Payment.status == models.PaymentStatus.SUCCESS
-    ).scalar() or 0
-    
-    pending_approvals = db.query(func.count(models.Pandit.id)).filter(
-        models.Pandit.approved == False
-    ).scalar()
-    
-    active_sessions = db.query(func.count(models.VirtualSession.id)).filter(
-        models.VirtualSession.is_active == True
-    ).scalar()
-    
-    return {
-        "total_users": total_users,
-        "total_pandits": total_pandits,
-        "total_bookings": total_bookings,
-        "total_revenue": float(total_revenue),
-        "pending_approvals": pending_approvals,
-        "active_virtual_sessions": active_sessions
-    }
+    """Get admin dashboard statistics from the maintained counters"""
+    counters = db.execute(counters_query()).one_or_none()
+    if counters is None:
+        # Not reconciled yet: count the source tables instead
+        return as_stats(db.execute(admin_stats_query()).one())
+    return as_stats(counters)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+
+from . import models
+
+# Events kept for a stream that is not reading; past this the oldest are dropped
+BOOKING_STREAM_QUEUE_SIZE = int(os.getenv("BOOKING_STREAM_QUEUE_SIZE", "32"))
+# Comment line sent after this long without an event, so proxies keep idle streams open
+BOOKING_STREAM_HEARTBEAT_SECONDS = float(os.getenv("BOOKING_STREAM_HEARTBEAT_SECONDS", "15"))
+# How long EventSource clients wait before reconnecting (milliseconds)
+BOOKING_STREAM_RETRY_MS = int(os.getenv("BOOKING_STREAM_RETRY_MS", "5000"))
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class Subscription:
+    """One open stream: a bounded queue of events for a user, oldest dropped first"""
+
+    __slots__ = ("user_id", "dropped", "_events", "_waiter")
+
+    def __init__(self, user_id: UUID, size: int):
+        self.user_id = user_id
+        # Events dropped since the stream last reported it
+        self.dropped = 0
+        self._events = deque(maxlen=size)
+        self._waiter: Optional[asyncio.Future] = None
+
+    def push(self, event: dict) -> bool:
+        """Queue an event (on the hub's loop); False if the oldest had to make room"""
+        full = len(self._events) == self._events.maxlen
+        if full:
+            self.dropped += 1
+        self._events.append(event)
+        if self._waiter is not None:
+            _wake(self._waiter)
+        return not full
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """The next event, or None if none arrives within ``timeout`` seconds"""
+        if not self._events:
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            # A timer rather than wait_for(), which would start a task per wait
+            timer = loop.call_later(timeout, _wake, self._waiter)
+            try:
+                await self._waiter
+            finally:
+                timer.cancel()
+                self._waiter = None
+        return self._events.popleft() if self._events else None
+
+
+class EventHub:
+    """In-process pub/sub of booking and payment changes to the streams open on this worker.
+
+    Streams subscribe on the event loop; writers publish from anywhere
+    (the sync routes run in the threadpool), and delivery is handed to the
+    loop. Publishing only reaches streams held by the same process.
+    """
+
+    def __init__(self, queue_size: int = BOOKING_STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: Dict[UUID, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        """Open a subscription to the user's events (call on the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: UUID, kind: str, data: dict) -> None:
+        """Send an event to the user's open streams, if they have any"""
+        loop = self._loop
+        if loop is None or user_id not in self._subscribers or loop.is_closed():
+            return
+        with self._lock:
+            self._sequence += 1
+            event = {"id": self._sequence, "event": kind, "data": data}
+        self.published += 1
+        try:
+            loop.call_soon_threadsafe(self._deliver, user_id, event)
+        except RuntimeError:
+            # The loop closed in between (shutdown)
+            pass
+
+    def _deliver(self, user_id: UUID, event: dict) -> None:
+        for subscription in self._subscribers.get(user_id, ()):
+            if subscription.push(event):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "streams": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+hub = EventHub()
+
+
+def _format(kind: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {kind}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream(
+    user_id: UUID,
+    event_hub: EventHub = hub,
+    heartbeat: float = BOOKING_STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Server-sent events for one user until the client goes away.
+
+    When the queue overflowed an "overflow" event tells the client it
+    missed updates and should fetch its bookings again.
+    """
+    subscription = event_hub.subscribe(user_id)
+    try:
+        yield f"retry: {BOOKING_STREAM_RETRY_MS}\n\n"
+        while True:
+            event = await subscription.next(heartbeat)
+            if subscription.dropped:
+                yield _format("overflow", {"dropped": subscription.dropped})
+                subscription.dropped = 0
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _format(event["event"], event["data"], event["id"])
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def publish_booking(booking: models.Booking) -> None:
+    """Tell the booking's devotee about its current status"""
+    hub.publish(booking.user_id, "booking", {
+        "booking_id": str(booking.id),
+        "status": booking.status.value,
+        "pandit_id": str(booking.pandit_id) if booking.pandit_id else None,
+        "scheduled_at": _iso(booking.scheduled_at),
+        "updated_at": _iso(booking.updated_at),
+    })
+
+
+def publish_payment(payment: models.Payment, user_id: UUID) -> None:
+    """Tell the devotee who owns the payment's booking about its status"""
+    hub.publish(user_id, "payment", {
+        "payment_id": str(payment.id),
+        "booking_id": str(payment.booking_id),
+        "status": payment.status.value,
+        "amount": payment.amount,
+    })
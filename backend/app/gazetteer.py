@@ -0,0 +1,43 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "cities.json")
+
+Point = Tuple[float, float]
+
+
+def _place_key(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+class Gazetteer:
+    """Offline city centroids, looked up by city (or a former name) and state"""
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self._places: Dict[str, List[Tuple[str, Point]]] = {}
+        with open(path, encoding="utf-8") as file:
+            for entry in json.load(file):
+                point = (entry["lat"], entry["lng"])
+                for name in [entry["city"], *entry.get("aliases", ())]:
+                    self._places.setdefault(_place_key(name), []).append((_place_key(entry["state"]), point))
+
+    def locate(self, city: str, state: Optional[str] = None) -> Optional[Point]:
+        """A city's centroid, the one in `state` where the name is ambiguous; None if not listed"""
+        places = self._places.get(_place_key(city))
+        if not places:
+            return None
+        if state:
+            for place_state, point in places:
+                if place_state == _place_key(state):
+                    return point
+        return places[0][1]
+
+    def entries(self) -> Iterable[Tuple[str, str, Point]]:
+        """(city key, state key, centroid) for every name, former names included"""
+        for city, places in self._places.items():
+            for state, point in places:
+                yield city, state, point
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,178 @@
+import math
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from . import async_crud
+from .database import AsyncSessionLocal
+from .gazetteer import Point
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+# Grid cells are this many degrees on a side, about 55 km north-south
+CELL_DEGREES = 0.5
+# Widest search the nearby endpoint accepts
+MAX_RADIUS_KM = 500
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """Grid index over the locations of approved pandits.
+
+    Pandits geocoded from their city share its centroid, so each cell maps
+    distinct points to the (sorted) pandits there, and a query computes one
+    distance per point rather than per pandit. Cells are visited nearest
+    first and the search stops once no closer pandit can remain.
+
+    Cells do not wrap around the antimeridian. Like the other indexes, this
+    one is process-local: admin writes update the worker that handled them,
+    the others catch up on the periodic reload.
+    """
+
+    def __init__(self, cell_degrees: float = CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._lock = threading.Lock()
+        # Writes applied in this process, so a reload cannot undo one it did not see
+        self._writes = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._cells: Dict[Tuple[int, int], Dict[Point, List[UUID]]] = {}
+        self._points: Dict[UUID, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    async def load(self) -> None:
+        """(Re)build the index from the approved pandits in the database"""
+        writes = self._writes
+        db = AsyncSessionLocal()
+        try:
+            locations = await async_crud.get_pandit_locations(db)
+        finally:
+            await db.close()
+        self.rebuild(locations, writes)
+
+    def rebuild(self, locations: Iterable[Tuple[UUID, float, float]], writes: Optional[int] = None) -> None:
+        """Replace the contents, unless a write landed since ``writes`` was read (the next reload has it)"""
+        with self._lock:
+            if writes is not None and writes != self._writes:
+                return
+            self._clear()
+            for pandit_id, lat, lng in locations:
+                self._add(pandit_id, (lat, lng), keep_sorted=False)
+            for points in self._cells.values():
+                for pandit_ids in points.values():
+                    pandit_ids.sort()
+
+    def update(self, pandit) -> None:
+        """Index a pandit after it was created, moved, approved or rejected"""
+        with self._lock:
+            self._writes += 1
+            self._remove(pandit.id)
+            if pandit.approved and pandit.latitude is not None and pandit.longitude is not None:
+                self._add(pandit.id, (pandit.latitude, pandit.longitude))
+
+    def remove(self, pandit_id: UUID) -> None:
+        with self._lock:
+            self._writes += 1
+            self._remove(pandit_id)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def _add(self, pandit_id: UUID, point: Point, keep_sorted: bool = True) -> None:
+        self._points[pandit_id] = point
+        pandit_ids = self._cells.setdefault(self._cell(*point), {}).setdefault(point, [])
+        if keep_sorted:
+            insort(pandit_ids, pandit_id)
+        else:
+            pandit_ids.append(pandit_id)
+
+    def _remove(self, pandit_id: UUID) -> None:
+        point = self._points.pop(pandit_id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        points = self._cells[cell]
+        pandit_ids = points[point]
+        del pandit_ids[bisect_left(pandit_ids, pandit_id)]
+        if not pandit_ids:
+            del points[point]
+            if not points:
+                del self._cells[cell]
+
+    def _cell_bound(self, lat: float, lng: float, cell: Tuple[int, int]) -> float:
+        """Distance from a point to the nearest place in a cell"""
+        south, west = cell[0] * self.cell_degrees, cell[1] * self.cell_degrees
+        north, east = south + self.cell_degrees, west + self.cell_degrees
+        if west <= lng <= east:
+            return KM_PER_DEGREE * max(south - lat, lat - north, 0.0)
+        # Otherwise the nearest place is on the nearer side meridian, where
+        # the distance falls towards one latitude and rises away from it
+        edge = west if lng < west else east
+        closest = math.degrees(math.atan2(math.tan(math.radians(lat)), math.cos(math.radians(edge - lng))))
+        return haversine_km(lat, lng, min(max(closest, south), north), edge)
+
+    def _cells_near(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, Tuple[int, int]]]:
+        """Occupied cells that may hold points within radius_km, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        row_range = range(
+            math.floor((lat - lat_span) / self.cell_degrees), math.floor((lat + lat_span) / self.cell_degrees) + 1
+        )
+        cos_lat = math.cos(math.radians(min(abs(lat) + lat_span, 90.0)))
+        lng_span = radius_km / (KM_PER_DEGREE * cos_lat) if cos_lat > 1e-9 else 360.0
+        column_range = range(
+            math.floor((lng - lng_span) / self.cell_degrees), math.floor((lng + lng_span) / self.cell_degrees) + 1
+        )
+        if len(row_range) * len(column_range) > len(self._cells):
+            cells = [cell for cell in self._cells if cell[0] in row_range and cell[1] in column_range]
+        else:
+            cells = [(row, column) for row in row_range for column in column_range if (row, column) in self._cells]
+        bounded = [(self._cell_bound(lat, lng, cell), cell) for cell in cells]
+        return sorted(entry for entry in bounded if entry[0] <= radius_km)
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: int = 20,
+        only: Optional[Set[UUID]] = None
+    ) -> List[Tuple[float, UUID]]:
+        """Up to `limit` pandits within radius_km of a point (restricted to `only` if given), nearest first"""
+        found: List[Tuple[float, UUID]] = []
+        with self._lock:
+            for bound, cell in self._cells_near(lat, lng, radius_km):
+                if len(found) == limit and found[-1][0] < bound:
+                    break
+                # found is sorted between cells, so its last entry is the one to beat
+                cutoff = found[-1][0] if len(found) == limit else radius_km
+                for point, pandit_ids in self._cells[cell].items():
+                    distance = haversine_km(lat, lng, *point)
+                    if distance > cutoff:
+                        continue
+                    # Ties go to the lowest ID, so only the first `limit` matches at a point can count
+                    taken = 0
+                    for pandit_id in pandit_ids:
+                        if only is None or pandit_id in only:
+                            found.append((distance, pandit_id))
+                            taken += 1
+                            if taken == limit:
+                                break
+                found.sort()
+                del found[limit:]
+        return found
+
+
+pandit_locations = GeoIndex()
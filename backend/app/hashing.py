@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from .metrics import LatencyStats
+
+# Configuration
+HASH_POOL_WORKERS = max(1, int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1))))
+HASH_POOL_MAX_QUEUE = max(0, int(os.getenv("HASH_POOL_MAX_QUEUE", "64")))
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash"""
+    # Truncate password to 72 bytes for bcrypt compatibility
+    password_bytes = plain_password.encode('utf-8')[:72]
+    hashed_bytes = hashed_password.encode('utf-8')
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password"""
+    # Truncate password to 72 bytes for bcrypt compatibility
+    password_bytes = password.encode('utf-8')[:72]
+    salt = bcrypt.gensalt()
+    hashed = bcrypt.hashpw(password_bytes, salt)
+    return hashed.decode('utf-8')
+
+
+def _timed_call(func, *args):
+    """Run func inside a worker, reporting when it started and how long it took"""
+    started_at = time.time()
+    began = time.perf_counter()
+    result = func(*args)
+    return started_at, (time.perf_counter() - began) * 1000, result
+
+
+class HashPool:
+    """Bounded process pool for bcrypt work.
+
+    bcrypt deliberately burns a few hundred milliseconds of CPU per call, so it
+    runs in separate processes instead of on the event loop or the request
+    threadpool. At most ``workers + max_queue`` calls may be in flight; beyond
+    that callers get a 503 rather than queueing without bound.
+    """
+
+    def __init__(self, workers: int = HASH_POOL_WORKERS, max_queue: int = HASH_POOL_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self.hash_latency = LatencyStats()
+        self.queue_wait = LatencyStats()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def run(self, func, *args):
+        """Run func(*args) in the pool, rejecting with 503 when the queue is full"""
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+
+        submitted_at = time.time()
+        try:
+            executor = self._get_executor()
+            loop = asyncio.get_running_loop()
+            started_at, elapsed_ms, result = await loop.run_in_executor(
+                executor, _timed_call, func, *args
+            )
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            self.shutdown()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password service restarting, please retry",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        self.queue_wait.observe(max(0.0, (started_at - submitted_at) * 1000))
+        self.hash_latency.observe(elapsed_ms)
+        return result
+
+    def metrics(self) -> dict:
+        """Current pool occupancy and latency summaries"""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "hash_latency": self.hash_latency.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (a new pool is started on next use)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+pool = HashPool()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the hashing pool"""
+    return await pool.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from . import auth, models
+from .cache import TTLCache
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# How long a response is replayed to retries carrying the same key
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# After this long a request that never finished (its worker died) no longer holds its key
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_CACHE_MAX_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_MAX_SIZE", "10000"))
+# How often expired keys are deleted (seconds, 0 disables)
+IDEMPOTENCY_SWEEP_SECONDS = float(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", "3600"))
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+# POST endpoints whose retries must not create a second row or provider order
+IDEMPOTENT_PATHS = frozenset({
+    "/api/bookings",
+    "/api/payments/create",
+    "/api/payments/razorpay/order",
+})
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    content_type: Optional[str]
+    body: str
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Responses by (owner, key) in the idempotency_keys table, fronted by a per-process cache.
+
+    The first request claims its key with an INSERT that the unique
+    constraint makes atomic across workers; retries then find the stored
+    response, or a 409 while the first is still running. Only finished
+    responses are cached, so the cache never disagrees with the table.
+    """
+
+    def __init__(
+        self,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS,
+        cache_size: int = IDEMPOTENCY_CACHE_MAX_SIZE
+    ):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self._cache = TTLCache(maxsize=cache_size, ttl=ttl)
+
+    def claim(self, owner: str, key: str, request_fingerprint: str) -> Optional[StoredResponse]:
+        """Claim a key for a new request (None), or the response stored for it.
+
+        Raises 422 if the key was used for a different request and 409 if
+        the request holding it has not finished.
+        """
+        stored = self._cache.get((owner, key))
+        if stored is None:
+            db = SessionLocal()
+            try:
+                stored = self._claim(db, owner, key, request_fingerprint)
+            finally:
+                db.close()
+            if stored is None:
+                return None
+            self._cache.set((owner, key), stored)
+        if stored.fingerprint != request_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        return stored
+
+    def _claim(self, db, owner: str, key: str, request_fingerprint: str) -> Optional[StoredResponse]:
+        now = datetime.utcnow()
+        db.add(models.IdempotencyKey(
+            owner=owner, key=key, fingerprint=request_fingerprint, locked_at=now,
+            expires_at=now + timedelta(seconds=self.ttl),
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+        record = db.execute(
+            select(models.IdempotencyKey)
+            .where(models.IdempotencyKey.owner == owner, models.IdempotencyKey.key == key)
+            .with_for_update()
+        ).scalar_one_or_none()
+        abandoned = record is not None and record.status_code is None and (
+            record.locked_at <= now - timedelta(seconds=self.lock_seconds)
+        )
+        if record is None or record.expires_at <= now or abandoned:
+            # Swept, expired or left behind: start over with this request
+            if record is not None:
+                db.delete(record)
+                db.flush()
+            db.commit()
+            return self._claim(db, owner, key, request_fingerprint)
+        if record.status_code is None:
+            if record.fingerprint != request_fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return StoredResponse(record.fingerprint, record.status_code, record.content_type, record.response_body)
+
+    def complete(self, owner: str, key: str, stored: StoredResponse) -> None:
+        """Store the response a claimed request produced"""
+        db = SessionLocal()
+        try:
+            record = db.execute(
+                select(models.IdempotencyKey)
+                .where(models.IdempotencyKey.owner == owner, models.IdempotencyKey.key == key)
+            ).scalar_one_or_none()
+            if record is None or record.fingerprint != stored.fingerprint:
+                return
+            record.status_code = stored.status_code
+            record.content_type = stored.content_type
+            record.response_body = stored.body
+            record.expires_at = datetime.utcnow() + timedelta(seconds=self.ttl)
+            db.commit()
+        finally:
+            db.close()
+        self._cache.set((owner, key), stored)
+
+    def release(self, owner: str, key: str, request_fingerprint: str) -> None:
+        """Give up a claim whose request failed, so a retry runs it again"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(models.IdempotencyKey).where(
+                    models.IdempotencyKey.owner == owner,
+                    models.IdempotencyKey.key == key,
+                    models.IdempotencyKey.fingerprint == request_fingerprint,
+                    models.IdempotencyKey.status_code.is_(None),
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+store = IdempotencyStore()
+
+
+def _owner(headers: dict) -> Optional[str]:
+    """Whose key it is: the user the bearer token was issued to (None without a valid one)"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = auth.verify_token(token, "access")
+    except HTTPException:
+        return None
+    return payload.get("uid") or payload.get("sub")
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response to retried POSTs on IDEMPOTENT_PATHS that carry an Idempotency-Key.
+
+    Requests without the header, or without a valid token (the endpoint
+    will refuse them anyway), pass straight through. Only 2xx responses are
+    stored; a failed request frees its key for the retry.
+    """
+
+    def __init__(self, app, paths=IDEMPOTENT_PATHS, idempotency_store: IdempotencyStore = store):
+        self.app = app
+        self.paths = paths
+        self.store = idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"].rstrip("/") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        key = headers.get(HEADER, "").strip()
+        owner = _owner(headers) if key else None
+        if owner is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": f"Idempotency-Key is longer than {MAX_KEY_LENGTH} characters"}, 400)
+            await response(scope, receive, send)
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        request_fingerprint = fingerprint(scope["method"], scope["path"], body)
+        try:
+            stored = await run_in_threadpool(self.store.claim, owner, key, request_fingerprint)
+        except HTTPException as error:
+            await JSONResponse({"detail": error.detail}, error.status_code)(scope, receive, send)
+            return
+        if stored is not None:
+            replay = Response(stored.body, stored.status_code, headers={"Idempotent-Replayed": "true"})
+            replay.headers["content-type"] = stored.content_type or "application/json"
+            await replay(scope, receive, send)
+            return
+
+        replayed_body = False
+
+        async def receive_body():
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        sent = {"status": 500, "content_type": None, "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                sent["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        sent["content_type"] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                sent["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except Exception:
+            await run_in_threadpool(self.store.release, owner, key, request_fingerprint)
+            raise
+        if 200 <= sent["status"] < 300:
+            stored = StoredResponse(request_fingerprint, sent["status"], sent["content_type"], b"".join(sent["body"]).decode())
+            await run_in_threadpool(self.store.complete, owner, key, stored)
+        else:
+            await run_in_threadpool(self.store.release, owner, key, request_fingerprint)
+
+
+def sweep(db) -> int:
+    """Delete expired keys; returns how many"""
+    result = db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
+
+
+def _sweep_in_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return sweep(db)
+    finally:
+        db.close()
+
+
+async def sweep_periodically(interval: float = IDEMPOTENCY_SWEEP_SECONDS) -> None:
+    """Background task: delete expired idempotency keys every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_sweep_in_new_session)
+        except Exception:
+            logger.exception("Idempotency key sweep failed")
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .search import tokenize
+
+INTENTS_PATH = os.getenv("INTENTS_PATH", os.path.join(os.path.dirname(__file__), "data", "intents.json"))
+# How often the intents file is checked for changes (seconds, 0 checks on every question)
+INTENTS_RELOAD_SECONDS = float(os.getenv("INTENTS_RELOAD_SECONDS", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    priority: int
+    answer: str
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: Intent
+    pattern: str
+    start: int  # span in canonical(text)
+    end: int
+
+
+def canonical(text: str) -> str:
+    """Text as patterns are matched against it: folded search terms, single-spaced"""
+    return " ".join(tokenize(text))
+
+
+class Automaton:
+    """Aho-Corasick automaton over whole-word patterns.
+
+    One pass over the text finds every occurrence of every pattern; those
+    not starting and ending at word boundaries are dropped.
+    """
+
+    def __init__(self, patterns: List[Tuple[str, Intent]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, its own and those of its suffixes
+        self._out: List[List[Tuple[str, Intent]]] = [[]]
+        for pattern, intent in patterns:
+            state = 0
+            for char in pattern:
+                following = self._goto[state].get(char)
+                if following is None:
+                    following = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = following
+            self._out[state].append((pattern, intent))
+        # Breadth first, so every state's fail target is complete before it is needed
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fail = self._fail[state]
+                while char not in self._goto[fail] and fail:
+                    fail = self._fail[fail]
+                self._fail[following] = self._goto[fail].get(char, 0)
+                self._out[following] = self._out[following] + self._out[self._fail[following]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def find(self, text: str) -> List[IntentMatch]:
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while char not in goto[state] and state:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = position + 1
+            if end < len(text) and text[end] != " ":
+                continue
+            for pattern, intent in out[state]:
+                start = end - len(pattern)
+                if start == 0 or text[start - 1] == " ":
+                    matches.append(IntentMatch(intent=intent, pattern=pattern, start=start, end=end))
+        return matches
+
+
+def compile_intents(table: List[dict]) -> Automaton:
+    patterns = []
+    for row in table:
+        intent = Intent(name=row["intent"], priority=int(row.get("priority", 0)), answer=row["answer"])
+        for pattern in row["patterns"]:
+            pattern = canonical(pattern)
+            if pattern:
+                patterns.append((pattern, intent))
+    return Automaton(patterns)
+
+
+class IntentMatcher:
+    """The intent table from INTENTS_PATH, recompiled when the file changes.
+
+    The file's modification time is checked at most every
+    INTENTS_RELOAD_SECONDS; a table that fails to load is logged and the
+    previous one kept.
+    """
+
+    def __init__(self, path: str = INTENTS_PATH, reload_seconds: float = INTENTS_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._automaton = Automaton([])
+        # Bumped on every (re)load, so cached answers can tell the table changed
+        self.version = 0
+        self._mtime: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """(Re)compile the table from the file"""
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding="utf-8") as file:
+            self._automaton = compile_intents(json.load(file))
+        self._mtime = mtime
+        self.version += 1
+
+    def reload_if_changed(self) -> None:
+        """Recompile the table if the file changed, checking at most every reload_seconds"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_seconds:
+                return
+            self._checked_at = now
+            try:
+                if os.stat(self.path).st_mtime != self._mtime:
+                    self._load()
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.exception("Could not reload intents from %s, keeping the previous table", self.path)
+
+    def matches(self, text: str) -> List[IntentMatch]:
+        """Every intent pattern in the text, by position"""
+        self.reload_if_changed()
+        return self._automaton.find(canonical(text))
+
+    def intent(self, text: str) -> Optional[Intent]:
+        """The intent a question is about: the highest priority matched, then the earliest, then the longest"""
+        best = min(
+            self.matches(text),
+            key=lambda match: (-match.intent.priority, match.start, match.start - match.end),
+            default=None,
+        )
+        return best.intent if best is not None else None
+
+
+matcher = IntentMatcher()
@@ -1,12 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import auth, pujas, bookings, payments, admin, pandits, chatbot, consultations
+from starlette.concurrency import run_in_threadpool
+from .database import async_engine
+from . import assignment, catalog, counters, geo, hashing, idempotency, intents, phonetic, recommendations, retrieval, search
+from .routers import auth, pujas, bookings, payments, admin, pandits, chatbot, consultations, suggestions
+import asyncio
 import os
 import razorpay
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Tables are managed by Alembic migrations: run `alembic upgrade head` before starting
 
 app = FastAPI(
     title="Har Ghar Pooja API",
@@ -14,6 +16,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Retried booking and payment POSTs carrying an Idempotency-Key get the first response
+app.add_middleware(idempotency.IdempotencyMiddleware)
+
 # CORS
 origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 app.add_middleware(
@@ -33,6 +38,44 @@ app.include_router(admin.router)
 app.include_router(pandits.router)
 app.include_router(chatbot.router)
 app.include_router(consultations.router)
+app.include_router(suggestions.router)
+
+@app.on_event("startup")
+async def startup():
+    await search.puja_index.load()
+    await phonetic.name_index.load()
+    await geo.pandit_locations.load()
+    await run_in_threadpool(recommendations.recommender.warm)
+    await run_in_threadpool(retrieval.retriever.warm)
+    intents.matcher.load()
+    app.state.index_reloader = None
+    if catalog.CATALOG_TTL_SECONDS > 0:
+        app.state.index_reloader = asyncio.create_task(catalog.reload_periodically(
+            [search.puja_index, phonetic.name_index, geo.pandit_locations]
+        ))
+    app.state.counters_reconciler = None
+    if counters.COUNTERS_RECONCILE_SECONDS > 0:
+        app.state.counters_reconciler = asyncio.create_task(counters.reconcile_periodically())
+    app.state.idempotency_sweeper = None
+    if idempotency.IDEMPOTENCY_SWEEP_SECONDS > 0:
+        app.state.idempotency_sweeper = asyncio.create_task(idempotency.sweep_periodically())
+    app.state.auto_assigner = None
+    if assignment.AUTO_ASSIGN_SECONDS > 0:
+        app.state.auto_assigner = asyncio.create_task(assignment.assign_periodically())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if app.state.index_reloader is not None:
+        app.state.index_reloader.cancel()
+    if app.state.counters_reconciler is not None:
+        app.state.counters_reconciler.cancel()
+    if app.state.idempotency_sweeper is not None:
+        app.state.idempotency_sweeper.cancel()
+    if app.state.auto_assigner is not None:
+        app.state.auto_assigner.cancel()
+    hashing.pool.shutdown()
+    await async_engine.dispose()
 
 @app.get("/")
 def root():
@@ -0,0 +1,45 @@
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """Thread-safe latency summary: totals since start plus percentiles over a recent window"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        """Record one sample in milliseconds"""
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+            self._recent.append(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        """Return a JSON-friendly summary of the recorded samples"""
+        with self._lock:
+            count = self.count
+            total_ms = self.total_ms
+            max_ms = self.max_ms
+            recent = sorted(self._recent)
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            index = min(len(recent) - 1, int(round(p * (len(recent) - 1))))
+            return round(recent[index], 3)
+
+        return {
+            "count": count,
+            "avg_ms": round(total_ms / count, 3) if count else 0.0,
+            "max_ms": round(max_ms, 3),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
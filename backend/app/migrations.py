@@ -0,0 +1,15 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def upgrade_to_head() -> None:
+    """Apply any pending Alembic migrations (same as `alembic upgrade head`)"""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    # Leave the caller's logging configuration alone
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
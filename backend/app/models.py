@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Boolean, Integer, SmallInteger, Float, Date, DateTime, Time, ForeignKey, Enum, Text, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 import enum
@@ -20,6 +20,15 @@ class BookingStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# The statuses a booking may move to from each status
+BOOKING_TRANSITIONS = {
+    BookingStatus.PENDING: frozenset({BookingStatus.CONFIRMED, BookingStatus.CANCELLED}),
+    BookingStatus.CONFIRMED: frozenset({BookingStatus.COMPLETED, BookingStatus.CANCELLED}),
+    BookingStatus.COMPLETED: frozenset(),
+    BookingStatus.CANCELLED: frozenset(),
+}
+
+
 class PaymentStatus(str, enum.Enum):
     PENDING = "pending"
     SUCCESS = "success"
@@ -36,9 +45,10 @@ class User(Base):
     email = Column(String(255), nullable=True)
     hashed_password = Column(String(255), nullable=False)
     role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped on role change to retire old tokens
     city = Column(String(100), nullable=True)
     state = Column(String(100), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -46,6 +56,10 @@ class User(Base):
     bookings = relationship("Booking", foreign_keys="Booking.user_id", back_populates="user")
     consultations_as_user = relationship("Consultation", foreign_keys="Consultation.user_id", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),  # admin user list keyset pages
+    )
+
 
 class Pandit(Base):
     __tablename__ = "pandits"
@@ -54,16 +68,23 @@ class Pandit(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), unique=True, nullable=False)
     city = Column(String(100), nullable=False)
     state = Column(String(100), nullable=False)
+    # Where the pandit is based; the city's centroid unless given exactly
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     photo_url = Column(String(500), nullable=True)
     bio = Column(Text, nullable=True)
     approved = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="pandit_profile")
     bookings = relationship("Booking", back_populates="pandit")
     consultations = relationship("Consultation", foreign_keys="Consultation.pandit_id", back_populates="pandit")
 
+    __table_args__ = (
+        Index("ix_pandits_approved_created_at_id", "approved", "created_at", "id"),  # pandit list keyset pages
+    )
+
 
 class PujaType(Base):
     __tablename__ = "puja_types"
@@ -72,8 +93,10 @@ class PujaType(Base):
     name_local = Column(String(255), nullable=False)  # Hindi name
     name_en = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)  # Short description
-    detailed_description = Column(Text, nullable=True)  # Detailed description for read more
-    benefits = Column(Text, nullable=True)  # Benefits of the puja
+    # The long texts are only needed by the puja detail view, so they are left
+    # out of every other query; undefer_group("details") loads them together
+    detailed_description = deferred(Column(Text, nullable=True), group="details")  # Detailed description for read more
+    benefits = deferred(Column(Text, nullable=True), group="details")  # Benefits of the puja
     image_url = Column(String(500), nullable=True)  # Temple/deity image
     duration_minutes = Column(Integer, nullable=True)  # Duration of puja
     min_price = Column(Float, nullable=False)
@@ -98,7 +121,7 @@ class Booking(Base):
     stream_url = Column(String(500), nullable=True)
     status = Column(Enum(BookingStatus), default=BookingStatus.PENDING, nullable=False)
     price = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -107,6 +130,14 @@ class Booking(Base):
     puja_type = relationship("PujaType", back_populates="bookings")
     payment = relationship("Payment", back_populates="booking", uselist=False)
 
+    __table_args__ = (
+        Index("ix_bookings_user_id_created_at", "user_id", "created_at"),  # my-bookings
+        Index("ix_bookings_pandit_id_created_at_id", "pandit_id", "created_at", "id"),  # keyset pages
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        Index("ix_bookings_pandit_id_scheduled_at", "pandit_id", "scheduled_at"),  # pandit bookings / schedule
+        Index("ix_bookings_status_scheduled_at", "status", "scheduled_at"),  # status queues
+    )
+
 
 class Payment(Base):
     __tablename__ = "payments"
@@ -115,7 +146,7 @@ class Payment(Base):
     booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), unique=True, nullable=False)
     amount = Column(Float, nullable=False)
     provider = Column(String(50), nullable=False)  # razorpay, stripe
-    provider_payment_id = Column(String(255), nullable=True)
+    provider_payment_id = Column(String(255), nullable=True, index=True)  # Razorpay verify/webhook lookups
     status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -140,6 +171,35 @@ class Consultation(Base):
     user = relationship("User", back_populates="consultations_as_user")
     pandit = relationship("Pandit", back_populates="consultations")
 
+    __table_args__ = (
+        Index("ix_consultations_pandit_id_consultation_date", "pandit_id", "consultation_date"),
+    )
+
+
+class PanditWorkingHours(Base):
+    """A window of a weekday in which a pandit takes bookings"""
+    __tablename__ = "pandit_working_hours"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    pandit_id = Column(UUID(as_uuid=True), ForeignKey("pandits.id"), nullable=False, index=True)
+    weekday = Column(SmallInteger, nullable=False)  # 0 = Monday
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+
+class PanditBlockedDate(Base):
+    """A day a pandit takes no bookings"""
+    __tablename__ = "pandit_blocked_dates"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    pandit_id = Column(UUID(as_uuid=True), ForeignKey("pandits.id"), nullable=False)
+    blocked_on = Column(Date, nullable=False)
+    reason = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("pandit_id", "blocked_on", name="uq_pandit_blocked_dates_pandit_id_blocked_on"),
+    )
+
 
 class VirtualSession(Base):
     __tablename__ = "virtual_sessions"
@@ -152,3 +212,41 @@ class VirtualSession(Base):
     puja_type_id = Column(UUID(as_uuid=True), ForeignKey("puja_types.id"), nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AdminCounters(Base):
+    """Running totals behind the admin dashboard, spread over shard rows that are summed on read.
+
+    Kept in step with every ORM write by app.counters and periodically
+    recounted from the source tables to correct any drift (row 0, which
+    holds no counts, records when).
+    """
+    __tablename__ = "admin_counters"
+
+    id = Column(Integer, primary_key=True)
+    total_users = Column(Integer, default=0, nullable=False)
+    total_pandits = Column(Integer, default=0, nullable=False)
+    total_bookings = Column(Integer, default=0, nullable=False)
+    total_revenue = Column(Float, default=0, nullable=False)
+    pending_approvals = Column(Integer, default=0, nullable=False)
+    active_virtual_sessions = Column(Integer, default=0, nullable=False)
+    reconciled_at = Column(DateTime, nullable=True)
+
+
+class IdempotencyKey(Base):
+    """The first response to a request sent with an Idempotency-Key header, replayed to retries"""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner = Column(String(64), nullable=False)  # the user the key belongs to
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of method, path and body
+    status_code = Column(Integer, nullable=True)  # None while the first request is running
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(Text, nullable=True)
+    locked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("owner", "key", name="uq_idempotency_keys_owner_key"),
+    )
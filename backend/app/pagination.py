@@ -0,0 +1,71 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque cursor for the position just after (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError("Invalid cursor") from error
+
+
+@dataclass(frozen=True)
+class PageParams:
+    """Decoded ``cursor`` and ``limit`` query parameters"""
+    limit: int = DEFAULT_PAGE_SIZE
+    after: Optional[Tuple[datetime, UUID]] = None
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    """Dependency for paginated list endpoints"""
+    if cursor is None:
+        return PageParams(limit=limit)
+    try:
+        return PageParams(limit=limit, after=decode_cursor(cursor))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset(query: Select, model: Any, page: PageParams) -> Select:
+    """Newest first on (created_at, id), starting after the page cursor.
+
+    Fetches one extra row so page_of can tell whether another page exists.
+    """
+    if page.after is not None:
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*page.after))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(page.limit + 1)
+
+
+def page_of(rows: List[Any], page: PageParams) -> dict:
+    """Page envelope for rows fetched with keyset()"""
+    items = list(rows[:page.limit])
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": items, "next_cursor": next_cursor}
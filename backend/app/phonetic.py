@@ -0,0 +1,349 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from heapq import merge, nlargest
+from operator import itemgetter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from . import async_crud
+from .database import AsyncSessionLocal
+
+# A match must share at least this fraction of the query's trigrams
+MIN_CONTAINMENT = 0.4
+# Prefix lookups for keys up to this long read precomputed buckets, and
+# such short queries are not matched fuzzily
+SHORT_KEY = 3
+
+# Honorifics that prefix pandit names without identifying anyone
+HONORIFICS = frozenset("pandit pt acharya shri sri pundit पंडित पण्डित आचार्य श्री".split())
+
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ii", "उ": "u", "ऊ": "uu", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+}
+_VOWEL_SIGNS = {
+    "ा": "aa", "ि": "i", "ी": "ii", "ु": "u", "ू": "uu", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "ळ": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}
+_NASALS = {"ं": "n", "ँ": "n", "ः": "h"}
+_VIRAMA = "्"
+_NUKTA = "़"
+
+# Romanized spellings vary in vowel length, aspiration and a handful of
+# interchangeable letters; these reduce them to one spelling, in order
+_FOLDS = [
+    (re.compile(r"aa"), "a"), (re.compile(r"ee|ii"), "i"), (re.compile(r"oo|uu"), "u"),
+    (re.compile(r"ai"), "e"), (re.compile(r"au|ou"), "o"),
+    (re.compile(r"([bcdgjkpst])h+"), r"\1"),  # aspirates, and sh/ch/chh
+    (re.compile(r"f"), "p"), (re.compile(r"z"), "j"), (re.compile(r"q"), "k"),
+    (re.compile(r"w"), "v"), (re.compile(r"x"), "ks"), (re.compile(r"m(?=[pb])"), "n"),
+    # Schwa is written or dropped at will ("shiv"/"shiva", "navgraha"/"navagraha")
+    (re.compile(r"a"), ""),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+# Words in either script (Devanagari vowel signs and virama are combining
+# marks, which \w alone would split words on)
+_WORD = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+_LATIN = re.compile(r"[^a-z0-9]+")
+
+
+def transliterate(text: str) -> str:
+    """Devanagari spelled out in Latin letters (inherent vowels included); other text unchanged"""
+    text = unicodedata.normalize("NFD", text).replace(_NUKTA, "")
+    out = []
+    pending_vowel = False
+    for char in text:
+        if char in _VOWEL_SIGNS:
+            out.append(_VOWEL_SIGNS[char])
+            pending_vowel = False
+            continue
+        if char == _VIRAMA:
+            pending_vowel = False
+            continue
+        if pending_vowel:
+            out.append("a")
+            pending_vowel = False
+        if char in _CONSONANTS:
+            out.append(_CONSONANTS[char])
+            pending_vowel = True
+        elif char in _VOWELS:
+            out.append(_VOWELS[char])
+        elif char in _NASALS:
+            out.append(_NASALS[char])
+        else:
+            out.append(char)
+    if pending_vowel:
+        out.append("a")
+    return "".join(out)
+
+
+def phonetic_key(text: str) -> str:
+    """Spelling-independent key shared by Hindi and romanized forms of a name.
+
+    Spaces are dropped too, so "rudra abhishek", "rudrabhishek" and
+    "रुद्राभिषेक" all reduce to the same key.
+    """
+    words = _WORD.findall(unicodedata.normalize("NFC", text).casefold())
+    spelled = transliterate("".join(word for word in words if word not in HONORIFICS))
+    key = _LATIN.sub("", spelled)
+    for pattern, replacement in _FOLDS:
+        key = pattern.sub(replacement, key)
+    return key
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    """Trigrams of a key, padded at the start so that leading letters weigh more"""
+    padded = "$$" + key
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class NameEntry:
+    kind: str  # "puja" or "pandit"
+    id: str
+    name: str
+    name_local: Optional[str] = None
+
+
+class NameIndex:
+    """Trigram index over phonetic keys of puja and pandit names.
+
+    Every spelling of a name (English and Hindi) is indexed as its own
+    variant, and an entry scores as its best variant: the average of
+    containment (how much of the typed text matched, so partial input ranks
+    well) and Dice similarity (how close the whole name is).
+
+    Names whose key starts with the typed key rank first; these are read
+    from sorted structures, shortest first, without scoring the rest. Only
+    when they do not fill the list are fuzzy trigram matches scored.
+
+    Process-local like the other indexes: admin writes update the worker
+    that handled them, the others catch up on the periodic reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Writes applied in this process, so a reload cannot undo one it did not see
+        self._writes = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._entries: Dict[Tuple[str, str], NameEntry] = {}
+        self._entry_variants: Dict[Tuple[str, str], List[int]] = {}
+        self._variant_entry: Dict[int, Tuple[str, str]] = {}
+        self._variant_keys: Dict[int, str] = {}
+        self._variant_grams: Dict[int, FrozenSet[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        # (kind, key prefix up to SHORT_KEY letters) -> [(trigram count, name, variant)]
+        self._prefixes: Dict[Tuple[str, str], List[Tuple[int, str, int]]] = {}
+        # kind -> [(key, variant)], for prefixes longer than SHORT_KEY
+        self._keys: Dict[str, List[Tuple[str, int]]] = {}
+        self._next_variant = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def load(self) -> None:
+        """(Re)build the index from the puja types and approved pandits in the database"""
+        writes = self._writes
+        db = AsyncSessionLocal()
+        try:
+            pujas = await async_crud.get_all_puja_types(db)
+            pandits = await async_crud.get_approved_pandits(db)
+        finally:
+            await db.close()
+        with self._lock:
+            if writes != self._writes:
+                # Newer than what was read; the next reload has it
+                return
+            self._clear()
+            for puja in pujas:
+                self._add(puja_entry(puja), (puja.name_en, puja.name_local))
+            for pandit in pandits:
+                self._add(pandit_entry(pandit), (pandit.user.name,))
+
+    def add_puja(self, puja) -> None:
+        with self._lock:
+            self._writes += 1
+            self._add(puja_entry(puja), (puja.name_en, puja.name_local))
+
+    def add_pandit(self, pandit) -> None:
+        with self._lock:
+            self._writes += 1
+            self._add(pandit_entry(pandit), (pandit.user.name,))
+
+    def remove(self, kind: str, entry_id) -> None:
+        with self._lock:
+            self._writes += 1
+            self._remove((kind, str(entry_id)))
+
+    def _add(self, entry: NameEntry, names: Iterable[Optional[str]]) -> None:
+        key = (entry.kind, entry.id)
+        self._remove(key)
+        phonetics = []
+        for name in names:
+            phonetic = phonetic_key(name or "")
+            if phonetic and phonetic not in phonetics:
+                phonetics.append(phonetic)
+        if not phonetics:
+            return
+        self._entries[key] = entry
+        self._entry_variants[key] = []
+        for phonetic in phonetics:
+            variant = self._next_variant
+            self._next_variant += 1
+            grams = trigrams(phonetic)
+            self._entry_variants[key].append(variant)
+            self._variant_entry[variant] = key
+            self._variant_keys[variant] = phonetic
+            self._variant_grams[variant] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(variant)
+            for size in range(1, min(SHORT_KEY, len(phonetic)) + 1):
+                bucket = self._prefixes.setdefault((entry.kind, phonetic[:size]), [])
+                insort(bucket, (len(grams), entry.name, variant))
+            insort(self._keys.setdefault(entry.kind, []), (phonetic, variant))
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        variants = self._entry_variants.pop(key, None)
+        if variants is None:
+            return
+        entry = self._entries.pop(key)
+        for variant in variants:
+            del self._variant_entry[variant]
+            phonetic = self._variant_keys.pop(variant)
+            grams = self._variant_grams.pop(variant)
+            for gram in grams:
+                postings = self._postings[gram]
+                postings.discard(variant)
+                if not postings:
+                    del self._postings[gram]
+            for size in range(1, min(SHORT_KEY, len(phonetic)) + 1):
+                bucket_key = (entry.kind, phonetic[:size])
+                bucket = self._prefixes[bucket_key]
+                del bucket[bisect_left(bucket, (len(grams), entry.name, variant))]
+                if not bucket:
+                    del self._prefixes[bucket_key]
+            keys = self._keys[entry.kind]
+            del keys[bisect_left(keys, (phonetic, variant))]
+
+    def suggest(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Tuple[NameEntry, float]]:
+        """Best-matching names for (possibly partial, any-script) typed input"""
+        phonetic = phonetic_key(query)
+        if not phonetic:
+            return []
+        return self._ranked(phonetic, limit, (kind,) if kind else ("puja", "pandit"), MIN_CONTAINMENT)
+
+    def _ranked(self, phonetic: str, limit: int, kinds, min_containment: float) -> List[Tuple[NameEntry, float]]:
+        grams = trigrams(phonetic)
+        by_rank = lambda item: (-item[1], self._entries[item[0]].name)
+        with self._lock:
+            prefixed = self._prefix_matches(phonetic, len(grams), kinds, limit)
+            ranked = sorted(prefixed.items(), key=by_rank)
+            # Keys this short share too few trigrams for fuzzy matches to mean much
+            if len(ranked) < limit and len(phonetic) > SHORT_KEY:
+                fuzzy = self._trigram_matches(grams, kinds, min_containment)
+                rest = [(key, score) for key, score in fuzzy.items() if key not in prefixed]
+                ranked += sorted(nlargest(limit - len(ranked), rest, key=itemgetter(1)), key=by_rank)
+            return [(self._entries[key], score) for key, score in ranked]
+
+    def _prefix_matches(self, phonetic: str, size: int, kinds, limit) -> Dict[Tuple[str, str], float]:
+        # A key starting with the query contains all of its trigrams, so
+        # fewer trigrams of its own means a higher score
+        if len(phonetic) <= SHORT_KEY:
+            matches = merge(*(self._prefixes.get((kind, phonetic), ()) for kind in kinds))
+        else:
+            found = []
+            for kind in kinds:
+                keys = self._keys.get(kind, [])
+                for position in range(bisect_left(keys, (phonetic,)), len(keys)):
+                    key, variant = keys[position]
+                    if not key.startswith(phonetic):
+                        break
+                    found.append((len(self._variant_grams[variant]), self._entries[self._variant_entry[variant]].name, variant))
+            matches = sorted(found)
+        best: Dict[Tuple[str, str], float] = {}
+        for variant_size, _, variant in matches:
+            key = self._variant_entry[variant]
+            if key not in best:
+                best[key] = (1 + 2 * size / (size + variant_size)) / 2
+                if len(best) == limit:
+                    break
+        return best
+
+    def _trigram_matches(self, grams, kinds, min_containment: float) -> Dict[Tuple[str, str], float]:
+        needed = max(2, math.ceil(min_containment * len(grams)))
+        # A variant missing at most len - needed of the query's grams shares
+        # at least two of its len - needed + 2 rarest ones (grams no name has
+        # count as rarest), so candidates are the pairwise intersections of
+        # those postings: set operations, which skip most of the common grams
+        present = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+        scanned = present[:len(present) - needed + 2]
+        candidates = set()
+        for first in range(len(scanned)):
+            for second in range(first + 1, len(scanned)):
+                candidates |= scanned[first] & scanned[second]
+        size = len(grams)
+        variant_entry, variant_grams = self._variant_entry, self._variant_grams
+        best: Dict[Tuple[str, str], float] = {}
+        for variant in candidates:
+            other = variant_grams[variant]
+            common = len(grams & other)
+            if common < needed:
+                continue
+            key = variant_entry[variant]
+            if key[0] not in kinds:
+                continue
+            score = (common / size + 2 * common / (size + len(other))) / 2
+            if score > best.get(key, 0.0):
+                best[key] = score
+        return best
+
+    def mentions(self, text: str, kind: str, min_score: float = 0.75, limit: int = 3) -> List[NameEntry]:
+        """Entries whose name appears in free text, spelled any way (one- and two-word spans)"""
+        words = _WORD.findall(unicodedata.normalize("NFC", text))
+        spans = [" ".join(words[i:i + size]) for size in (2, 1) for i in range(len(words) - size + 1)]
+        # Fuzzy candidates sharing too few trigrams to reach min_score are never scored
+        min_containment = max(MIN_CONTAINMENT, containment_for(min_score))
+        found: Dict[NameEntry, float] = {}
+        for span in spans:
+            phonetic = phonetic_key(span)
+            if len(phonetic) <= SHORT_KEY:
+                continue
+            for entry, score in self._ranked(phonetic, 1, (kind,), min_containment):
+                if score >= min_score and score > found.get(entry, 0.0):
+                    found[entry] = score
+        return sorted(found, key=found.get, reverse=True)[:limit]
+
+
+def containment_for(score: float) -> float:
+    """Least containment r with which a fuzzy match can reach score.
+
+    Dice similarity is at most 2r / (1 + r) (the name being no longer than
+    the shared trigrams), so this is the root of r + 2r / (1 + r) = 2 * score.
+    """
+    b = 3 - 2 * score
+    return (-b + math.sqrt(b * b + 8 * score)) / 2
+
+
+def puja_entry(puja) -> NameEntry:
+    return NameEntry(kind="puja", id=str(puja.id), name=puja.name_en, name_local=puja.name_local)
+
+
+def pandit_entry(pandit) -> NameEntry:
+    return NameEntry(kind="pandit", id=str(pandit.id), name=pandit.user.name)
+
+
+name_index = NameIndex()
@@ -0,0 +1,166 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from . import crud
+from .database import SessionLocal
+from .search import puja_index
+
+# How long booking popularity may go unrefreshed; catalog writes invalidate at once
+RECOMMENDATIONS_TTL_SECONDS = float(os.getenv("RECOMMENDATIONS_TTL_SECONDS", "300"))
+
+RECOMMENDATION_LIMIT = 5
+# Share of the ranking score from matching the purpose; the rest is popularity
+PURPOSE_WEIGHT = 0.7
+
+
+@dataclass(frozen=True)
+class PricedPuja:
+    id: UUID
+    name_local: str
+    min_price: float
+    max_price: float  # max_price, or default_price where no maximum is set
+    default_price: float
+
+
+@dataclass
+class PriceIndex:
+    """Pujas sorted by the low and high ends of their price range, for bisect range queries"""
+    pujas: List[PricedPuja]
+    popularity: Dict[UUID, int]
+    loaded_at: float
+
+    def __post_init__(self):
+        by_min = sorted(range(len(self.pujas)), key=lambda i: (self.pujas[i].min_price, str(self.pujas[i].id)))
+        by_max = sorted(range(len(self.pujas)), key=lambda i: (self.pujas[i].max_price, str(self.pujas[i].id)))
+        self._by_min = by_min
+        self._mins = [self.pujas[i].min_price for i in by_min]
+        self._by_max = by_max
+        self._maxes = [self.pujas[i].max_price for i in by_max]
+        # Each puja's position in the two orders, so either slice can be tested against the other
+        self._min_rank = [0] * len(self.pujas)
+        self._max_rank = [0] * len(self.pujas)
+        for rank, i in enumerate(by_min):
+            self._min_rank[i] = rank
+        for rank, i in enumerate(by_max):
+            self._max_rank[i] = rank
+
+    def within(self, budget_min: Optional[float], budget_max: Optional[float]) -> List[PricedPuja]:
+        """Pujas whose price range overlaps the budget, cheapest minimum first.
+
+        Those starting at or below the budget's top are a prefix of the
+        min-price order, those reaching at least its bottom a suffix of the
+        max-price order; only the shorter of the two is walked.
+        """
+        end = len(self.pujas) if budget_max is None else bisect_right(self._mins, budget_max)
+        start = 0 if budget_min is None else bisect_left(self._maxes, budget_min)
+        if end <= len(self.pujas) - start:
+            matches = [i for i in self._by_min[:end] if self._max_rank[i] >= start]
+        else:
+            matches = sorted(
+                (i for i in self._by_max[start:] if self._min_rank[i] < end), key=self._min_rank.__getitem__
+            )
+        return [self.pujas[i] for i in matches]
+
+
+def estimate_price(puja: PricedPuja, budget_min: Optional[float], budget_max: Optional[float]) -> float:
+    """The default price, moved into the budget where the puja's range allows"""
+    low = max(puja.min_price, budget_min) if budget_min is not None else puja.min_price
+    high = min(puja.max_price, budget_max) if budget_max is not None else puja.max_price
+    return min(max(puja.default_price, low), high)
+
+
+class Recommender:
+    """Ranks pujas in a budget by purpose match (BM25 over the search index) and popularity.
+
+    The price index and booking counts are loaded once and kept until a
+    catalog write invalidates them or they are RECOMMENDATIONS_TTL_SECONDS old.
+    """
+
+    def __init__(self, ttl: float = RECOMMENDATIONS_TTL_SECONDS):
+        self.ttl = ttl
+        self._index: Optional[PriceIndex] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    def warm(self) -> None:
+        """Load the index ahead of the first request"""
+        db = SessionLocal()
+        try:
+            self.index(db)
+        finally:
+            db.close()
+
+    def index(self, db: Session) -> PriceIndex:
+        index = self._index
+        if index is not None and time.monotonic() - index.loaded_at <= self.ttl:
+            return index
+        with self._lock:
+            index = self._index
+            if index is None or time.monotonic() - index.loaded_at > self.ttl:
+                index = self._index = load_price_index(db)
+        return index
+
+    def recommend(
+        self,
+        db: Session,
+        purpose: str,
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        limit: int = RECOMMENDATION_LIMIT
+    ) -> List[dict]:
+        """Best pujas for a purpose within a budget, in a deterministic order"""
+        index = self.index(db)
+        candidates = index.within(budget_min, budget_max)
+        relevance = puja_index.relevance(purpose)
+        top_relevance = max((relevance.get(str(puja.id), 0.0) for puja in candidates), default=0.0)
+        top_bookings = max((index.popularity.get(puja.id, 0) for puja in candidates), default=0)
+
+        def rank(puja: PricedPuja) -> Tuple[float, float, str]:
+            match = relevance.get(str(puja.id), 0.0) / top_relevance if top_relevance else 0.0
+            bookings = index.popularity.get(puja.id, 0)
+            popular = math.log1p(bookings) / math.log1p(top_bookings) if top_bookings else 0.0
+            score = PURPOSE_WEIGHT * match + (1 - PURPOSE_WEIGHT) * popular
+            return -round(score, 9), puja.default_price, str(puja.id)
+
+        recommendations = []
+        for puja in sorted(candidates, key=rank)[:limit]:
+            if relevance.get(str(puja.id)):
+                reason = f"Recommended for {purpose}"
+            elif index.popularity.get(puja.id):
+                reason = "Popular with devotees and within your budget"
+            else:
+                reason = "Within your budget"
+            recommendations.append({
+                "puja_type": puja.name_local,
+                "puja_type_id": puja.id,
+                "reason": reason,
+                "estimated_price": estimate_price(puja, budget_min, budget_max),
+            })
+        return recommendations
+
+
+def load_price_index(db: Session) -> PriceIndex:
+    pujas = [
+        PricedPuja(
+            id=puja.id,
+            name_local=puja.name_local,
+            min_price=puja.min_price,
+            max_price=max(puja.max_price if puja.max_price is not None else puja.default_price, puja.min_price),
+            default_price=puja.default_price,
+        )
+        for puja in crud.get_all_puja_types(db)
+    ]
+    return PriceIndex(pujas=pujas, popularity=crud.get_booking_counts(db), loaded_at=time.monotonic())
+
+
+recommender = Recommender()
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import crud
+from .catalog import CATALOG_TTL_SECONDS, puja_catalog
+from .database import SessionLocal
+from .search import tokenize
+
+FAQ_PATH = os.getenv("FAQ_PATH", os.path.join(os.path.dirname(__file__), "data", "faq.json"))
+
+# Cosine similarity a FAQ entry needs before its answer is given...
+FAQ_MIN_SCORE = 0.25
+# ...and a puja before it is suggested
+PUJA_MIN_SCORE = 0.1
+SUGGESTION_LIMIT = 3
+
+
+@dataclass(frozen=True)
+class FaqEntry:
+    question: str
+    answer: str
+    tags: str = ""
+
+
+@dataclass(frozen=True)
+class PujaDocument:
+    id: str
+    name: str
+
+
+class TfidfMatrix:
+    """L2-normalized TF-IDF document vectors, stored column by column (CSC).
+
+    Term t's nonzeros are rows[indptr[t]:indptr[t + 1]], with their weights at
+    the same positions, so scoring a query only touches its own terms' columns.
+    """
+
+    def __init__(self, documents: Sequence[List[str]]):
+        self.n_docs = len(documents)
+        self.vocabulary: Dict[str, int] = {}
+        doc_ids, term_ids, counts = [], [], []
+        for doc, tokens in enumerate(documents):
+            for term, count in Counter(tokens).items():
+                doc_ids.append(doc)
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+        rows = np.array(doc_ids, dtype=np.int32)
+        columns = np.array(term_ids, dtype=np.int32)
+        df = np.bincount(columns, minlength=len(self.vocabulary))
+        # Smoothed idf and sublinear tf
+        self.idf = (np.log((1 + self.n_docs) / (1 + df)) + 1).astype(np.float32)
+        weights = (1 + np.log(np.array(counts, dtype=np.float32))) * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=self.n_docs))
+        weights = weights / norms[rows]
+        order = np.argsort(columns, kind="stable")
+        self.rows = rows[order]
+        self.weights = weights[order].astype(np.float32)
+        self.indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+
+    def scores(self, tokens: List[str]) -> np.ndarray:
+        """Cosine similarity of a tokenized query to every document"""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        counts = Counter(term for term in tokens if term in self.vocabulary)
+        if not counts:
+            return scores
+        columns = [self.vocabulary[term] for term in counts]
+        query = (1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))) * self.idf[columns]
+        query /= np.sqrt(query @ query)
+        for column, weight in zip(columns, query):
+            start, end = self.indptr[column], self.indptr[column + 1]
+            # A column holds each document at most once, so fancy-index += is safe
+            scores[self.rows[start:end]] += weight * self.weights[start:end]
+        return scores
+
+
+def top_k(scores: np.ndarray, k: int, min_score: float) -> List[Tuple[int, float]]:
+    """Positions of the k best scores of at least min_score, best first"""
+    candidates = np.flatnonzero(scores >= min_score)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [(int(position), float(scores[position])) for position in candidates]
+
+
+@dataclass
+class RetrievalIndex:
+    """The FAQ entries (rows first) and puja types (after them) of one matrix"""
+    faqs: List[FaqEntry]
+    pujas: List[PujaDocument]
+    matrix: TfidfMatrix
+    version: int
+    loaded_at: float
+
+    def retrieve(self, question: str, limit: int = SUGGESTION_LIMIT):
+        """The best FAQ entry and pujas for a question, each with its similarity"""
+        scores = self.matrix.scores(tokenize(question))
+        faq_scores, puja_scores = scores[:len(self.faqs)], scores[len(self.faqs):]
+        faq = next(((self.faqs[i], score) for i, score in top_k(faq_scores, 1, FAQ_MIN_SCORE)), None)
+        pujas = [(self.pujas[i], score) for i, score in top_k(puja_scores, limit, PUJA_MIN_SCORE)]
+        return faq, pujas
+
+
+def load_faq(path: str = FAQ_PATH) -> List[FaqEntry]:
+    with open(path, encoding="utf-8") as file:
+        return [FaqEntry(**entry) for entry in json.load(file)]
+
+
+def build_index(faqs: List[FaqEntry], pujas, version: int = 0) -> RetrievalIndex:
+    documents = [tokenize(f"{faq.question} {faq.tags} {faq.answer}") for faq in faqs]
+    puja_documents = []
+    for puja in pujas:
+        documents.append(tokenize(" ".join(
+            text for text in (puja.name_en, puja.name_local, puja.description, puja.benefits) if text
+        )))
+        puja_documents.append(PujaDocument(id=str(puja.id), name=puja.name_local or puja.name_en))
+    return RetrievalIndex(
+        faqs=faqs,
+        pujas=puja_documents,
+        matrix=TfidfMatrix(documents),
+        version=version,
+        loaded_at=time.monotonic(),
+    )
+
+
+class Retriever:
+    """Answers chatbot questions from the FAQ corpus and the puja catalog.
+
+    The matrix is rebuilt on first use after the catalog version moves on
+    (an admin edit in this process) or CATALOG_TTL_SECONDS have passed.
+    """
+
+    def __init__(self, faq_path: str = FAQ_PATH, ttl: float = CATALOG_TTL_SECONDS):
+        self.faq_path = faq_path
+        self.ttl = ttl
+        self._index: Optional[RetrievalIndex] = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, index: Optional[RetrievalIndex]) -> bool:
+        return (
+            index is not None
+            and index.version == puja_catalog.version
+            and time.monotonic() - index.loaded_at <= self.ttl
+        )
+
+    def warm(self) -> None:
+        """Build the matrix ahead of the first question"""
+        self.index()
+
+    def index(self) -> RetrievalIndex:
+        """The current matrix; a session is only opened when it must be rebuilt"""
+        index = self._index
+        if self._fresh(index):
+            return index
+        with self._lock:
+            index = self._index
+            if not self._fresh(index):
+                # Read the version first: a write landing mid-build triggers another
+                version = puja_catalog.version
+                db = SessionLocal()
+                try:
+                    pujas = crud.get_all_puja_types(db, with_details=True)
+                finally:
+                    db.close()
+                index = self._index = build_index(load_faq(self.faq_path), pujas, version)
+        return index
+
+
+retriever = Retriever()
@@ -1,28 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
 from uuid import UUID
-from .. import schemas, crud, auth, models
-from ..database import get_db
+from .. import schemas, crud, async_crud, auth, models, events, hashing, idempotency
+from ..answers import answer_cache
+from ..assignment import auto_assign
+from ..catalog import puja_catalog
+from ..database import get_db, get_async_db, get_pool_status, pin_reads_to_primary
+from ..geo import pandit_locations
+from ..pagination import PageParams, page_params
+from ..phonetic import name_index
+from ..recommendations import recommender
+from ..search import puja_index
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 
-@router.post("/pujas", response_model=schemas.PujaTypeResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/pujas",
+    response_model=schemas.PujaTypeResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def create_puja(
     puja: schemas.PujaTypeCreate,
-    current_user: models.User = Depends(auth.get_current_admin),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
     """Create a new puja type (Admin only)"""
-    return crud.create_puja_type(db, puja)
-
-
-@router.patch("/pujas/{puja_id}", response_model=schemas.PujaTypeResponse)
+    new_puja = crud.create_puja_type(db, puja)
+    puja_catalog.invalidate()
+    recommender.invalidate()
+    puja_index.upsert(new_puja)
+    name_index.add_puja(new_puja)
+    return new_puja
+
+
+@router.patch(
+    "/pujas/{puja_id}",
+    response_model=schemas.PujaTypeResponse,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def update_puja(
     puja_id: UUID,
     puja_update: schemas.PujaTypeUpdate,
-    current_user: models.User = Depends(auth.get_current_admin),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
     """Update a puja type (Admin only)"""
@@ -32,74 +55,147 @@ def update_puja(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Puja type not found"
         )
+    puja_catalog.invalidate()
+    recommender.invalidate()
+    puja_index.upsert(puja)
+    name_index.add_puja(puja)
     return puja
 
 
-@router.get("/pandits", response_model=List[schemas.PanditResponse])
+@router.get("/pandits", response_model=schemas.Page[schemas.PanditResponse])
 def get_all_pandits(
-    current_user: models.User = Depends(auth.get_current_admin),
+    page: PageParams = Depends(page_params),
+    filters: schemas.PanditFilters = Depends(),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
-    """Get all pandits including unapproved (Admin only)"""
-    return crud.get_all_pandits(db, approved_only=False)
+    """Get all pandits including unapproved, newest first (Admin only)"""
+    return crud.get_all_pandits(db, page, filters, approved_only=False)
 
 
 @router.patch("/pandits/{pandit_id}/approve", response_model=schemas.PanditResponse)
 def approve_pandit(
     pandit_id: UUID,
     approval: schemas.PanditApproval,
-    current_user: models.User = Depends(auth.get_current_admin),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
     """Approve or reject a pandit (Admin only)"""
     pandit = crud.approve_pandit(db, pandit_id, approval.approved)
     if not pandit:
+        if not crud.get_pandit_by_id(db, pandit_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Pandit not found"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Pandit not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Pandit is already approved" if approval.approved else "Pandit is already not approved"
         )
     
-    # Update user role to pandit if approved
-    if approval.approved:
-        user = crud.get_user_by_id(db, pandit.user_id)
-        if user:
-            user.role = models.UserRole.PANDIT
-            db.commit()
-    
+    # Update user role to pandit if approved, back to user if revoked
+    new_role = models.UserRole.PANDIT if approval.approved else models.UserRole.USER
+    user = crud.get_user_by_id(db, pandit.user_id)
+    if user and user.role != new_role and user.role != models.UserRole.ADMIN:
+        user.role = new_role
+        # Retire access tokens carrying the old role claim
+        user.token_version = (user.token_version or 0) + 1
+        db.commit()
+        auth.invalidate_cached_user(user.phone, user.token_version)
+
+    # Only approved pandits are suggested to devotees
+    if pandit.approved:
+        name_index.add_pandit(pandit)
+    else:
+        name_index.remove("pandit", pandit.id)
+    pandit_locations.update(pandit)
     return pandit
 
 
 @router.get("/stats", response_model=schemas.AdminStats)
-def get_admin_stats(
-    current_user: models.User = Depends(auth.get_current_admin),
-    db: Session = Depends(get_db)
+async def get_admin_stats(
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get admin dashboard statistics"""
-    return crud.get_admin_stats(db)
+    return await async_crud.get_admin_stats(db)
+
+
+@router.get("/metrics/hashing", response_model=schemas.HashingMetrics)
+def get_hashing_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Password hashing pool occupancy and latency (Admin only)"""
+    return hashing.pool.metrics()
+
+
+@router.get("/metrics/user-cache", response_model=schemas.CacheStats)
+def get_user_cache_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Authenticated-user cache hit/miss counters (Admin only)"""
+    return auth.user_cache.stats()
+
+
+@router.get("/metrics/chatbot-cache", response_model=schemas.CacheStats)
+def get_chatbot_cache_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Chatbot answer cache hit/miss counters (Admin only)"""
+    return answer_cache.stats()
 
 
-@router.get("/bookings", response_model=List[schemas.BookingResponse])
+@router.get("/metrics/idempotency-cache", response_model=schemas.CacheStats)
+def get_idempotency_cache_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Cached idempotent responses hit/miss counters (Admin only)"""
+    return idempotency.store.stats()
+
+
+@router.get("/metrics/booking-streams", response_model=schemas.BookingStreamStats)
+def get_booking_stream_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Open booking event streams on this worker and events delivered or dropped (Admin only)"""
+    return events.hub.stats()
+
+
+@router.get("/metrics/db-pool", response_model=Dict[str, schemas.DbPoolMetrics])
+def get_db_pool_metrics(current_user: auth.TokenClaims = Depends(auth.get_admin_claims)):
+    """Database connection pool occupancy and wait times (Admin only)"""
+    return get_pool_status()
+
+
+@router.get("/bookings", response_model=schemas.Page[schemas.BookingResponse])
 def get_all_bookings(
-    current_user: models.User = Depends(auth.get_current_admin),
+    page: PageParams = Depends(page_params),
+    filters: schemas.BookingFilters = Depends(),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
+    db: Session = Depends(get_db)
+):
+    """Get all bookings, newest first (Admin only)"""
+    return crud.get_all_bookings(db, page, filters)
+
+
+@router.post(
+    "/bookings/auto-assign",
+    response_model=schemas.AutoAssignReport,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
+def auto_assign_bookings(
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
-    """Get all bookings (Admin only)"""
-    return crud.get_all_bookings(db)
+    """Assign pandits to pending bookings that have none, by city, availability, puja type and load (Admin only)"""
+    return auto_assign(db)
 
 
-@router.get("/users", response_model=List[schemas.UserResponse])
+@router.get("/users", response_model=schemas.Page[schemas.UserResponse])
 def get_all_users(
-    current_user: models.User = Depends(auth.get_current_admin),
+    page: PageParams = Depends(page_params),
+    filters: schemas.UserFilters = Depends(),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
-    """Get all users (Admin only)"""
-    return crud.get_all_users(db)
+    """Get all users, newest first (Admin only)"""
+    return crud.get_all_users(db, page, filters)
 
 
 @router.post("/virtual-sessions", response_model=schemas.VirtualSessionResponse, status_code=status.HTTP_201_CREATED)
 def create_virtual_session(
     session: schemas.VirtualSessionCreate,
-    current_user: models.User = Depends(auth.get_current_admin),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
     """Create a virtual puja session (Admin only)"""
@@ -108,7 +204,7 @@ def create_virtual_session(
 
 @router.get("/virtual-sessions", response_model=List[schemas.VirtualSessionResponse])
 def get_virtual_sessions(
-    current_user: models.User = Depends(auth.get_current_admin),
+    current_user: auth.TokenClaims = Depends(auth.get_admin_claims),
     db: Session = Depends(get_db)
 ):
     """Get all virtual sessions (Admin only)"""
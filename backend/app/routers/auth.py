@@ -1,27 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from .. import schemas, crud, auth, models
+from .. import schemas, crud, auth, models, hashing
 from ..database import get_db
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=schemas.Token, status_code=status.HTTP_201_CREATED)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = crud.get_user_by_phone(db, phone=user.phone)
+    db_user = await run_in_threadpool(crud.get_user_by_phone, db, phone=user.phone)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already registered"
         )
     
-    # Create user
-    new_user = crud.create_user(db=db, user=user)
+    # Hash on the hashing pool, then create user
+    hashed_password = await hashing.get_password_hash_async(user.password)
+    new_user = await run_in_threadpool(
+        crud.create_user, db=db, user=user, hashed_password=hashed_password
+    )
     
     # Generate tokens
-    access_token = auth.create_access_token(data={"sub": new_user.phone})
+    access_token = auth.create_access_token(data={"sub": new_user.phone}, user=new_user)
     refresh_token = auth.create_refresh_token(data={"sub": new_user.phone})
     
     return {
@@ -33,9 +37,9 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(user_credentials: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: schemas.UserLogin, db: Session = Depends(get_db)):
     """Login user"""
-    user = auth.authenticate_user(db, user_credentials.phone, user_credentials.password)
+    user = await auth.authenticate_user_async(db, user_credentials.phone, user_credentials.password)
     
     if not user:
         raise HTTPException(
@@ -45,7 +49,7 @@ def login(user_credentials: schemas.UserLogin, db: Session = Depends(get_db)):
         )
     
     # Generate tokens
-    access_token = auth.create_access_token(data={"sub": user.phone})
+    access_token = auth.create_access_token(data={"sub": user.phone}, user=user)
     refresh_token = auth.create_refresh_token(data={"sub": user.phone})
     
     return {
@@ -78,7 +82,7 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         )
     
     # Generate new tokens
-    new_access_token = auth.create_access_token(data={"sub": user.phone})
+    new_access_token = auth.create_access_token(data={"sub": user.phone}, user=user)
     new_refresh_token = auth.create_refresh_token(data={"sub": user.phone})
     
     return {
@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
 from uuid import UUID
-from .. import schemas, crud, auth, models
-from ..database import get_db
+from .. import schemas, crud, async_crud, auth, models, availability, events
+from ..database import SessionLocal, get_db, get_async_read_db, pin_reads_to_primary
+from ..pagination import PageParams, page_params
 
 router = APIRouter(prefix="/api/bookings", tags=["Bookings"])
 
 
-@router.post("", response_model=schemas.BookingResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=schemas.BookingResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def create_booking(
     booking: schemas.BookingCreate,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Create a new booking"""
@@ -36,25 +44,49 @@ def create_booking(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Pandit is not approved"
             )
+        # Held until the booking is committed, so concurrent requests cannot double-book
+        availability.reserve(db, pandit.id, *availability.booking_interval(booking.scheduled_at, puja.duration_minutes))
     
     # Create booking
     new_booking = crud.create_booking(db, current_user.id, booking)
+    events.publish_booking(new_booking)
     return new_booking
 
 
-@router.get("/my-bookings", response_model=List[schemas.BookingResponse])
-def get_my_bookings(
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/my-bookings", response_model=schemas.Page[schemas.BookingResponse])
+async def get_my_bookings(
+    page: PageParams = Depends(page_params),
+    filters: schemas.BookingFilters = Depends(),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get all bookings for the current user"""
-    return crud.get_user_bookings(db, current_user.id)
+    """Get the current user's bookings, newest first"""
+    return await async_crud.get_user_bookings(db, current_user.id, page, filters)
+
+
+def _stream_claims(credentials: HTTPAuthorizationCredentials = Depends(auth.security)) -> auth.TokenClaims:
+    """get_current_claims with a session closed before the stream starts, not when it ends"""
+    db = SessionLocal()
+    try:
+        return auth.get_current_claims(credentials, db)
+    finally:
+        db.close()
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_my_bookings(current_user: auth.TokenClaims = Depends(_stream_claims)):
+    """Server-sent events as the current user's bookings and payments change status"""
+    return StreamingResponse(
+        events.stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{booking_id}", response_model=schemas.BookingResponse)
 def get_booking(
     booking_id: UUID,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Get a specific booking"""
@@ -75,42 +107,49 @@ def get_booking(
     return booking
 
 
-@router.patch("/{booking_id}/cancel", response_model=schemas.BookingResponse)
+@router.patch(
+    "/{booking_id}/cancel",
+    response_model=schemas.BookingResponse,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def cancel_booking(
     booking_id: UUID,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Cancel a booking"""
+    # Ownership and status are checked by the UPDATE itself; only a refusal needs a look
+    cancelled = crud.cancel_booking(db, booking_id, user_id=current_user.id)
+    if cancelled:
+        events.publish_booking(cancelled)
+        return cancelled
+
     booking = crud.get_booking_by_id(db, booking_id)
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Booking not found"
         )
-    
-    # Verify user owns this booking
     if booking.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to cancel this booking"
         )
-    
-    # Check if booking is already completed or cancelled
-    if booking.status in [models.BookingStatus.COMPLETED, models.BookingStatus.CANCELLED]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot cancel a {booking.status} booking"
-        )
-    
-    return crud.cancel_booking(db, booking_id)
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Cannot cancel a {booking.status.value} booking"
+    )
 
 
-@router.patch("/{booking_id}", response_model=schemas.BookingResponse)
+@router.patch(
+    "/{booking_id}",
+    response_model=schemas.BookingResponse,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def update_booking(
     booking_id: UUID,
     booking_update: schemas.BookingUpdate,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Update a booking (for pandits/admins)"""
@@ -135,5 +174,32 @@ def update_booking(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this booking"
         )
-    
-    return crud.update_booking(db, booking_id, booking_update)
+
+    # A new pandit or time must be free (the booking's own slot aside)
+    changes = booking_update.model_fields_set
+    pandit_id = booking_update.pandit_id if "pandit_id" in changes else booking.pandit_id
+    new_status = booking_update.status if "status" in changes else booking.status
+    if changes & {"pandit_id", "scheduled_at"} and pandit_id and new_status != models.BookingStatus.CANCELLED:
+        scheduled_at = booking_update.scheduled_at or booking.scheduled_at
+        availability.reserve(
+            db,
+            pandit_id,
+            *availability.booking_interval(scheduled_at, booking.puja_type.duration_minutes),
+            exclude_booking=booking.id
+        )
+
+    updated = crud.update_booking(db, booking_id, booking_update)
+    if not updated:
+        # The status moved on since it was read: report what it is now
+        booking = crud.get_booking_by_id(db, booking_id)
+        if not booking:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Booking not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot move a {booking.status.value} booking to {booking_update.status.value}"
+        )
+    events.publish_booking(updated)
+    return updated
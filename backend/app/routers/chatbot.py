@@ -1,50 +1,50 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from typing import List
-from .. import schemas, crud
+from .. import schemas
+from ..answers import answer_cache, answers_version
 from ..database import get_db
+from ..intents import matcher as intent_matcher
+from ..phonetic import name_index
+from ..recommendations import recommender
+from ..retrieval import retriever
 
 router = APIRouter(prefix="/api/chatbot", tags=["Chatbot"])
 
 @router.post("", response_model=schemas.ChatbotResponse)
-def chatbot_query(query: schemas.ChatbotQuery, db: Session = Depends(get_db)):
-    """Mock chatbot for spiritual Q&A"""
-    question = query.question.lower()
-    
-    # Simple rule-based responses
-    if "puja" in question or "ritual" in question:
-        return {
-            "answer": "We offer various pujas for peace, prosperity, and health. Popular ones include Rudrabhishek, Navgraha Shanti, and Vastu Poojan.",
-            "suggested_pujas": ["रुद्राभिषेक", "नवग्रह शांति", "वास्तु पूजन"]
-        }
-    elif "price" in question or "cost" in question:
-        return {
-            "answer": "Puja prices range from ₹1,100 to ₹51,000 depending on the type. Check our pricing section for details.",
-            "suggested_pujas": []
-        }
-    else:
-        return {
-            "answer": "I can help you find the right puja for your needs. What are you looking for - peace, prosperity, or spiritual guidance?",
-            "suggested_pujas": []
-        }
+def chatbot_query(query: schemas.ChatbotQuery):
+    """Answer from the FAQ, suggesting the pujas the question names or is about"""
+    # Near-identical questions share a reply, without touching the database
+    cached = answer_cache.get(query.question)
+    if cached is not None:
+        return cached
+    version = answers_version()
+    reply = answer(query.question)
+    answer_cache.set(query.question, reply, version)
+    return reply
 
 @router.post("/recommend", response_model=List[schemas.RecommendationResponse])
 def recommend_puja(request: schemas.RecommendationRequest, db: Session = Depends(get_db)):
-    """Recommend pujas based on purpose and budget"""
-    all_pujas = crud.get_all_puja_types(db)
-    recommendations = []
-    
-    for puja in all_pujas:
-        if request.budget_min and puja.default_price < request.budget_min:
-            continue
-        if request.budget_max and puja.default_price > request.budget_max:
-            continue
-        
-        recommendations.append({
-            "puja_type": puja.name_local,
-            "puja_type_id": puja.id,
-            "reason": f"Recommended for {request.purpose}",
-            "estimated_price": puja.default_price
-        })
-    
-    return recommendations[:5]
+    """Recommend pujas for a purpose within a budget, best matches first"""
+    return recommender.recommend(db, request.purpose, request.budget_min, request.budget_max)
+
+
+def answer(question: str) -> dict:
+    faq, matches = retriever.index().retrieve(question)
+    # Pujas the question names, however they were spelled, then the closest matches
+    suggested = {
+        puja.id: puja.name_local or puja.name for puja in name_index.mentions(question, kind="puja")
+    }
+    for puja, _ in matches:
+        suggested.setdefault(puja.id, puja.name)
+    suggested_pujas = [{"id": puja_id, "name": name} for puja_id, name in suggested.items()]
+    if faq is not None:
+        return {"answer": faq[0].answer, "suggested_pujas": suggested_pujas}
+
+    intent = intent_matcher.intent(question)
+    if intent is not None:
+        return {"answer": intent.answer, "suggested_pujas": suggested_pujas}
+    return {
+        "answer": "I can help you find the right puja for your needs. What are you looking for - peace, prosperity, or spiritual guidance?",
+        "suggested_pujas": suggested_pujas
+    }
@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
 from uuid import UUID
-from .. import schemas, crud, auth, models
-from ..database import get_db
+from .. import schemas, crud, async_crud, auth, models, availability
+from ..database import get_db, get_read_db, get_async_read_db, pin_reads_to_primary
+from ..geo import MAX_RADIUS_KM, pandit_locations
+from ..pagination import PageParams, page_params
 
 router = APIRouter(prefix="/api/pandits", tags=["Pandits"])
 
 
-@router.post("/apply", response_model=schemas.PanditResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/apply",
+    response_model=schemas.PanditResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
 def apply_as_pandit(
     pandit_data: schemas.PanditCreate,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
     """Apply to become a pandit"""
@@ -25,19 +34,50 @@ def apply_as_pandit(
     
     # Create pandit profile
     pandit = crud.create_pandit(db, current_user.id, pandit_data)
+    pandit_locations.update(pandit)
     return pandit
 
 
-@router.get("", response_model=List[schemas.PanditResponse])
-def get_approved_pandits(db: Session = Depends(get_db)):
-    """Get all approved pandits (public endpoint)"""
-    return crud.get_all_pandits(db, approved_only=True)
+@router.get("", response_model=schemas.Page[schemas.PanditResponse])
+async def get_approved_pandits(
+    page: PageParams = Depends(page_params),
+    filters: schemas.PanditFilters = Depends(),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get approved pandits, newest first (public endpoint)"""
+    return await async_crud.get_all_pandits(db, page, filters, approved_only=True)
+
+
+@router.get("/nearby", response_model=List[schemas.NearbyPanditResponse])
+async def get_nearby_pandits(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=MAX_RADIUS_KM),
+    puja_type: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Approved pandits within radius_km of a point, nearest first (public endpoint)"""
+    only = None
+    if puja_type is not None:
+        only = await async_crud.get_pandit_ids_for_puja_type(db, puja_type)
+    hits = pandit_locations.nearby(lat, lng, radius_km, limit, only)
+    pandits = {pandit.id: pandit for pandit in await async_crud.get_pandits_by_ids(db, [pandit_id for _, pandit_id in hits])}
+    nearby = []
+    for distance, pandit_id in hits:
+        pandit = pandits.get(pandit_id)
+        # The index may run ahead of a lagging replica, or behind a rejection in another worker
+        if pandit is None or not pandit.approved:
+            continue
+        response = schemas.PanditResponse.model_validate(pandit)
+        nearby.append(schemas.NearbyPanditResponse(**response.model_dump(), distance_km=round(distance, 2)))
+    return nearby
 
 
 @router.get("/{pandit_id}", response_model=schemas.PanditResponse)
-def get_pandit(pandit_id: UUID, db: Session = Depends(get_db)):
+async def get_pandit(pandit_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific pandit by ID"""
-    pandit = crud.get_pandit_by_id(db, pandit_id)
+    pandit = await async_crud.get_pandit_by_id(db, pandit_id)
     if not pandit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,13 +86,95 @@ def get_pandit(pandit_id: UUID, db: Session = Depends(get_db)):
     return pandit
 
 
-@router.get("/{pandit_id}/bookings", response_model=List[schemas.BookingResponse])
-def get_pandit_bookings(
+@router.get("/{pandit_id}/availability", response_model=List[schemas.TimeSlot])
+def get_pandit_availability(
+    pandit_id: UUID,
+    date_from: date,
+    date_to: date,
+    puja_type_id: Optional[UUID] = None,
+    duration_minutes: Optional[int] = Query(None, gt=0, le=24 * 60),
+    db: Session = Depends(get_read_db)
+):
+    """Free stretches of a pandit's working time, long enough for the puja type or duration if given"""
+    if date_to < date_from or (date_to - date_from).days >= availability.MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"date_to must be on or after date_from, at most {availability.MAX_RANGE_DAYS} days apart"
+        )
+    pandit = crud.get_pandit_by_id(db, pandit_id)
+    if not pandit or not pandit.approved:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pandit not found"
+        )
+    if puja_type_id is not None:
+        puja = crud.get_puja_type_by_id(db, puja_type_id)
+        if not puja:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Puja type not found"
+            )
+        duration_minutes = puja.duration_minutes or availability.DEFAULT_DURATION_MINUTES
+    start = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to + timedelta(days=1), time.min)
+    calendar = availability.load_calendar(db, pandit_id, start, end)
+    return [
+        {"start": slot_start, "end": slot_end}
+        for slot_start, slot_end in calendar.free_slots(date_from, date_to, duration_minutes or 0)
+    ]
+
+
+@router.get("/{pandit_id}/schedule", response_model=schemas.PanditSchedule)
+def get_pandit_schedule(pandit_id: UUID, db: Session = Depends(get_read_db)):
+    """Get a pandit's working hours and upcoming blocked dates"""
+    if not crud.get_pandit_by_id(db, pandit_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pandit not found"
+        )
+    return crud.get_pandit_schedule(db, pandit_id)
+
+
+@router.put(
+    "/{pandit_id}/schedule",
+    response_model=schemas.PanditSchedule,
+    dependencies=[Depends(pin_reads_to_primary)]
+)
+def set_pandit_schedule(
     pandit_id: UUID,
-    current_user: models.User = Depends(auth.get_current_user),
+    schedule: schemas.PanditSchedule,
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db)
 ):
-    """Get all bookings for a pandit"""
+    """Replace a pandit's working hours and blocked dates (the pandit or admin)"""
+    pandit = crud.get_pandit_by_id(db, pandit_id)
+    if not pandit:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pandit not found"
+        )
+    if pandit.user_id != current_user.id and current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized"
+        )
+    if any(hours.end_time <= hours.start_time for hours in schedule.working_hours):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Working hours must end after they start"
+        )
+    return crud.set_pandit_schedule(db, pandit_id, schedule)
+
+
+@router.get("/{pandit_id}/bookings", response_model=schemas.Page[schemas.BookingResponse])
+def get_pandit_bookings(
+    pandit_id: UUID,
+    page: PageParams = Depends(page_params),
+    filters: schemas.BookingFilters = Depends(),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
+    db: Session = Depends(get_read_db)
+):
+    """Get a pandit's bookings, newest first"""
     # Verify pandit exists
     pandit = crud.get_pandit_by_id(db, pandit_id)
     if not pandit:
@@ -68,14 +190,14 @@ def get_pandit_bookings(
             detail="Not authorized"
         )
     
-    return crud.get_pandit_bookings(db, pandit_id)
+    return crud.get_pandit_bookings(db, pandit_id, page, filters)
 
 
 @router.get("/{pandit_id}/consultations", response_model=List[schemas.ConsultationResponse])
 def get_pandit_consultations(
     pandit_id: UUID,
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
+    db: Session = Depends(get_read_db)
 ):
     """Get all consultations for a pandit"""
     # Verify pandit exists
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from .. import schemas, crud, auth, models
-from ..database import get_db
+from .. import schemas, crud, auth, models, events
+from ..database import get_db, pin_reads_to_primary
 import os
 import hmac
 import hashlib
@@ -23,10 +23,10 @@ if razorpay and RAZORPAY_KEY_ID and RAZORPAY_KEY_SECRET:
     razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
 
 
-@router.post("/create", response_model=schemas.PaymentResponse)
+@router.post("/create", response_model=schemas.PaymentResponse, dependencies=[Depends(pin_reads_to_primary)])
 def create_payment(
     payment_request: schemas.PaymentCreate,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db),
 ):
     """Create a payment record for a booking (does not call provider directly).
@@ -50,8 +50,7 @@ def create_payment(
     # Create payment row
     amount = booking.price
     payment = crud.create_payment(db, payment_request.booking_id, payment_request.provider, amount)
-
-    db.refresh(payment)
+    events.publish_payment(payment, booking.user_id)
     return payment
 
 
@@ -108,7 +107,7 @@ def create_payment(
 #         "user": {"name": current_user.name, "phone": current_user.phone},
 #     }
 
-@router.post("/razorpay/order")
+@router.post("/razorpay/order", dependencies=[Depends(pin_reads_to_primary)])
 def create_razorpay_order(
     payment_request: schemas.PaymentCreate,
     current_user: models.User = Depends(auth.get_current_user),
@@ -153,7 +152,6 @@ def create_razorpay_order(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Razorpay order error: {str(e)}")
 
-    db.refresh(payment)
     return {
         "key": RAZORPAY_KEY_ID,
         "order": order,
@@ -165,10 +163,10 @@ def create_razorpay_order(
     }
 
 
-@router.post("/razorpay/verify")
+@router.post("/razorpay/verify", dependencies=[Depends(pin_reads_to_primary)])
 def verify_razorpay_signature(
     payload: dict,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.TokenClaims = Depends(auth.get_current_claims),
     db: Session = Depends(get_db),
 ):
     """Verify signature sent by frontend after successful Checkout and mark payment confirmed.
@@ -207,11 +205,20 @@ def verify_razorpay_signature(
     if booking.user_id != current_user.id and current_user.role != models.UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Mark as paid and confirm
+    # Mark as paid (committed with the confirmation) and confirm, unless the
+    # booking was cancelled or completed in the meantime
     payment.status = models.PaymentStatus.SUCCESS
-    booking.status = models.BookingStatus.CONFIRMED
-    db.commit()
-    db.refresh(payment)
+    confirmed = crud.confirm_booking(db, booking.id)
+    events.publish_payment(payment, booking.user_id)
+    if confirmed is None:
+        db.refresh(booking)
+        if booking.status != models.BookingStatus.CONFIRMED:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Cannot confirm a {booking.status.value} booking"
+            )
+    else:
+        events.publish_booking(confirmed)
 
     return {"status": "success", "payment_id": str(payment.id), "booking_status": "confirmed"}
 
@@ -257,10 +264,11 @@ async def payment_webhook(request: Request, db: Session = Depends(get_db)):
             payment = db.query(models.Payment).filter(models.Payment.provider_payment_id == order_id).first()
             if payment:
                 payment.status = models.PaymentStatus.SUCCESS
-                booking = crud.get_booking_by_id(db, payment.booking_id)
+                # A booking cancelled or completed meanwhile is left as it is
+                booking = crud.confirm_booking(db, payment.booking_id)
                 if booking:
-                    booking.status = models.BookingStatus.CONFIRMED
-                db.commit()
+                    events.publish_payment(payment, booking.user_id)
+                    events.publish_booking(booking)
                 return {"status": "success"}
 
     return {"status": "ignored"}
@@ -1,26 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from typing import List
 from uuid import UUID
-from .. import schemas, crud, auth, models
-from ..database import get_db
+from .. import schemas
+from ..catalog import cached_response, puja_catalog
+from ..search import puja_index
 
 router = APIRouter(prefix="/api/pujas", tags=["Pujas"])
 
+# Both endpoints are served from the in-memory catalog (see app/catalog.py)
+# and answer If-None-Match with 304 without touching the database. Only the
+# detail endpoint carries the long texts; the listing is summaries.
 
-@router.get("", response_model=List[schemas.PujaTypeResponse])
-def get_all_pujas(db: Session = Depends(get_db)):
-    """Get all puja types (public endpoint)"""
-    return crud.get_all_puja_types(db)
+
+@router.get("", response_model=List[schemas.PujaTypeSummary])
+async def get_all_pujas(request: Request):
+    """Get all puja types as summaries (public endpoint)"""
+    snapshot = await puja_catalog.snapshot()
+    return cached_response(request, snapshot.listing)
+
+
+# Declared before /{puja_id}, which would otherwise capture "search"
+@router.get("/search", response_model=List[schemas.PujaTypeSummary])
+async def search_pujas(
+    q: str = Query(..., min_length=1, max_length=100, description="Hindi or English; the last word may be partial"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Search puja types by name, description and benefits, best matches first"""
+    return [puja for puja, score in puja_index.search(q, limit)]
 
 
 @router.get("/{puja_id}", response_model=schemas.PujaTypeResponse)
-def get_puja(puja_id: UUID, db: Session = Depends(get_db)):
-    """Get a specific puja type by ID"""
-    puja = crud.get_puja_type_by_id(db, puja_id)
-    if not puja:
+async def get_puja(puja_id: UUID, request: Request):
+    """Get a specific puja type by ID, with its detailed description and benefits"""
+    cached = await puja_catalog.puja(puja_id)
+    if not cached:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Puja type not found"
         )
-    return puja
+    return cached_response(request, cached)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+from .. import schemas
+from ..phonetic import name_index
+
+router = APIRouter(prefix="/api/suggest", tags=["Search"])
+
+
+@router.get("", response_model=List[schemas.Suggestion])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Partial name, typed in Hindi or English"),
+    kind: Optional[schemas.SuggestionKind] = None,
+    limit: int = Query(10, ge=1, le=20)
+):
+    """Type-ahead suggestions for puja and pandit names, tolerant of spelling and script"""
+    hits = name_index.suggest(q, limit, kind.value if kind else None)
+    return [
+        {"kind": entry.kind, "id": entry.id, "name": entry.name, "name_local": entry.name_local, "score": score}
+        for entry, score in hits
+    ]
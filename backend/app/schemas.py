@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
-from datetime import datetime
+from typing import Generic, Optional, List, TypeVar
+from datetime import date, datetime, time
 from uuid import UUID
 from enum import Enum
 
@@ -26,6 +26,15 @@ class PaymentStatus(str, Enum):
     REFUNDED = "refunded"
 
 
+# Pagination
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 # User Schemas
 class UserBase(BaseModel):
     name: str
@@ -53,6 +62,13 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserFilters(BaseModel):
+    role: Optional[UserRole] = None
+    city: Optional[str] = None
+    date_from: Optional[datetime] = Field(None, description="Registered at or after")
+    date_to: Optional[datetime] = Field(None, description="Registered before")
+
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
@@ -66,6 +82,8 @@ class PanditBase(BaseModel):
     state: str
     bio: Optional[str] = None
     photo_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class PanditCreate(PanditBase):
@@ -83,10 +101,47 @@ class PanditResponse(PanditBase):
         from_attributes = True
 
 
+class NearbyPanditResponse(PanditResponse):
+    distance_km: float
+
+
 class PanditApproval(BaseModel):
     approved: bool
 
 
+class PanditFilters(BaseModel):
+    city: Optional[str] = None
+    state: Optional[str] = None
+
+
+# Availability Schemas
+class WorkingHours(BaseModel):
+    weekday: int = Field(..., ge=0, le=6, description="0 = Monday")
+    start_time: time
+    end_time: time
+
+    class Config:
+        from_attributes = True
+
+
+class BlockedDate(BaseModel):
+    blocked_on: date
+    reason: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PanditSchedule(BaseModel):
+    working_hours: List[WorkingHours] = Field(default_factory=list, description="Empty for the default hours every day")
+    blocked_dates: List[BlockedDate] = Field(default_factory=list)
+
+
+class TimeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+
 # Puja Type Schemas
 class PujaTypeBase(BaseModel):
     name_local: str
@@ -128,6 +183,24 @@ class PujaTypeResponse(PujaTypeBase):
         from_attributes = True
 
 
+class PujaTypeSummary(BaseModel):
+    """Puja type without the long texts, for lists and nested responses"""
+    id: UUID
+    name_local: str
+    name_en: str
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    duration_minutes: Optional[int] = None
+    min_price: float
+    max_price: Optional[float] = None
+    default_price: float
+    is_virtual: bool = False
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # Booking Schemas
 class BookingBase(BaseModel):
     puja_type_id: UUID
@@ -148,13 +221,21 @@ class BookingResponse(BookingBase):
     price: float
     stream_url: Optional[str] = None
     created_at: datetime
-    puja_type: Optional[PujaTypeResponse] = None
+    puja_type: Optional[PujaTypeSummary] = None
     user: Optional['UserResponse'] = None
 
     class Config:
         from_attributes = True
 
 
+class BookingFilters(BaseModel):
+    status: Optional[BookingStatus] = None
+    date_from: Optional[datetime] = Field(None, description="Scheduled at or after")
+    date_to: Optional[datetime] = Field(None, description="Scheduled before")
+    city: Optional[str] = Field(None, description="City of the assigned pandit")
+    puja_type_id: Optional[UUID] = None
+
+
 class BookingUpdate(BaseModel):
     status: Optional[BookingStatus] = None
     scheduled_at: Optional[datetime] = None
@@ -231,15 +312,34 @@ class VirtualSessionResponse(VirtualSessionBase):
         from_attributes = True
 
 
+# Suggestion Schemas
+class SuggestionKind(str, Enum):
+    PUJA = "puja"
+    PANDIT = "pandit"
+
+
+class Suggestion(BaseModel):
+    kind: SuggestionKind
+    id: UUID
+    name: str
+    name_local: Optional[str] = None
+    score: float
+
+
 # Chatbot Schemas
 class ChatbotQuery(BaseModel):
     question: str
     user_id: Optional[UUID] = None
 
 
+class SuggestedPuja(BaseModel):
+    id: UUID
+    name: str
+
+
 class ChatbotResponse(BaseModel):
     answer: str
-    suggested_pujas: Optional[List[str]] = None
+    suggested_pujas: Optional[List[SuggestedPuja]] = None
 
 
 # Recommendation Schemas
@@ -264,3 +364,66 @@ class AdminStats(BaseModel):
     total_revenue: float
     pending_approvals: int
     active_virtual_sessions: int
+
+
+# Metrics
+class LatencySummary(BaseModel):
+    count: int
+    avg_ms: float
+    max_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+class HashingMetrics(BaseModel):
+    workers: int
+    max_queue: int
+    in_flight: int
+    rejected: int
+    hash_latency: LatencySummary
+    queue_wait: LatencySummary
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class BookingStreamStats(BaseModel):
+    users: int
+    streams: int
+    queue_size: int
+    published: int
+    delivered: int
+    dropped: int
+
+
+class AutoAssignReport(BaseModel):
+    pending: int
+    pandits: int
+    assigned: int
+    conflicts: int
+    batches: int
+    load_ms: float
+    plan_ms: float
+    write_ms: float
+
+
+class DbPoolMetrics(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    connections_created: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    timeouts: int
+    wait: LatencySummary
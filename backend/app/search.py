@@ -0,0 +1,275 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from heapq import merge, nlargest
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import async_crud, schemas
+from .database import AsyncSessionLocal
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Matches in a puja's names count for more than matches in its body text
+FIELD_WEIGHTS = (
+    ("name_local", 3),
+    ("name_en", 3),
+    ("description", 1),
+    ("benefits", 1),
+)
+
+# Upper bound on the vocabulary terms an as-you-type prefix expands to
+MAX_PREFIX_TERMS = 64
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the this that to with your "
+    "का की के को में है हैं और से पर यह एक लिए तथा भी".split()
+)
+
+# Word characters plus the whole Devanagari block (vowel signs and virama are
+# combining marks, which \w alone would split words on), except the dandas
+_TOKEN = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+# Applied after NFD: zero-width joiners only change how a conjunct renders;
+# candrabindu and anusvara, letters with and without nukta, and Latin letters
+# with and without accents are spelled interchangeably
+_FOLD = {0x200B: None, 0x200C: None, 0x200D: None, 0xFEFF: None, 0x093C: None, 0x0901: 0x0902}
+_FOLD.update(dict.fromkeys(range(0x0300, 0x0370)))
+
+
+def normalize(text: str) -> str:
+    """Case- and spelling-folded form that both documents and queries are reduced to"""
+    return unicodedata.normalize("NFD", text).translate(_FOLD).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Searchable terms of a piece of English or Hindi text, stopwords removed"""
+    return [token for token in _TOKEN.findall(normalize(text)) if token not in STOPWORDS]
+
+
+class PujaSearchIndex:
+    """In-memory inverted index over the puja catalog, ranked with BM25.
+
+    Each term's postings are also bucketed by term frequency and sorted by
+    document length, so the best documents for a single term are at the
+    front of its buckets and as-you-type queries need not score every match.
+
+    Like the catalog cache, the index is process-local: admin writes update
+    it in the worker that handled them, other workers when it is next
+    reloaded (every CATALOG_TTL_SECONDS, see catalog.reload_periodically).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Writes applied in this process, so a reload cannot undo one it did not see
+        self._writes = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._pujas: Dict[str, schemas.PujaTypeSummary] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._by_tf: Dict[str, Dict[int, List[Tuple[int, str]]]] = {}
+        self._terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._pujas)
+
+    async def load(self) -> None:
+        """(Re)build the index from every puja type in the database"""
+        writes = self._writes
+        db = AsyncSessionLocal()
+        try:
+            pujas = await async_crud.get_all_puja_types(db, with_details=True)
+            self.rebuild(pujas, writes)
+        finally:
+            await db.close()
+
+    def rebuild(self, pujas: Iterable, writes: Optional[int] = None) -> None:
+        """Replace the contents, unless a write landed since ``writes`` was read (the next reload has it)"""
+        with self._lock:
+            if writes is not None and writes != self._writes:
+                return
+            self._clear()
+            for puja in pujas:
+                self._add(puja, keep_sorted=False)
+            self._terms.sort()
+            for buckets in self._by_tf.values():
+                for bucket in buckets.values():
+                    bucket.sort()
+
+    def upsert(self, puja) -> None:
+        """Index a puja type after it was created or updated"""
+        with self._lock:
+            self._writes += 1
+            self._remove(str(puja.id))
+            self._add(puja)
+
+    def remove(self, puja_id) -> None:
+        with self._lock:
+            self._writes += 1
+            self._remove(str(puja_id))
+
+    def _add(self, puja, keep_sorted: bool = True) -> None:
+        key = str(puja.id)
+        terms: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(getattr(puja, field) or ""):
+                terms[token] = terms.get(token, 0) + weight
+        length = sum(terms.values())
+        self._pujas[key] = schemas.PujaTypeSummary.model_validate(puja)
+        self._doc_terms[key] = terms
+        self._lengths[key] = length
+        self._total_length += length
+        add = insort if keep_sorted else list.append
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._by_tf[term] = {}
+                add(self._terms, term)
+            postings[key] = tf
+            add(self._by_tf[term].setdefault(tf, []), (length, key))
+
+    def _remove(self, key: str) -> None:
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        del self._pujas[key]
+        length = self._lengths.pop(key)
+        self._total_length -= length
+        for term, tf in terms.items():
+            postings = self._postings[term]
+            del postings[key]
+            buckets = self._by_tf[term]
+            bucket = buckets[tf]
+            del bucket[bisect_left(bucket, (length, key))]
+            if not bucket:
+                del buckets[tf]
+            if not postings:
+                del self._postings[term]
+                del self._by_tf[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with prefix, the exact term first"""
+        start = bisect_left(self._terms, prefix)
+        end = min(start + MAX_PREFIX_TERMS, len(self._terms))
+        expanded = []
+        for term in self._terms[start:end]:
+            if not term.startswith(prefix):
+                break
+            expanded.append(term)
+        return expanded
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings[term])
+        return math.log(1 + (len(self._pujas) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[schemas.PujaTypeSummary, float]]:
+        """Best matches for a query, the last word of which may be incomplete.
+
+        Every word must match (the last one as a prefix); a word's score is
+        that of its best-scoring expansion.
+        """
+        tokens = _TOKEN.findall(normalize(query))
+        if not tokens:
+            return []
+        last = tokens.pop()
+        words = [[token] for token in tokens if token not in STOPWORDS]
+        with self._lock:
+            if not self._pujas:
+                return []
+            words = [[term for term in word if term in self._postings] for word in words]
+            words.append(self._expand(last))
+            if not all(words):
+                return []
+            avg_length = self._total_length / len(self._pujas)
+            idfs = {term: self._idf(term) for word in words for term in word}
+            if len(words) == 1:
+                hits = self._top_for_word(words[0], idfs, avg_length, limit)
+            else:
+                hits = self._top_for_words(words, idfs, avg_length, limit)
+            return [(self._pujas[key], score) for score, key in hits]
+
+    def relevance(self, text: str) -> Dict[str, float]:
+        """BM25 score of every puja matching any word of free text (no prefixes), by puja ID"""
+        scores: Dict[str, float] = {}
+        with self._lock:
+            if not self._pujas:
+                return scores
+            avg_length = self._total_length / len(self._pujas)
+            for term in set(tokenize(text)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = self._idf(term)
+                for key, tf in postings.items():
+                    scores[key] = scores.get(key, 0.0) + _bm25(idf, tf, self._lengths[key], avg_length)
+        return scores
+
+    def _top_for_word(self, word: List[str], idfs, avg_length: float, limit: int) -> List[Tuple[float, str]]:
+        """Best documents for a single word, without scoring all its matches.
+
+        Within a term's tf bucket the score only falls as documents get
+        longer, so each bucket is a stream sorted by score; merged, the first
+        `limit` distinct documents are the top ones (a document's first
+        appearance is its best-scoring expansion).
+        """
+        streams = [
+            _bucket_stream(idfs[term], tf, bucket, avg_length)
+            for term in word
+            for tf, bucket in self._by_tf[term].items()
+        ]
+        top: Dict[str, float] = {}
+        for score, key in merge(*streams):
+            if key not in top:
+                top[key] = -score
+                if len(top) == limit:
+                    break
+        return [(score, key) for key, score in top.items()]
+
+    def _top_for_words(self, words, idfs, avg_length: float, limit: int) -> List[Tuple[float, str]]:
+        """Best documents matching every word.
+
+        The complete words' postings are intersected first (set operations,
+        smallest first), then each prefix expansion is intersected with that,
+        so only documents matching every word are ever scored.
+        """
+        complete = [word[0] for word in words[:-1]]
+        postings = sorted((self._postings[term] for term in complete), key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates.intersection_update(other)
+        prefix_scores: Dict[str, float] = {}
+        for term in words[-1]:
+            idf = idfs[term]
+            term_postings = self._postings[term]
+            for key in candidates.intersection(term_postings):
+                score = _bm25(idf, term_postings[key], self._lengths[key], avg_length)
+                if score > prefix_scores.get(key, 0.0):
+                    prefix_scores[key] = score
+        scored = []
+        for key, total in prefix_scores.items():
+            length = self._lengths[key]
+            doc_terms = self._doc_terms[key]
+            for term in complete:
+                total += _bm25(idfs[term], doc_terms[term], length, avg_length)
+            scored.append((total, key))
+        return nlargest(limit, scored)
+
+
+def _bm25(idf: float, tf: int, length: int, avg_length: float) -> float:
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+
+
+def _bucket_stream(idf: float, tf: int, bucket: List[Tuple[int, str]], avg_length: float):
+    for length, key in bucket:
+        yield -_bm25(idf, tf, length, avg_length), key
+
+
+puja_index = PujaSearchIndex()
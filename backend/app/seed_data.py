@@ -1,13 +1,14 @@
 from sqlalchemy.orm import Session
 from . import models, crud, schemas
-from .database import SessionLocal, engine
+from .database import SessionLocal
+from .migrations import upgrade_to_head
 from .auth import get_password_hash
+from .gazetteer import gazetteer
 import os
 
 def seed_database():
     """Seed the database with initial data"""
-    Base = models.Base
-    Base.metadata.create_all(bind=engine)
+    upgrade_to_head()
     
     db = SessionLocal()
     
@@ -88,10 +89,13 @@ def seed_database():
             db.add(pandit_user)
             db.commit()
             
+            latitude, longitude = gazetteer.locate(pd["city"], pd["state"]) or (None, None)
             pandit_profile = models.Pandit(
                 user_id=pandit_user.id,
                 city=pd["city"],
                 state=pd["state"],
+                latitude=latitude,
+                longitude=longitude,
                 bio=f"Experienced pandit from {pd['city']}",
                 approved=True
             )
@@ -0,0 +1,112 @@
+"""Throughput of the sync vs async read paths under many concurrent clients.
+
+Mounts the old sync handlers (threadpool + blocking Session) next to the async
+ones on a scratch app and drives both in-process through httpx, so the numbers
+isolate the request path rather than network overhead. Seed the database first
+(python -m app.seed_data) so the queries return realistic rows.
+
+With more waiting sync requests than pooled connections, the sync path can
+stall until DB_POOL_TIMEOUT: session teardown needs a threadpool slot that the
+blocked requests are holding. Lower DB_POOL_TIMEOUT to keep runs short; the
+stalled requests are reported as errors.
+
+    cd backend
+    python -m benchmarks.bench_async_reads --concurrency 500 --requests 5000
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import async_crud, crud, schemas
+from app.database import async_engine, engine, get_async_db, get_db
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/pujas", response_model=List[schemas.PujaTypeResponse])
+def sync_pujas(db: Session = Depends(get_db)):
+    return crud.get_all_puja_types(db)
+
+
+@bench_app.get("/async/pujas", response_model=List[schemas.PujaTypeResponse])
+async def async_pujas(db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_all_puja_types(db)
+
+
+@bench_app.get("/sync/pandits", response_model=schemas.Page[schemas.PanditResponse])
+def sync_pandits(db: Session = Depends(get_db)):
+    return crud.get_all_pandits(db, approved_only=True)
+
+
+@bench_app.get("/async/pandits", response_model=schemas.Page[schemas.PanditResponse])
+async def async_pandits(db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.get_all_pandits(db, approved_only=True)
+
+
+async def drive(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    """Run `concurrency` clients in parallel until `total` requests completed"""
+    remaining = total
+    latencies = []
+    errors = 0
+
+    async def client_loop():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(path)
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    latencies = latencies or [0.0]
+    return {
+        "rps": (total - errors) / elapsed,
+        "errors": errors,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+async def run(args) -> None:
+    # Pool timeouts surface as 500s (counted as errors) instead of aborting the run
+    transport = httpx.ASGITransport(app=bench_app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for resource in args.resources:
+            for mode in ("sync", "async"):
+                path = f"/{mode}/{resource}"
+                await drive(client, path, min(args.requests, 200), min(args.concurrency, 50))  # warm up
+                result = await drive(client, path, args.requests, args.concurrency)
+                print(
+                    f"{path:<16} {result['rps']:>9.1f} req/s   "
+                    f"p50 {result['p50_ms']:>8.1f} ms   p99 {result['p99_ms']:>8.1f} ms   "
+                    f"errors {result['errors']}"
+                )
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--resources", nargs="+", default=["pujas", "pandits"], choices=["pujas", "pandits"])
+    args = parser.parse_args()
+    print(f"{args.requests} requests per endpoint at {args.concurrency} concurrent clients")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
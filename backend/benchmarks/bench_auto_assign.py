@@ -0,0 +1,78 @@
+"""Planning time of booking auto-assignment over a synthetic backlog.
+
+Spreads pending bookings and approved pandits over the gazetteer's cities
+(big ones weighted up) and the next two weeks, gives pandits a few existing
+engagements and puja types they have done before, then times
+plan_assignments() — the grouping, feasibility checks and min-cost
+matchings. No database is needed; the write-back is one UPDATE per batch.
+
+    cd backend
+    python -m benchmarks.bench_auto_assign --bookings 10000 --pandits 2000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+
+from app.assignment import PendingBooking, min_cost_assignment, plan_assignments
+from app.availability import PanditCalendar, booking_interval
+from app.gazetteer import gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=10000)
+    parser.add_argument("--pandits", type=int, default=2000)
+    parser.add_argument("--puja-types", type=int, default=15)
+    parser.add_argument("--virtual", type=float, default=0.1, help="share of virtual bookings")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    new_id = lambda: UUID(int=rng.getrandbits(128))
+    cities = sorted({point for _, _, point in gazetteer.entries()})
+    weights = [1 / (rank + 1) ** 0.5 for rank in range(len(cities))]
+    puja_types = [new_id() for _ in range(args.puja_types)]
+    durations = [rng.choice([60, 90, 120, 180]) for _ in puja_types]
+    start = datetime(2030, 1, 1, 6)
+
+    def random_time():
+        return start + timedelta(days=rng.randrange(14), minutes=30 * rng.randrange(26))
+
+    pandits = {new_id(): rng.choices(cities, weights)[0] for _ in range(args.pandits)}
+    experience = {(pandit_id, rng.choice(puja_types)) for pandit_id in pandits for _ in range(3)}
+    existing = [(rng.choice(list(pandits)), random_time()) for _ in range(args.pandits * 3)]
+    bookings = []
+    for _ in range(args.bookings):
+        kind = rng.randrange(len(puja_types))
+        bookings.append(PendingBooking(
+            new_id(), puja_types[kind], *booking_interval(random_time(), durations[kind]),
+            rng.choices(cities, weights)[0], rng.random() < args.virtual,
+        ))
+
+    print(f"{args.bookings:,d} bookings x {args.pandits:,d} pandits in {len(cities)} cities")
+    for run in range(args.runs):
+        calendars = {pandit_id: PanditCalendar(pandit_id) for pandit_id in pandits}
+        for pandit_id, scheduled_at in existing:
+            calendars[pandit_id].busy.add(*booking_interval(scheduled_at, 60))
+        started = time.perf_counter()
+        planned = plan_assignments(bookings, pandits, calendars, experience)
+        elapsed = time.perf_counter() - started
+        loads = np.bincount(np.unique([str(pandit_id) for _, pandit_id in planned], return_inverse=True)[1])
+        print(
+            f"run {run + 1}: planned {len(planned):,d} in {elapsed * 1000:.0f} ms, "
+            f"busiest pandit took {loads.max()}, median {np.median(loads):.0f}"
+        )
+
+    for size in (50, 200, 1000):
+        cost = np.random.default_rng(size).random((size, size))
+        started = time.perf_counter()
+        min_cost_assignment(cost)
+        print(f"matching {size}x{size}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Idle booking event streams held by one worker, and a status change delivered through them.
+
+Starts a single uvicorn worker on the app and opens --streams connections to
+/api/bookings/stream, each as a different devotee (tokens carry their
+claims, so no user rows are needed), then reports while they are held:
+the worker's resident memory per stream, how many streams got a heartbeat
+within one interval, GET /health latency (is the event loop still free?)
+and, for one real booking, the time from its cancel request until the
+event arrives on its owner's stream. The booking is written to
+DATABASE_URL, so point it at a scratch database, and raise `ulimit -n`
+above twice --streams: both ends of every stream live on this machine.
+
+    cd backend
+    python -m benchmarks.bench_booking_stream --streams 10000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+
+from app import auth, models
+from app.database import SessionLocal
+from app.migrations import upgrade_to_head
+
+
+class Stream:
+    """One held connection, noting when heartbeats and booking events arrive"""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.heartbeats = 0
+        self.booking_event_at = None
+        self._writer = None
+        self._reader_task = None
+
+    async def open(self, port: int) -> None:
+        reader, self._writer = await asyncio.open_connection("127.0.0.1", port)
+        self._writer.write(
+            f"GET /api/bookings/stream HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {self.token}\r\n"
+            "Accept: text/event-stream\r\n\r\n".encode()
+        )
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.decode(errors="replace").splitlines()[0])
+        self._reader_task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                return
+            self.heartbeats += chunk.count(b": keepalive")
+            if self.booking_event_at is None and b"event: booking" in chunk:
+                self.booking_event_at = time.perf_counter()
+
+    def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _token(user_id=None) -> str:
+    user = SimpleNamespace(id=user_id or uuid4(), role=models.UserRole.USER, token_version=0)
+    return auth.create_access_token({"sub": f"bench-{user.id}"}, user=user)
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _booking() -> tuple:
+    """A devotee's token and one of their pending bookings"""
+    db = SessionLocal()
+    devotee = models.User(name="Stream Bench Devotee", phone="6" + str(uuid4().int)[:11], hashed_password="x")
+    puja = models.PujaType(name_local="Stream Bench Puja", name_en="Stream Bench Puja", min_price=1, default_price=101)
+    db.add_all([devotee, puja])
+    db.flush()
+    booking = models.Booking(
+        user_id=devotee.id, puja_type_id=puja.id, scheduled_at=datetime.utcnow() + timedelta(days=30), price=101
+    )
+    db.add(booking)
+    db.commit()
+    result = auth.create_access_token({"sub": devotee.phone}, user=devotee), booking.id
+    db.close()
+    return result
+
+
+async def _wait_until_up(port: int, server: subprocess.Popen) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        for _ in range(300):
+            if server.poll() is not None:
+                raise RuntimeError("the server exited during startup")
+            try:
+                await client.get("/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("the server did not start")
+
+
+async def run(args, server: subprocess.Popen) -> None:
+    await _wait_until_up(args.port, server)
+    base_rss = _rss_mb(server.pid)
+
+    streams = [Stream(_token()) for _ in range(args.streams)]
+    started = time.perf_counter()
+    for offset in range(0, len(streams), args.connect_batch):
+        await asyncio.gather(*(stream.open(args.port) for stream in streams[offset:offset + args.connect_batch]))
+    opened = time.perf_counter() - started
+    held_rss = _rss_mb(server.pid)
+    print(f"opened {len(streams)} streams in {opened:.1f}s")
+    print(f"worker RSS {base_rss:.0f} MB -> {held_rss:.0f} MB ({(held_rss - base_rss) * 1024 / len(streams):.1f} KB per stream)")
+
+    for stream in streams:
+        stream.heartbeats = 0
+    await asyncio.sleep(args.heartbeat * 1.5)
+    beating = sum(1 for stream in streams if stream.heartbeats)
+    print(f"streams with a heartbeat within {args.heartbeat * 1.5:.0f}s: {beating}/{len(streams)}")
+
+    latencies = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}") as client:
+        for _ in range(args.probes):
+            probe_started = time.perf_counter()
+            await client.get("/health")
+            latencies.append((time.perf_counter() - probe_started) * 1000)
+        latencies.sort()
+        print(
+            f"GET /health while held: p50 {latencies[len(latencies) // 2]:.1f} ms   "
+            f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.1f} ms"
+        )
+
+        token, booking_id = _booking()
+        owner = Stream(token)
+        await owner.open(args.port)
+        cancel_started = time.perf_counter()
+        response = await client.patch(f"/api/bookings/{booking_id}/cancel", headers={"Authorization": f"Bearer {token}"})
+        answered = time.perf_counter()
+        while owner.booking_event_at is None and time.perf_counter() - cancel_started < 10:
+            await asyncio.sleep(0.001)
+        if response.status_code != 200 or owner.booking_event_at is None:
+            print(f"cancel returned {response.status_code}; event received: {owner.booking_event_at is not None}")
+        else:
+            print(
+                f"cancel answered in {(answered - cancel_started) * 1000:.1f} ms, "
+                f"event on the stream after {(owner.booking_event_at - cancel_started) * 1000:.1f} ms"
+            )
+        owner.close()
+
+    for stream in streams:
+        stream.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=10000)
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="BOOKING_STREAM_HEARTBEAT_SECONDS for the worker")
+    parser.add_argument("--connect-batch", type=int, default=500, help="connections opened at once")
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    upgrade_to_head()
+    env = {**os.environ, "BOOKING_STREAM_HEARTBEAT_SECONDS": str(args.heartbeat)}
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--workers", "1",
+            "--backlog", str(args.connect_batch * 2), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    try:
+        asyncio.run(run(args, server))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Throughput of the chatbot's TF-IDF retrieval over a synthetic catalog.
+
+Builds the matrix from the bundled FAQ corpus and generated bilingual
+pujas (no database needed), installs it in the chatbot and answers
+questions (uncached) in a single thread, so the figure is queries per second
+per core. The budget is 2,000 QPS.
+
+    cd backend
+    python -m benchmarks.bench_chatbot_retrieval --pujas 2000
+"""
+import argparse
+import time
+
+from app.phonetic import name_index
+from app.retrieval import build_index, load_faq, retriever
+from app.routers.chatbot import answer
+
+from .bench_puja_search import synthetic_catalog
+
+QUESTIONS = [
+    "How do I cancel my booking and get a refund?",
+    "Which puja is good for peace at home?",
+    "Can I attend the puja online over video?",
+    "what does rudrabhishek cost",
+    "shiva abhishek for health",
+    "घर में शांति के लिए कौन सी पूजा करें",
+    "सत्यनारायण कथा की सामग्री",
+    "Do you accept UPI payment?",
+    "kuber puja for business success",
+    "tell me something",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pujas", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    pujas = list(synthetic_catalog(args.pujas))
+    started = time.perf_counter()
+    index = build_index(load_faq(), pujas)
+    print(
+        f"built {index.matrix.n_docs:,d} x {len(index.matrix.vocabulary):,d} matrix "
+        f"({len(index.matrix.rows):,d} nonzeros) in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    retriever._index = index
+    for puja in pujas:
+        name_index.add_puja(puja)
+
+    for question in QUESTIONS:
+        answer(question)
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for question in QUESTIONS:
+            began = time.perf_counter()
+            answer(question)
+            latencies.append((time.perf_counter() - began) * 1000)
+    qps = len(latencies) / (time.perf_counter() - started)
+    latencies.sort()
+    print(
+        f"{len(latencies):,d} questions   {qps:,.0f} QPS   p50 {latencies[len(latencies) // 2]:.3f} ms   "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms   ({'within' if qps > 2000 else 'under'} the 2,000 QPS budget)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Inserts per second of each crud create path, with and without the post-commit refresh.
+
+Every path is timed two ways, one session per insert as in a request:
+"refresh" is how the create functions used to run, on a session that
+expires everything at commit followed by db.refresh() (a SELECT of the row
+just written); "no refresh" is SessionLocal as configured now, where the
+flushed object is returned as is. Both then read the fields a response
+model would. Rows are really committed: point DATABASE_URL at a scratch
+database.
+
+    cd backend
+    python -m benchmarks.bench_crud_inserts --rows 2000
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.database import SessionLocal, engine
+from app.migrations import upgrade_to_head
+
+# The session configuration the create functions were written against
+ExpiringSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=True, bind=engine)
+
+START = datetime(2040, 1, 1, 6)
+
+
+def _phone() -> str:
+    return "7" + str(uuid.uuid4().int)[:11]
+
+
+def _fixtures(bookings: int) -> dict:
+    """A devotee, an approved pandit, a puja type and unpaid bookings for the paths to refer to"""
+    db = SessionLocal()
+    devotee = models.User(name="Bench Devotee", phone=_phone(), hashed_password="x")
+    pandit_user = models.User(name="Bench Pandit", phone=_phone(), hashed_password="x", role=models.UserRole.PANDIT)
+    puja = models.PujaType(name_local="Bench Puja", name_en="Bench Puja", min_price=1, default_price=101)
+    db.add_all([devotee, pandit_user, puja])
+    db.flush()
+    pandit = models.Pandit(user_id=pandit_user.id, city="Varanasi", state="Uttar Pradesh", approved=True)
+    # A booking takes one payment, so create_payment needs one per insert
+    unpaid = [
+        models.Booking(user_id=devotee.id, puja_type_id=puja.id, scheduled_at=START, price=101)
+        for _ in range(bookings)
+    ]
+    db.add(pandit)
+    db.add_all(unpaid)
+    db.commit()
+    ids = {
+        "user_id": devotee.id, "pandit_id": pandit.id, "puja_type_id": puja.id,
+        "booking_ids": [booking.id for booking in unpaid],
+    }
+    db.close()
+    return ids
+
+
+PATHS = {
+    "create_user": lambda db, ids, i: crud.create_user(
+        db, schemas.UserCreate(name=f"Bench User {i}", phone=_phone(), password="x"), hashed_password="x"
+    ),
+    "create_puja_type": lambda db, ids, i: crud.create_puja_type(
+        db, schemas.PujaTypeCreate(name_local=f"Bench Puja {i}", name_en=f"Bench Puja {i}", min_price=1, default_price=101)
+    ),
+    "create_booking": lambda db, ids, i: crud.create_booking(
+        db, ids["user_id"], schemas.BookingCreate(puja_type_id=ids["puja_type_id"], scheduled_at=START + timedelta(minutes=i))
+    ),
+    "create_payment": lambda db, ids, i: crud.create_payment(db, ids["booking_ids"][i], "mock", 101),
+    "create_consultation": lambda db, ids, i: crud.create_consultation(
+        db, ids["user_id"],
+        schemas.ConsultationCreate(pandit_id=ids["pandit_id"], consultation_date=START + timedelta(minutes=i), price=51)
+    ),
+    "create_virtual_session": lambda db, ids, i: crud.create_virtual_session(
+        db, schemas.VirtualSessionCreate(
+            title=f"Bench Session {i}", stream_url="https://example.com/live", scheduled_at=START + timedelta(minutes=i)
+        )
+    ),
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def run(path: str, ids: dict, rows: int, refresh: bool, offset: int) -> tuple:
+    """(inserts per second, statements per insert) for `rows` inserts through one path"""
+    create = PATHS[path]
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    started = time.perf_counter()
+    try:
+        for i in range(offset, offset + rows):
+            db = ExpiringSession() if refresh else SessionLocal()
+            try:
+                row = create(db, ids, i)
+                if refresh:
+                    db.refresh(row)
+                row.id, row.created_at
+            finally:
+                db.close()
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", counter)
+    return rows / elapsed, counter.count / rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000, help="inserts per path and mode")
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=list(PATHS))
+    args = parser.parse_args()
+
+    upgrade_to_head()
+    warm_up = min(args.rows, 100)
+    ids = _fixtures(warm_up + 2 * args.rows)
+    print(f"{args.rows} inserts per path, one session each")
+    print(f"{'path':<24}{'refresh':>22}{'no refresh':>22}{'speedup':>10}")
+    for path in args.paths:
+        run(path, ids, warm_up, False, 0)
+        before, before_statements = run(path, ids, args.rows, True, warm_up)
+        after, after_statements = run(path, ids, args.rows, False, warm_up + args.rows)
+        print(
+            f"{path:<24}{before:>10.0f}/s {before_statements:>4.1f} stmts"
+            f"{after:>10.0f}/s {after_statements:>4.1f} stmts{after / before:>9.2f}x"
+        )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
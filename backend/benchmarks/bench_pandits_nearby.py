@@ -0,0 +1,71 @@
+"""Query latency of the nearby-pandits grid index over a synthetic directory.
+
+Places pandits at the gazetteer's city centroids (as pandits who give only
+their city are) or scattered around them (as those who give coordinates
+are), then times distance-sorted searches by radius, with and without a
+puja type restricting the candidates. No database is needed.
+
+    cd backend
+    python -m benchmarks.bench_pandits_nearby --pandits 100000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.gazetteer import gazetteer
+from app.geo import GeoIndex
+
+
+def synthetic_locations(count: int, rng: random.Random):
+    centroids = sorted({point for _, _, point in gazetteer.entries()})
+    # Big cities first in the file: weight them up
+    weights = [1 / (rank + 1) ** 0.5 for rank in range(len(centroids))]
+    for _ in range(count):
+        lat, lng = rng.choices(centroids, weights)[0]
+        if rng.random() < 0.4:
+            lat, lng = lat + rng.gauss(0, 0.15), lng + rng.gauss(0, 0.15)
+        yield uuid4(), lat, lng
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pandits", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    locations = list(synthetic_locations(args.pandits, rng))
+    index = GeoIndex()
+    started = time.perf_counter()
+    index.rebuild(locations)
+    print(f"indexed {len(index):,d} pandits in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    pandit = SimpleNamespace(id=locations[0][0], approved=True, latitude=19.0, longitude=73.0)
+    started = time.perf_counter()
+    index.update(pandit)
+    print(f"incremental update {(time.perf_counter() - started) * 1000:.3f} ms")
+
+    # Pandits booked for one puja type: a few percent of the directory
+    booked = {pandit_id for pandit_id, _, _ in rng.sample(locations, args.pandits // 20)}
+    centroids = [point for _, _, point in gazetteer.entries()]
+    for radius in (10, 50, 200, 500):
+        for label, only in (("all", None), ("puja type", booked)):
+            latencies = []
+            for _ in range(args.queries):
+                lat, lng = rng.choice(centroids)
+                lat, lng = lat + rng.uniform(-0.2, 0.2), lng + rng.uniform(-0.2, 0.2)
+                started = time.perf_counter()
+                index.nearby(lat, lng, radius, args.limit, only)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            print(
+                f"{radius:>4d} km {label:<9} p50 {latencies[len(latencies) // 2]:>7.3f} ms   "
+                f"p99 {latencies[int(len(latencies) * 0.99)]:>7.3f} ms   max {latencies[-1]:>7.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
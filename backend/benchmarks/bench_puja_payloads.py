@@ -0,0 +1,100 @@
+"""Response size and latency of the full vs summary puja projections.
+
+"full" is what the API sent before: every puja type with its detailed
+description and benefits loaded and serialized, both in the /api/pujas
+listing and nested in every booking. "summary" is the current behavior
+(deferred columns, PujaTypeSummary). Each case runs the query and the JSON
+serialization the endpoint does, in-process, against the seeded database
+(python -m app.seed_data_detailed).
+
+    cd backend
+    python -m benchmarks.bench_puja_payloads --iterations 200
+"""
+import argparse
+import time
+from typing import Callable, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload, undefer_group
+
+from app import crud, models, schemas
+from app.database import SessionLocal, engine
+from app.pagination import MAX_PAGE_SIZE, PageParams
+
+
+class FullBookingResponse(schemas.BookingResponse):
+    puja_type: Optional[schemas.PujaTypeResponse] = None
+
+
+full_listing = TypeAdapter(List[schemas.PujaTypeResponse])
+summary_listing = TypeAdapter(List[schemas.PujaTypeSummary])
+full_bookings = TypeAdapter(schemas.Page[FullBookingResponse])
+summary_bookings = TypeAdapter(schemas.Page[schemas.BookingResponse])
+PAGE = PageParams(limit=MAX_PAGE_SIZE)
+
+
+def pujas_full(db) -> bytes:
+    pujas = db.execute(select(models.PujaType).options(undefer_group("details"))).scalars().all()
+    return full_listing.dump_json([schemas.PujaTypeResponse.model_validate(puja) for puja in pujas])
+
+
+def pujas_summary(db) -> bytes:
+    pujas = db.execute(select(models.PujaType)).scalars().all()
+    return summary_listing.dump_json([schemas.PujaTypeSummary.model_validate(puja) for puja in pujas])
+
+
+def bookings_full(db) -> bytes:
+    query = crud.select_bookings().options(selectinload(models.Booking.puja_type).undefer_group("details"))
+    page = crud.get_bookings_page(db, query, PAGE)
+    return full_bookings.dump_json(full_bookings.validate_python(page, from_attributes=True))
+
+
+def bookings_summary(db) -> bytes:
+    page = crud.get_bookings_page(db, crud.select_bookings(), PAGE)
+    return summary_bookings.dump_json(summary_bookings.validate_python(page, from_attributes=True))
+
+
+def measure(case: Callable, iterations: int) -> dict:
+    """Bytes of one response and latency percentiles over fresh sessions"""
+    latencies = []
+    size = 0
+    for _ in range(iterations):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            size = len(case(db))
+            latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    latencies.sort()
+    return {
+        "bytes": size,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("/api/pujas", pujas_full, pujas_summary),
+        (f"bookings page ({MAX_PAGE_SIZE})", bookings_full, bookings_summary),
+    ]
+    for name, full, summary in cases:
+        measure(full, 10), measure(summary, 10)  # warm up
+        before, after = measure(full, args.iterations), measure(summary, args.iterations)
+        for label, result in (("full", before), ("summary", after)):
+            print(
+                f"{name:<22} {label:<8} {result['bytes']:>9,d} bytes   "
+                f"p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms"
+            )
+        print(f"{'':<22} {before['bytes'] / max(after['bytes'], 1):.1f}x smaller")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
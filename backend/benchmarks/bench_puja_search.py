@@ -0,0 +1,97 @@
+"""Query latency of the puja search index over a synthetic catalog.
+
+Builds the index in memory from generated bilingual pujas (no database
+needed) and times searches by kind: full words, as-you-type prefixes in
+English and Devanagari, and multi-word queries.
+
+    cd backend
+    python -m benchmarks.bench_puja_search --pujas 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from app import models
+from app.search import PujaSearchIndex
+
+DEITIES = [
+    ("गणेश", "Ganesh"), ("शिव", "Shiva"), ("रुद्र", "Rudra"), ("लक्ष्मी", "Lakshmi"), ("दुर्गा", "Durga"),
+    ("हनुमान", "Hanuman"), ("सत्यनारायण", "Satyanarayan"), ("नवग्रह", "Navgraha"), ("सरस्वती", "Saraswati"),
+    ("काली", "Kali"), ("विष्णु", "Vishnu"), ("कृष्ण", "Krishna"), ("राम", "Ram"), ("शनि", "Shani"),
+    ("सूर्य", "Surya"), ("चंडी", "Chandi"), ("भैरव", "Bhairav"), ("कुबेर", "Kuber"),
+]
+RITUALS = [
+    ("पूजा", "Puja"), ("अभिषेक", "Abhishek"), ("हवन", "Havan"), ("जाप", "Jaap"), ("पाठ", "Path"),
+    ("शांति", "Shanti"), ("व्रत", "Vrat"), ("आरती", "Aarti"), ("यज्ञ", "Yagya"), ("कथा", "Katha"),
+]
+SYLLABLES = ["ka", "ra", "ma", "na", "sha", "vi", "de", "pu", "ja", "ti", "lo", "ga", "ha", "ya", "su", "dh"]
+
+
+def synthetic_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_catalog(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    # A Zipf-ish vocabulary for the body text: a few words are everywhere
+    vocabulary = [synthetic_word(rng) for _ in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for number in range(count):
+        (deity_local, deity_en), (ritual_local, ritual_en) = rng.choice(DEITIES), rng.choice(RITUALS)
+        body = rng.choices(vocabulary, weights, k=rng.randint(15, 60))
+        yield models.PujaType(
+            id=uuid4(),
+            name_local=f"{deity_local} {ritual_local} {number}",
+            name_en=f"{deity_en} {ritual_en} {synthetic_word(rng)}",
+            description=" ".join(body[:12]),
+            benefits=" ".join(body[12:]),
+            min_price=500,
+            default_price=1100,
+            is_virtual=False,
+            created_at=datetime.utcnow(),
+        )
+
+
+QUERIES = {
+    "word": ["rudra", "havan", "shanti", "kuber", "गणेश", "अभिषेक"],
+    "prefix": ["r", "sa", "rud", "hanu", "laksh", "ग", "रु", "सत्य", "नवग्र"],
+    "multi-word": ["shiva abhishek", "ganesh pu", "durga path", "शिव अभि", "kali yagya kara"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pujas", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    pujas = list(synthetic_catalog(args.pujas))
+    index = PujaSearchIndex()
+    started = time.perf_counter()
+    index.rebuild(pujas)
+    print(f"indexed {len(index):,d} pujas in {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    index.upsert(pujas[0])
+    print(f"incremental update {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    for kind, queries in QUERIES.items():
+        latencies = []
+        for _ in range(args.rounds):
+            for query in queries:
+                started = time.perf_counter()
+                index.search(query, args.limit)
+                latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        print(
+            f"{kind:<11} p50 {latencies[len(latencies) // 2]:>7.3f} ms   "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:>7.3f} ms   "
+            f"max {latencies[-1]:>7.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
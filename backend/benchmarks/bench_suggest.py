@@ -0,0 +1,76 @@
+"""Latency of the phonetic name suggestions over a synthetic catalog.
+
+Indexes generated puja names (English and Hindi spellings) and pandit
+names in memory, then times type-ahead queries in both scripts as they are
+typed one character at a time. The budget is 5 ms at p99.
+
+    cd backend
+    python -m benchmarks.bench_suggest --pujas 2000 --pandits 20000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.phonetic import NameIndex
+
+from .bench_puja_search import DEITIES, RITUALS, synthetic_word
+
+FIRST_NAMES = [
+    "Ramesh", "Suresh", "Mahesh", "Dinesh", "Rajesh", "Mukesh", "Ganesh", "Umesh", "Hari", "Shyam",
+    "Krishna", "Gopal", "Mohan", "Sohan", "Vishnu", "Shankar", "Raghav", "Madhav", "Keshav", "Govind",
+    "Anil", "Sunil", "Vinod", "Pramod", "Ashok", "Alok", "Deepak", "Prakash", "Om", "Shiv",
+]
+SURNAMES = [
+    "Sharma", "Shastri", "Tiwari", "Trivedi", "Dwivedi", "Chaturvedi", "Mishra", "Pandey", "Upadhyay",
+    "Dubey", "Joshi", "Bhatt", "Vyas", "Awasthi", "Bajpai", "Shukla", "Tripathi", "Pathak", "Dixit", "Acharya",
+]
+
+QUERIES = ["rudrabhishek", "रुद्राभिषेक", "satyanarayan katha", "सत्यनारायण कथा", "ramesh sharma", "pandit gopal joshi"]
+
+
+def build(pujas: int, pandits: int, seed: int = 7) -> NameIndex:
+    rng = random.Random(seed)
+    index = NameIndex()
+    for _ in range(pujas):
+        (deity_local, deity_en), (ritual_local, ritual_en) = rng.choice(DEITIES), rng.choice(RITUALS)
+        suffix = synthetic_word(rng)
+        index.add_puja(SimpleNamespace(
+            id=uuid4(), name_en=f"{deity_en} {ritual_en} {suffix}", name_local=f"{deity_local} {ritual_local}"
+        ))
+    for _ in range(pandits):
+        name = f"Pandit {rng.choice(FIRST_NAMES)} {synthetic_word(rng).title()} {rng.choice(SURNAMES)}"
+        index.add_pandit(SimpleNamespace(id=uuid4(), user=SimpleNamespace(name=name)))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pujas", type=int, default=2000)
+    parser.add_argument("--pandits", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.pujas, args.pandits)
+    print(f"indexed {len(index):,d} names in {time.perf_counter() - started:.1f} s")
+
+    # Every prefix of every query, as a devotee types it
+    typed = [query[:end] for query in QUERIES for end in range(1, len(query) + 1)]
+    latencies = []
+    for _ in range(args.rounds):
+        for text in typed:
+            started = time.perf_counter()
+            index.suggest(text, limit=10)
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{len(latencies):,d} queries   p50 {latencies[len(latencies) // 2]:.3f} ms   "
+        f"p99 {p99:.3f} ms   max {latencies[-1]:.3f} ms   ({'within' if p99 < 5 else 'over'} the 5 ms budget)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""EXPLAIN the crud queries against a large generated dataset, with and without indexes.
+
+Builds a scratch Postgres schema, migrates it to the initial schema (0001),
+bulk-loads ~1M bookings with generate_series, and EXPLAINs the SQL that the
+crud functions actually emit (captured with a cursor listener). It then
+upgrades to head, which adds the query indexes, and EXPLAINs again, so each
+query is reported with the access path before and after.
+
+    cd backend
+    python -m benchmarks.explain_indexes --bookings 1000000
+    python -m benchmarks.explain_indexes --analyze   # also run the queries for timings
+
+The schema is dropped at the end unless --keep is given.
+"""
+import argparse
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+from urllib.parse import quote
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import Session
+
+from app import counters, crud, models
+from app.database import DATABASE_URL
+from app.migrations import ALEMBIC_INI
+
+SCAN_NODES = ("Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+LOAD_SQL = """
+INSERT INTO users (id, name, phone, hashed_password, role, token_version, city, state, created_at)
+SELECT gen_random_uuid(), 'User ' || g, (910000000000 + g)::text, 'x', 'USER', 0,
+       'City ' || (g % 200), 'State ' || (g % 30), now() - random() * interval '730 days'
+FROM generate_series(1, :users) g;
+
+INSERT INTO pandits (id, user_id, city, state, approved, created_at)
+SELECT gen_random_uuid(), id, city, state, random() < 0.95, created_at
+FROM users ORDER BY random() LIMIT :pandits;
+
+INSERT INTO puja_types (id, name_local, name_en, min_price, default_price, is_virtual, created_at)
+SELECT gen_random_uuid(), 'पूजा ' || g, 'Puja ' || g, 500, 1100, g % 5 = 0, now()
+FROM generate_series(1, 50) g;
+
+INSERT INTO bookings (id, user_id, pandit_id, puja_type_id, scheduled_at, status, price, created_at, updated_at)
+SELECT gen_random_uuid(),
+       u.ids[1 + floor(random() * array_length(u.ids, 1))::int],
+       p.ids[1 + floor(random() * array_length(p.ids, 1))::int],
+       t.ids[1 + floor(random() * array_length(t.ids, 1))::int],
+       now() - interval '365 days' + random() * interval '730 days',
+       (ARRAY['PENDING', 'CONFIRMED', 'COMPLETED', 'CANCELLED'])[1 + floor(random() * 4)::int]::bookingstatus,
+       1100, now() - random() * interval '730 days', now()
+FROM generate_series(1, :bookings) g,
+     (SELECT array_agg(id) AS ids FROM users) u,
+     (SELECT array_agg(id) AS ids FROM pandits) p,
+     (SELECT array_agg(id) AS ids FROM puja_types) t;
+
+INSERT INTO payments (id, booking_id, amount, provider, provider_payment_id, status, created_at, updated_at)
+SELECT gen_random_uuid(), id, price, 'razorpay', 'order_' || md5(id::text),
+       CASE WHEN random() < 0.8 THEN 'SUCCESS' ELSE 'PENDING' END::paymentstatus, created_at, now()
+FROM bookings WHERE random() < 0.6;
+
+INSERT INTO consultations (id, user_id, pandit_id, consultation_date, price, status, created_at)
+SELECT gen_random_uuid(), b.user_id, b.pandit_id, b.scheduled_at, 500, 'PENDING', b.created_at
+FROM bookings b WHERE random() < 0.2;
+"""
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", ALEMBIC_INI.rsplit("/", 1)[0] + "/alembic")
+    # env.py prefers an explicit URL over DATABASE_URL; escape % for configparser
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def with_search_path(url: str, schema: str) -> str:
+    """Point every connection made from url at the scratch schema"""
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}options={quote(f'-csearch_path={schema}')}"
+
+
+@contextmanager
+def captured_statements(engine):
+    """Collect (statement, parameters) for every query run while active"""
+    statements: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def scans(plan: dict) -> List[str]:
+    """Scan nodes of a JSON plan as 'Node Type on relation [index]'"""
+    found = []
+    if plan["Node Type"] in SCAN_NODES:
+        target = plan.get("Relation Name") or ""
+        index = plan.get("Index Name")
+        found.append(plan["Node Type"] + (f" on {target}" if target else "") + (f" [{index}]" if index else ""))
+    for child in plan.get("Plans", []):
+        found.extend(scans(child))
+    return found
+
+
+def explain(engine, statement: str, parameters, analyze: bool) -> Tuple[List[str], float]:
+    """Plan summary and total cost (or execution time with analyze) for one statement"""
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN ({options}) {statement}", parameters)
+        result = cursor.fetchone()[0]
+        raw.rollback()
+    finally:
+        raw.close()
+    document = result if isinstance(result, list) else json.loads(result)
+    plan = document[0]
+    figure = plan["Execution Time"] if analyze else plan["Plan"]["Total Cost"]
+    return scans(plan["Plan"]), figure
+
+
+def build_queries(db: Session) -> List[Tuple[str, Callable[[], object]]]:
+    """The crud calls to explain, with arguments taken from the generated data"""
+    user_id, pandit_id = db.execute(text("SELECT user_id, pandit_id FROM bookings LIMIT 1")).one()
+    booking_id, order_id = db.execute(
+        text("SELECT booking_id, provider_payment_id FROM payments LIMIT 1")
+    ).one()
+    phone = db.execute(text("SELECT phone FROM users LIMIT 1")).scalar()
+    return [
+        ("crud.get_user_by_phone", lambda: crud.get_user_by_phone(db, phone)),
+        ("crud.get_user_bookings", lambda: crud.get_user_bookings(db, user_id)),
+        ("crud.get_pandit_bookings", lambda: crud.get_pandit_bookings(db, pandit_id)),
+        ("crud.get_all_bookings", lambda: crud.get_all_bookings(db)),
+        ("crud.get_all_users", lambda: crud.get_all_users(db)),
+        ("crud.get_pandit_consultations", lambda: crud.get_pandit_consultations(db, pandit_id)),
+        ("crud.get_payment_by_booking_id", lambda: crud.get_payment_by_booking_id(db, booking_id)),
+        # Same shape as the Razorpay verify and webhook lookups in routers/payments.py
+        ("payments: lookup by provider_payment_id", lambda: db.execute(
+            select(models.Payment).where(models.Payment.provider_payment_id == order_id)
+        ).scalars().first()),
+        # The admin stats recount run by the counters reconciliation job
+        ("counters.admin_stats_query", lambda: db.execute(counters.admin_stats_query()).one()),
+    ]
+
+
+def explain_all(engine, analyze: bool) -> List[Tuple[str, List[str], float]]:
+    """Run each crud query once, capturing its SQL, then EXPLAIN what it sent"""
+    rows = []
+    with Session(engine) as db:
+        for label, call in build_queries(db):
+            with captured_statements(engine) as statements:
+                call()
+            for number, (statement, parameters) in enumerate(statements, start=1):
+                name = label if len(statements) == 1 else f"{label} #{number}"
+                plan, figure = explain(engine, statement, parameters, analyze)
+                rows.append((name, plan, figure))
+            db.rollback()
+    return rows
+
+
+def report(before, after, analyze: bool) -> None:
+    unit = "ms" if analyze else "cost"
+    for (name, plan_before, figure_before), (_, plan_after, figure_after) in zip(before, after):
+        print(f"\n{name}")
+        print(f"  before ({figure_before:>12.2f} {unit}): {'; '.join(plan_before)}")
+        print(f"  after  ({figure_after:>12.2f} {unit}): {'; '.join(plan_after)}")
+    still_sequential = [name for name, plan, _ in after if any(p.startswith("Seq Scan") for p in plan)]
+    print()
+    if still_sequential:
+        # Unfiltered counts (most of the admin stats recount) scan the table by design
+        print("Sequential scans remaining at head: " + ", ".join(still_sequential))
+    else:
+        print("Every query uses an index at head.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DATABASE_URL, help="Postgres URL (default DATABASE_URL)")
+    parser.add_argument("--schema", default="explain_bench")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--pandits", type=int, default=2_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the queries)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    if not args.url.startswith("postgres"):
+        parser.error("the EXPLAIN output is Postgres specific; pass a postgresql:// --url")
+
+    admin = create_engine(args.url)
+    with admin.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{args.schema}"'))
+
+    url = with_search_path(args.url, args.schema)
+    engine = create_engine(url)
+    config = alembic_config(url)
+    try:
+        command.upgrade(config, "0001")
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            for statement in LOAD_SQL.split(";\n"):
+                if statement.strip():
+                    conn.execute(text(statement), {
+                        "users": args.users, "pandits": args.pandits, "bookings": args.bookings,
+                    })
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+            counts = {
+                table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+                for table in ("users", "pandits", "bookings", "payments", "consultations")
+            }
+        print(f"Loaded in {time.perf_counter() - started:.1f}s: "
+              + ", ".join(f"{table}={count:,}" for table, count in counts.items()))
+
+        before = explain_all(engine, args.analyze)
+
+        started = time.perf_counter()
+        command.upgrade(config, "head")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"Migrated to head (index builds) in {time.perf_counter() - started:.1f}s")
+
+        after = explain_all(engine, args.analyze)
+        report(before, after, args.analyze)
+    finally:
+        engine.dispose()
+        if not args.keep:
+            with admin.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ export ADMIN_PASSWORD="Admin@123"
 rm -f hargharpooja.db
 
 echo "📦 Installing minimal dependencies..."
-pip3 install --quiet --break-system-packages fastapi uvicorn sqlalchemy pydantic python-jose passlib python-dotenv bcrypt cryptography pydantic-settings 2>/dev/null || pip3 install fastapi uvicorn sqlalchemy pydantic python-jose passlib python-dotenv bcrypt cryptography pydantic-settings
+pip3 install --quiet --break-system-packages fastapi uvicorn sqlalchemy alembic pydantic python-jose passlib python-dotenv bcrypt cryptography pydantic-settings 2>/dev/null || pip3 install fastapi uvicorn sqlalchemy alembic pydantic python-jose passlib python-dotenv bcrypt cryptography pydantic-settings
 
 echo "🌱 Seeding database..."
 python3 -m app.seed_data
@@ -50,7 +50,7 @@ source venv/bin/activate
 # Install dependencies
 echo "📦 Installing dependencies (this may take a minute)..."
 pip install -q --upgrade pip setuptools wheel
-pip install -q fastapi uvicorn sqlalchemy pydantic pydantic-settings python-jose passlib python-multipart python-dotenv razorpay stripe httpx bcrypt cryptography
+pip install -q fastapi uvicorn "sqlalchemy[asyncio]" aiosqlite alembic numpy pydantic pydantic-settings python-jose passlib python-multipart python-dotenv razorpay stripe httpx bcrypt cryptography
 
 echo "🗄️ Setting up database..."
 # Remove old database
@@ -70,11 +70,11 @@ echo -e "${BLUE}Step 3: Fetching Available Pandits${NC}"
 echo -e "${YELLOW}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
 
 PANDITS_RESPONSE=$(curl -s $BASE_URL/api/pandits)
-PANDIT_COUNT=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; print(len(json.load(sys.stdin)))")
+PANDIT_COUNT=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; print(len(json.load(sys.stdin)['items']))")
 echo -e "${GREEN}✅ Found $PANDIT_COUNT approved pandits${NC}"
 
-PANDIT_ID=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; pandits=json.load(sys.stdin); print(pandits[0]['id'])")
-PANDIT_CITY=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; pandits=json.load(sys.stdin); print(pandits[0]['city'])")
+PANDIT_ID=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; pandits=json.load(sys.stdin)['items']; print(pandits[0]['id'])")
+PANDIT_CITY=$(echo $PANDITS_RESPONSE | python3 -c "import sys,json; pandits=json.load(sys.stdin)['items']; print(pandits[0]['city'])")
 
 echo "   Selected Pandit from: $PANDIT_CITY"
 echo "   ID: $PANDIT_ID"
@@ -174,15 +174,15 @@ echo -e "${YELLOW}━━━━━━━━━━━━━━━━━━━━
 MY_BOOKINGS=$(curl -s $BASE_URL/api/bookings/my-bookings \
   -H "Authorization: Bearer $TOKEN")
 
-BOOKING_COUNT=$(echo $MY_BOOKINGS | python3 -c "import sys,json; print(len(json.load(sys.stdin)))")
+BOOKING_COUNT=$(echo $MY_BOOKINGS | python3 -c "import sys,json; print(len(json.load(sys.stdin)['items']))")
 
 echo -e "${GREEN}✅ Found $BOOKING_COUNT total bookings${NC}"
 echo ""
 echo "Recent bookings:"
 echo $MY_BOOKINGS | python3 -c "
 import sys, json
-bookings = json.load(sys.stdin)
-for i, b in enumerate(bookings[-3:], 1):
+bookings = json.load(sys.stdin)['items']  # newest first
+for i, b in enumerate(bookings[:3], 1):
     print(f\"   {i}. {b['puja_type']['name_local']} - Status: {b['status'].upper()} - ₹{b['price']}\")
 "
 echo ""
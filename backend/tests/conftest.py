@@ -0,0 +1,24 @@
+import pytest
+
+from app import auth, crud, models, schemas
+from app.database import SessionLocal
+
+ADMIN_PHONE = "919999000011"
+
+
+@pytest.fixture
+def admin_headers():
+    """Issues Authorization headers for the test admin (created on first use), fresh on every call"""
+    def issue() -> dict:
+        db = SessionLocal()
+        admin = crud.get_user_by_phone(db, ADMIN_PHONE)
+        if admin is None:
+            admin = crud.create_user(
+                db,
+                schemas.UserCreate(name="Test Admin", phone=ADMIN_PHONE, password="Admin@123"),
+                role=models.UserRole.ADMIN
+            )
+        token = auth.create_access_token({"sub": admin.phone}, user=admin)
+        db.close()
+        return {"Authorization": f"Bearer {token}"}
+    return issue
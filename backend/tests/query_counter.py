@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import async_engine, engine
+
+# Both the sync engine and the async engine's sync core, so the helper covers
+# endpoints on either session type
+ENGINES = (engine, async_engine.sync_engine)
+
+
+class QueryCounter:
+    """Statements executed on the application engines while active"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries():
+    """Count every statement the app sends to the database inside the block"""
+    counter = QueryCounter()
+    for target in ENGINES:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in ENGINES:
+            event.remove(target, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if the block sends more than ``limit`` statements to the database"""
+    with count_queries() as counter:
+        yield counter
+    assert counter.count <= limit, (
+        f"expected at most {limit} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+    )
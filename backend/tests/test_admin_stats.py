@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import counters, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_counters_follow_writes(admin_headers):
+    """Each ORM write moves the counters it affects, and a recount finds no drift"""
+    db = SessionLocal()
+    headers = admin_headers()
+    with TestClient(app) as client:
+        before = client.get("/api/admin/stats", headers=headers).json()
+
+        user = models.User(name="Stats User", phone="918600000001", hashed_password="x")
+        puja = models.PujaType(name_local="पूजा", name_en="Stats Puja", min_price=500, default_price=1100)
+        db.add_all([user, puja])
+        db.commit()
+        pandit = models.Pandit(user_id=user.id, city="Ujjain", state="Madhya Pradesh")
+        booking = models.Booking(
+            user_id=user.id, puja_type_id=puja.id, price=1100, scheduled_at=datetime.utcnow() + timedelta(days=3)
+        )
+        db.add_all([pandit, booking])
+        db.commit()
+        payment = models.Payment(booking_id=booking.id, amount=1100, provider="mock")
+        db.add(payment)
+        db.commit()
+
+        # Approval and payment capture, with attributes expired by the commits above
+        pandit.approved = True
+        user.role = models.UserRole.PANDIT
+        payment.status = models.PaymentStatus.SUCCESS
+        db.commit()
+
+        after = client.get("/api/admin/stats", headers=headers).json()
+
+    assert after["total_users"] == before["total_users"]  # registered, then became a pandit
+    assert after["total_pandits"] == before["total_pandits"] + 1
+    assert after["pending_approvals"] == before["pending_approvals"]  # applied, then approved
+    assert after["total_bookings"] == before["total_bookings"] + 1
+    assert after["total_revenue"] == before["total_revenue"] + 1100
+    assert not any(counters.reconcile(db).values())
+    db.close()
+
+
+def test_reconcile_corrects_drift(admin_headers):
+    db = SessionLocal()
+    headers = admin_headers()
+    assert db.query(models.AdminCounters).count() == counters.COUNTERS_SHARDS + 1
+    # Writes that bypass the ORM are not counted
+    db.execute(text("UPDATE admin_counters SET total_bookings = total_bookings + 5 WHERE id = 1"))
+    db.commit()
+
+    drift = counters.reconcile(db)
+
+    assert drift["total_bookings"] == -5
+    with TestClient(app) as client:
+        stats = client.get("/api/admin/stats", headers=headers).json()
+    assert stats["total_bookings"] == db.query(models.Booking).count()
+    db.close()
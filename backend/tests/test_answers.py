@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.answers import answer_cache, question_key
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_question_key_ignores_case_punctuation_stopwords_and_order():
+    assert question_key("Puja price?") == question_key("price of the puja") == "price puja"
+    assert question_key("पूजा की कीमत") == question_key("कीमत, पूजा!")
+
+
+def test_chatbot_serves_repeat_questions_from_cache_until_the_catalog_changes():
+    db = SessionLocal()
+    admin = models.User(name="Answers Admin", phone="918500004444", hashed_password="x", role=models.UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        first = client.post("/api/chatbot", json={"question": "Which puja brings peace at home?"}).json()
+        before = client.get("/api/admin/metrics/chatbot-cache", headers=headers).json()
+        again = client.post("/api/chatbot", json={"question": "peace at home: which puja brings it"}).json()
+        after = client.get("/api/admin/metrics/chatbot-cache", headers=headers).json()
+
+        client.post(
+            "/api/admin/pujas",
+            json={"name_local": "शांति पाठ", "name_en": "Shanti Path", "benefits": "Peace at home",
+                  "min_price": 500, "default_price": 1100},
+            headers=headers,
+        )
+        fresh = client.post("/api/chatbot", json={"question": "Which puja brings peace at home?"}).json()
+
+    assert again == first
+    assert after["hits"] == before["hits"] + 1
+    assert "शांति पाठ" in [puja["name"] for puja in fresh["suggested_pujas"]]
+    assert answer_cache.stats()["size"] == 1
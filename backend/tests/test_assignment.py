@@ -0,0 +1,104 @@
+import itertools
+import random
+from datetime import date, datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.assignment import PendingBooking, city_key, min_cost_assignment, plan_assignments
+from app.availability import PanditCalendar
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_min_cost_assignment_matches_brute_force():
+    rng = np.random.default_rng(1)
+    for rows, columns in [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5), (2, 7)]:
+        for _ in range(20):
+            cost = rng.integers(0, 10, (rows, columns)).astype(float)
+            pairs = min_cost_assignment(cost)
+            if rows <= columns:
+                best = min(sum(cost[row, column] for row, column in enumerate(pick))
+                           for pick in itertools.permutations(range(columns), rows))
+            else:
+                best = min(sum(cost[row, column] for column, row in enumerate(pick))
+                           for pick in itertools.permutations(range(rows), columns))
+            assert len(pairs) == min(rows, columns)
+            assert len({row for row, _ in pairs}) == len({column for _, column in pairs}) == len(pairs)
+            assert sum(cost[row, column] for row, column in pairs) == best
+
+
+def test_plan_respects_city_calendars_and_experience():
+    rng = random.Random(2)
+    new_id = lambda: UUID(int=rng.getrandbits(128))
+    havan, katha = new_id(), new_id()
+    veteran, newcomer, elsewhere = new_id(), new_id(), new_id()
+    mumbai, pune = city_key("Bombay"), city_key("Pune")
+    pandits = {veteran: mumbai, newcomer: mumbai, elsewhere: pune}
+    calendars = {pandit_id: PanditCalendar(pandit_id) for pandit_id in pandits}
+    morning = datetime(2030, 5, 6, 9)
+
+    def booking(start, puja_type_id=havan, city=mumbai, is_virtual=False):
+        return PendingBooking(new_id(), puja_type_id, start, start + timedelta(hours=2), city, is_virtual)
+
+    first, second, third = booking(morning), booking(morning), booking(morning)
+    later = booking(morning + timedelta(hours=3))
+    stranded = booking(morning, city=city_key("Nagpur"))
+    online = booking(morning, puja_type_id=katha, is_virtual=True)
+    planned = dict(
+        (booking.id, pandit_id)
+        for booking, pandit_id in plan_assignments(
+            [first, second, third, later, stranded, online], pandits, calendars, {(veteran, havan), (elsewhere, katha)}
+        )
+    )
+
+    # Two Mumbai pandits for three simultaneous bookings; nobody in Nagpur
+    at_nine = [planned[b.id] for b in (first, second, third) if b.id in planned]
+    assert sorted(at_nine) == sorted([veteran, newcomer])
+    assert later.id in planned and stranded.id not in planned
+    # Virtual pujas may go anywhere; the Pune pandit knows the katha
+    assert planned[online.id] == elsewhere
+    assert calendars[veteran].conflict(morning, morning + timedelta(hours=1)) is not None
+
+
+def test_auto_assign_endpoint_writes_assignments():
+    db = SessionLocal()
+    admin = models.User(name="Assign Admin", phone="918500001111", hashed_password="x", role=models.UserRole.ADMIN)
+    devotee = models.User(name="Assign Devotee", phone="918500001112", hashed_password="x", city="Calcutta")
+    pandit_user = models.User(name="Assign Pandit", phone="918500001113", hashed_password="x")
+    db.add_all([admin, devotee, pandit_user])
+    db.flush()
+    pandit = models.Pandit(user_id=pandit_user.id, city="Kolkata", state="West Bengal", approved=True)
+    puja = models.PujaType(name_local="Assign Puja", name_en="Assign Puja", duration_minutes=60, min_price=1, default_price=1)
+    db.add_all([pandit, puja])
+    db.flush()
+    midnight = datetime.combine(date.today() + timedelta(days=30), datetime.min.time())
+    bookings = [
+        models.Booking(user_id=devotee.id, puja_type_id=puja.id, scheduled_at=midnight + timedelta(hours=hour), price=1)
+        for hour in (8, 8, 10)
+    ]
+    db.add_all(bookings)
+    db.commit()
+    booking_ids = [booking.id for booking in bookings]
+    pandit_id = pandit.id
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        forbidden = client.post("/api/admin/bookings/auto-assign")
+        report = client.post("/api/admin/bookings/auto-assign", headers=headers).json()
+
+    db = SessionLocal()
+    assigned = [db.get(models.Booking, booking_id).pandit_id for booking_id in booking_ids]
+    db.close()
+    assert forbidden.status_code in (401, 403)
+    assert report["assigned"] >= 2 and report["batches"] >= 1
+    # One of the two 8 o'clock bookings has to wait for another pandit
+    assert sorted(pandit_id == assigned_to for assigned_to in assigned[:2]) == [False, True]
+    assert assigned[2] == pandit_id
@@ -1,12 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.database import Base, engine
+from app.migrations import upgrade_to_head
 
 client = TestClient(app)
 
 # Create tables for testing
-Base.metadata.create_all(bind=engine)
+upgrade_to_head()
 
 
 def test_register_user():
@@ -126,3 +126,109 @@ def test_unauthorized_access():
     """Test accessing protected route without token"""
     response = client.get("/api/auth/me")
     assert response.status_code == 403  # No credentials provided
+
+
+def test_cached_user_invalidated_on_pandit_approval(admin_headers):
+    """Test role changes revoke old tokens and bypass the authenticated-user cache"""
+
+    token = client.post(
+        "/api/auth/register",
+        json={"name": "Future Pandit", "phone": "919999666688", "password": "Test@123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Prime the cache with the USER role
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "user"
+
+    pandit = client.post(
+        "/api/pandits/apply",
+        json={"city": "Varanasi", "state": "Uttar Pradesh"},
+        headers=headers
+    ).json()
+    response = client.patch(
+        f"/api/admin/pandits/{pandit['id']}/approve",
+        json={"approved": True},
+        headers=admin_headers()
+    )
+    assert response.status_code == 200
+
+    # The old token carries the USER role claim and must be re-issued
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    token = client.post(
+        "/api/auth/login",
+        json={"phone": "919999666688", "password": "Test@123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "pandit"
+
+
+def test_db_pool_metrics_admin_only(admin_headers):
+    """Test pool metrics are reported to admins and hidden from users"""
+    response = client.get(
+        "/api/admin/metrics/db-pool",
+        headers=admin_headers()
+    )
+    assert response.status_code == 200
+    data = response.json()["primary"]
+    assert data["checkouts"] >= 1
+    assert data["wait"]["count"] >= 1
+
+    user_token = client.post(
+        "/api/auth/register",
+        json={"name": "Pool Peeker", "phone": "919999666699", "password": "Test@123"}
+    ).json()["access_token"]
+    response = client.get(
+        "/api/admin/metrics/db-pool",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == 403
+
+
+def test_role_claims_revoked_by_another_worker(admin_headers):
+    """Test admin claims are checked against the user row, not only this process's record"""
+    from app import auth, models
+    from app.database import SessionLocal
+
+    headers = admin_headers()
+    assert client.get("/api/admin/metrics/user-cache", headers=headers).status_code == 200
+
+    # Another worker retires the admin's tokens: this one never hears of it
+    db = SessionLocal()
+    admin = db.query(models.User).filter(models.User.phone == "919999000011").one()
+    admin.token_version = (admin.token_version or 0) + 1
+    db.commit()
+    db.close()
+    auth.user_cache.pop("919999000011")  # as the TTL would
+
+    assert client.get("/api/admin/metrics/user-cache", headers=headers).status_code == 401
+    assert client.get("/api/admin/metrics/user-cache", headers=admin_headers()).status_code == 200
+
+
+def test_demoted_admin_token_loses_booking_access():
+    """Test a role claim is replaced by the user row's role once the row changes"""
+    from datetime import datetime, timedelta
+    from app import auth, models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    admin = models.User(name="Demoted Admin", phone="919999000077", hashed_password="x", role=models.UserRole.ADMIN)
+    devotee = models.User(name="Booking Owner", phone="919999000078", hashed_password="x")
+    puja = models.PujaType(name_local="Demotion Puja", name_en="Demotion Puja", min_price=1, default_price=101)
+    db.add_all([admin, devotee, puja])
+    db.flush()
+    booking = models.Booking(
+        user_id=devotee.id, puja_type_id=puja.id, scheduled_at=datetime.utcnow() + timedelta(days=3), price=101
+    )
+    db.add(booking)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    assert client.get(f"/api/bookings/{booking.id}", headers=headers).status_code == 200
+
+    # Demoted on the row by another worker, without retiring the token
+    admin.role = models.UserRole.USER
+    db.commit()
+    db.close()
+    auth.user_cache.pop("919999000077")  # as the TTL would
+
+    assert client.get(f"/api/bookings/{booking.id}", headers=headers).status_code == 403
@@ -0,0 +1,133 @@
+import random
+import threading
+from datetime import date, datetime, time, timedelta
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.availability import IntervalTree, PanditCalendar
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_interval_tree_matches_a_full_scan():
+    rng = random.Random(5)
+    intervals = []
+    for item in range(2000):
+        start = rng.randrange(0, 100000)
+        intervals.append((start, start + rng.randrange(1, 500), item))
+    tree = IntervalTree(intervals)
+
+    for _ in range(500):
+        start = rng.randrange(-100, 100500)
+        end = start + rng.randrange(1, 300)
+        expected = sorted(
+            (interval for interval in intervals if interval[0] < end and interval[1] > start),
+            key=lambda interval: interval[0],
+        )
+        found = tree.overlapping(start, end)
+        assert sorted(found) == sorted(expected)
+        assert [interval[0] for interval in found] == [interval[0] for interval in expected]
+        assert tree.overlaps(start, end) == bool(expected)
+
+
+def test_free_slots_skip_busy_time_and_blocked_days():
+    monday = date(2030, 1, 7)
+    calendar = PanditCalendar(
+        "pandit",
+        working_hours={0: [(time(9), time(17))], 1: [(time(9), time(12))]},
+        blocked={monday + timedelta(days=1)},
+    )
+    calendar.busy.add(datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 12), "booking")
+    calendar.busy.add(datetime(2030, 1, 7, 16, 30), datetime(2030, 1, 7, 17), "consultation")
+
+    assert calendar.free_slots(monday, monday + timedelta(days=2), 60) == [
+        (datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10)),
+        (datetime(2030, 1, 7, 12), datetime(2030, 1, 7, 16, 30)),
+    ]
+    assert calendar.conflict(datetime(2030, 1, 7, 11), datetime(2030, 1, 7, 13)) == "Pandit is already booked at this time"
+    assert calendar.conflict(datetime(2030, 1, 7, 12), datetime(2030, 1, 7, 14)) is None
+    assert calendar.conflict(datetime(2030, 1, 8, 9), datetime(2030, 1, 8, 10)) is not None
+    # Wednesday has no working hours
+    assert calendar.windows(monday + timedelta(days=2)) == []
+
+
+def test_concurrent_bookings_of_one_slot_admit_one():
+    db = SessionLocal()
+    pandit_user = models.User(name="Calendar Pandit", phone="918500002222", hashed_password="x")
+    devotees = [
+        models.User(name=f"Calendar Devotee {number}", phone=f"91850000223{number}", hashed_password="x")
+        for number in range(4)
+    ]
+    db.add_all([pandit_user, *devotees])
+    db.flush()
+    pandit = models.Pandit(user_id=pandit_user.id, city="Ujjain", state="Madhya Pradesh", approved=True)
+    puja = models.PujaType(name_local="Calendar Puja", name_en="Calendar Puja", duration_minutes=90, min_price=1, default_price=1)
+    db.add_all([pandit, puja])
+    db.commit()
+    pandit_id, puja_id = str(pandit.id), str(puja.id)
+    pandit_headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': pandit_user.phone}, user=pandit_user)}"}
+    devotee_headers = [
+        {"Authorization": f"Bearer {auth.create_access_token({'sub': user.phone}, user=user)}"} for user in devotees
+    ]
+    db.close()
+    day = date(2030, 3, 4)
+
+    with TestClient(app) as client:
+        schedule = client.put(
+            f"/api/pandits/{pandit_id}/schedule",
+            json={
+                "working_hours": [{"weekday": day.weekday(), "start_time": "08:00", "end_time": "12:00"}],
+                "blocked_dates": [{"blocked_on": str(day + timedelta(days=7)), "reason": "Travelling"}],
+            },
+            headers=pandit_headers,
+        )
+        forbidden = client.put(f"/api/pandits/{pandit_id}/schedule", json={}, headers=devotee_headers[0])
+
+        statuses = []
+        barrier = threading.Barrier(3)
+
+        def book(headers):
+            barrier.wait()
+            response = client.post(
+                "/api/bookings",
+                json={"puja_type_id": puja_id, "pandit_id": pandit_id, "scheduled_at": f"{day}T09:00:00"},
+                headers=headers,
+            )
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=book, args=(headers,)) for headers in devotee_headers[:3]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        blocked = client.post(
+            "/api/bookings",
+            json={"puja_type_id": puja_id, "pandit_id": pandit_id, "scheduled_at": f"{day + timedelta(days=7)}T09:00:00"},
+            headers=devotee_headers[3],
+        )
+        slots = client.get(
+            f"/api/pandits/{pandit_id}/availability",
+            params={"date_from": str(day), "date_to": str(day + timedelta(days=7)), "duration_minutes": 60},
+        ).json()
+        too_long = client.get(
+            f"/api/pandits/{pandit_id}/availability",
+            params={"date_from": str(day), "date_to": str(day + timedelta(days=60))},
+        )
+
+    assert schedule.status_code == 200
+    assert schedule.json()["blocked_dates"][0]["reason"] == "Travelling"
+    assert forbidden.status_code == 403
+    assert sorted(statuses) == [201, 409, 409]
+    assert blocked.status_code == 409
+    # 09:00-10:30 is taken, leaving 08:00-09:00 and 10:30-12:00; the next Monday is blocked
+    assert slots == [
+        {"start": f"{day}T08:00:00", "end": f"{day}T09:00:00"},
+        {"start": f"{day}T10:30:00", "end": f"{day}T12:00:00"},
+    ]
+    assert too_long.status_code == 400
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import httpx
+
+from app import auth, events, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_slow_streams_drop_the_oldest_events_and_idle_ones_get_heartbeats():
+    async def scenario():
+        hub = events.EventHub(queue_size=2)
+        user_id = uuid4()
+        stream = events.stream(user_id, event_hub=hub, heartbeat=0.05)
+        first = await stream.__anext__()
+        # Published from a worker thread, as the sync routes do
+        publisher = threading.Thread(
+            target=lambda: [hub.publish(user_id, "booking", {"n": n}) for n in range(3)]
+        )
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0)
+        chunks = [await stream.__anext__() for _ in range(3)]
+        hub.publish(uuid4(), "booking", {"n": 99})  # someone else's booking
+        idle = await stream.__anext__()
+        stats = hub.stats()
+        await stream.aclose()
+        return first, chunks, idle, stats, hub.stats()
+
+    first, chunks, idle, stats, closed = asyncio.run(scenario())
+    assert first.startswith("retry: ")
+    assert chunks[0] == 'event: overflow\ndata: {"dropped":1}\n\n'
+    assert [json.loads(chunk.split("data: ")[1])["n"] for chunk in chunks[1:]] == [1, 2]
+    assert chunks[1].startswith("id: ") and "event: booking" in chunks[1]
+    assert idle == ": keepalive\n\n"
+    assert stats["streams"] == 1 and stats["dropped"] == 1 and stats["published"] == 3
+    assert closed["streams"] == 0
+
+
+def test_stream_reports_a_cancelled_booking():
+    db = SessionLocal()
+    devotee = models.User(name="Streaming Devotee", phone="918500005551", hashed_password="x")
+    puja = models.PujaType(name_local="Stream Puja", name_en="Stream Puja", min_price=1, default_price=501)
+    db.add_all([devotee, puja])
+    db.flush()
+    booking = models.Booking(
+        user_id=devotee.id, puja_type_id=puja.id, scheduled_at=datetime.utcnow() + timedelta(days=9), price=501
+    )
+    db.add(booking)
+    db.commit()
+    booking_id = booking.id
+    token = auth.create_access_token({"sub": devotee.phone}, user=devotee)
+    db.close()
+
+    async def scenario():
+        sent = asyncio.Queue()
+        gone = asyncio.Event()
+
+        async def receive():
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/api/bookings/stream", "raw_path": b"/api/bookings/stream", "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        # Driven by hand: the test clients wait for a response to end, and this one does not
+        streaming = asyncio.create_task(app(scope, receive, sent.put))
+        start = await asyncio.wait_for(sent.get(), 5)
+        await asyncio.wait_for(sent.get(), 5)  # the retry hint
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            cancelled = await client.patch(
+                f"/api/bookings/{booking_id}/cancel", headers={"Authorization": f"Bearer {token}"}
+            )
+        body = b""
+        while b"event: booking" not in body:
+            body += (await asyncio.wait_for(sent.get(), 5))["body"]
+        gone.set()
+        await asyncio.wait_for(streaming, 5)
+        return start, cancelled.status_code, body.decode()
+
+    start, status_code, body = asyncio.run(scenario())
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in start["headers"]
+    assert status_code == 200
+    data = json.loads(body.split("data: ")[1])
+    assert data["booking_id"] == str(booking_id) and data["status"] == "cancelled"
@@ -0,0 +1,81 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.catalog import puja_catalog
+from app.main import app
+from app.migrations import upgrade_to_head
+from tests.query_counter import count_queries
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_catalog_revalidates_without_database(admin_headers):
+    headers = admin_headers()
+    with TestClient(app) as client:
+        created = client.post(
+            "/api/admin/pujas",
+            json={"name_local": "सत्यनारायण", "name_en": "Catalog Puja", "min_price": 500, "default_price": 1100},
+            headers=headers,
+        ).json()
+        listing = client.get("/api/pujas")
+        detail = client.get(f"/api/pujas/{created['id']}")
+        assert listing.status_code == detail.status_code == 200
+        assert any(puja["id"] == created["id"] for puja in listing.json())
+
+        with count_queries() as counter:
+            not_modified = client.get("/api/pujas", headers={"If-None-Match": listing.headers["etag"]})
+            detail_not_modified = client.get(
+                f"/api/pujas/{created['id']}", headers={"If-None-Match": detail.headers["etag"]}
+            )
+            repeat = client.get("/api/pujas")
+        assert not_modified.status_code == detail_not_modified.status_code == 304
+        assert repeat.content == listing.content
+        assert counter.count == 0
+
+        # Unknown IDs are answered from the snapshot too, however often they are asked for
+        with count_queries() as counter:
+            missing = [client.get(f"/api/pujas/{uuid4()}", headers={"If-None-Match": detail.headers["etag"]})
+                       for _ in range(3)]
+        assert [response.status_code for response in missing] == [404] * 3
+        assert counter.count == 0
+
+
+def test_admin_update_bumps_catalog_version(admin_headers):
+    headers = admin_headers()
+    with TestClient(app) as client:
+        puja_id = client.post(
+            "/api/admin/pujas",
+            json={"name_local": "गणेश", "name_en": "Versioned Puja", "min_price": 500, "default_price": 1100},
+            headers=headers,
+        ).json()["id"]
+        first = client.get(f"/api/pujas/{puja_id}")
+        version = puja_catalog.version
+
+        client.patch(f"/api/admin/pujas/{puja_id}", json={"default_price": 2100}, headers=headers)
+        second = client.get(f"/api/pujas/{puja_id}", headers={"If-None-Match": first.headers["etag"]})
+
+    assert puja_catalog.version == version + 1
+    assert second.status_code == 200
+    assert second.json()["default_price"] == 2100
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+def test_listing_carries_summaries_and_detail_the_full_text(admin_headers):
+    headers = admin_headers()
+    with TestClient(app) as client:
+        puja_id = client.post(
+            "/api/admin/pujas",
+            json={
+                "name_local": "हवन", "name_en": "Detailed Puja", "min_price": 500, "default_price": 1100,
+                "detailed_description": "Long text", "benefits": "Peace",
+            },
+            headers=headers,
+        ).json()["id"]
+        listed = next(puja for puja in client.get("/api/pujas").json() if puja["id"] == puja_id)
+        detail = client.get(f"/api/pujas/{puja_id}").json()
+
+    assert "detailed_description" not in listed and "benefits" not in listed
+    assert detail["detailed_description"] == "Long text"
+    assert detail["benefits"] == "Peace"
@@ -0,0 +1,85 @@
+import random
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal
+from app.gazetteer import gazetteer
+from app.geo import GeoIndex, haversine_km
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_gazetteer_knows_former_names_and_disambiguates_by_state():
+    assert gazetteer.locate("Bombay") == gazetteer.locate("mumbai", "Maharashtra") == (19.08, 72.88)
+    assert gazetteer.locate("Atlantis") is None
+    assert 1140 < haversine_km(*gazetteer.locate("Delhi"), *gazetteer.locate("Mumbai")) < 1160
+
+
+def test_nearby_matches_a_full_scan():
+    rng = random.Random(3)
+    centroids = [(rng.uniform(8, 32), rng.uniform(70, 90)) for _ in range(30)]
+    points = {}
+    for _ in range(3000):
+        lat, lng = rng.choice(centroids)
+        # Half at a city centroid, half spread around it
+        if rng.random() < 0.5:
+            lat, lng = lat + rng.uniform(-0.5, 0.5), lng + rng.uniform(-0.5, 0.5)
+        points[UUID(int=rng.getrandbits(128))] = (lat, lng)
+    index = GeoIndex()
+    index.rebuild((pandit_id, lat, lng) for pandit_id, (lat, lng) in points.items())
+    only = set(rng.sample(sorted(points), 500))
+
+    for _ in range(50):
+        lat, lng = rng.uniform(8, 32), rng.uniform(70, 90)
+        radius = rng.choice([10, 50, 200, 500])
+        for allowed in (None, only):
+            expected = sorted(
+                (distance, pandit_id)
+                for pandit_id, point in points.items()
+                if (allowed is None or pandit_id in allowed)
+                and (distance := haversine_km(lat, lng, *point)) <= radius
+            )[:20]
+            assert index.nearby(lat, lng, radius, 20, allowed) == expected
+
+
+def test_nearby_endpoint_follows_applications_and_approvals():
+    db = SessionLocal()
+    admin = models.User(name="Geo Admin", phone="918500003333", hashed_password="x", role=models.UserRole.ADMIN)
+    devotees = [
+        models.User(name=f"Geo Pandit {number}", phone=f"91850000334{number}", hashed_password="x")
+        for number in range(2)
+    ]
+    db.add_all([admin, *devotees])
+    db.commit()
+    admin_headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    pandit_headers = [
+        {"Authorization": f"Bearer {auth.create_access_token({'sub': user.phone}, user=user)}"} for user in devotees
+    ]
+    db.close()
+
+    with TestClient(app) as client:
+        bombay = client.post("/api/pandits/apply", json={"city": "Bombay", "state": "Maharashtra"}, headers=pandit_headers[0]).json()
+        thane = client.post(
+            "/api/pandits/apply",
+            json={"city": "Thane", "state": "Maharashtra", "latitude": 19.2, "longitude": 72.97},
+            headers=pandit_headers[1],
+        ).json()
+        near_mumbai = {"lat": 19.1, "lng": 72.9, "radius_km": 30}
+        before = client.get("/api/pandits/nearby", params=near_mumbai).json()
+        for pandit in (bombay, thane):
+            client.patch(f"/api/admin/pandits/{pandit['id']}/approve", json={"approved": True}, headers=admin_headers)
+        after = client.get("/api/pandits/nearby", params=near_mumbai).json()
+        far = client.get("/api/pandits/nearby", params={"lat": 28.61, "lng": 77.21, "radius_km": 100}).json()
+        invalid = client.get("/api/pandits/nearby", params={"lat": 95, "lng": 72.9})
+
+    assert (bombay["latitude"], bombay["longitude"]) == (19.08, 72.88)
+    assert before == []
+    assert [pandit["id"] for pandit in after] == [bombay["id"], thane["id"]]
+    assert after[0]["distance_km"] < after[1]["distance_km"] < 30
+    assert all(pandit["id"] not in (bombay["id"], thane["id"]) for pandit in far)
+    assert invalid.status_code == 422
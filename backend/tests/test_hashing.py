@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.migrations import upgrade_to_head
+from app import hashing
+
+client = TestClient(app)
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_login_rejected_when_hash_pool_saturated():
+    """Test login returns 503 once the hashing queue is full"""
+    client.post(
+        "/api/auth/register",
+        json={
+            "name": "Busy Pool",
+            "phone": "919999666677",
+            "password": "Test@123"
+        }
+    )
+
+    saved = hashing.pool.in_flight
+    hashing.pool.in_flight = hashing.pool.workers + hashing.pool.max_queue
+    try:
+        response = client.post(
+            "/api/auth/login",
+            json={
+                "phone": "919999666677",
+                "password": "Test@123"
+            }
+        )
+    finally:
+        hashing.pool.in_flight = saved
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hash_pool_records_latency():
+    """Test hashing through the pool records latency and queue wait"""
+    before = hashing.pool.hash_latency.count
+    response = client.post(
+        "/api/auth/register",
+        json={
+            "name": "Metrics User",
+            "phone": "919999777788",
+            "password": "Test@123"
+        }
+    )
+    assert response.status_code == 201
+    metrics = hashing.pool.metrics()
+    assert metrics["hash_latency"]["count"] == before + 1
+    assert metrics["queue_wait"]["count"] >= 1
+    assert metrics["in_flight"] == 0
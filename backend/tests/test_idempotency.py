@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import auth, idempotency, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def _devotee_and_puja(phone):
+    db = SessionLocal()
+    devotee = models.User(name="Retrying Devotee", phone=phone, hashed_password="x")
+    puja = models.PujaType(name_local="Retry Puja", name_en="Retry Puja", min_price=1, default_price=251)
+    db.add_all([devotee, puja])
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': devotee.phone}, user=devotee)}"}
+    result = devotee.id, str(puja.id), headers
+    db.close()
+    return result
+
+
+def test_retried_booking_and_payment_are_created_once():
+    user_id, puja_id, headers = _devotee_and_puja("918500000111")
+    booking = {"puja_type_id": puja_id, "scheduled_at": "2031-01-05T10:00:00"}
+
+    with TestClient(app) as client:
+        first = client.post("/api/bookings", json=booking, headers={**headers, "Idempotency-Key": "book-1"})
+        retry = client.post("/api/bookings", json=booking, headers={**headers, "Idempotency-Key": "book-1"})
+        reused = client.post(
+            "/api/bookings", json={**booking, "scheduled_at": "2031-01-06T10:00:00"},
+            headers={**headers, "Idempotency-Key": "book-1"},
+        )
+        # Forgetting the cached copy still replays, from the table
+        idempotency.store._cache.clear()
+        from_table = client.post("/api/bookings", json=booking, headers={**headers, "Idempotency-Key": "book-1"})
+
+        payment = {"booking_id": first.json()["id"], "provider": "mock"}
+        paid = client.post("/api/payments/create", json=payment, headers={**headers, "Idempotency-Key": "pay-1"})
+        paid_again = client.post("/api/payments/create", json=payment, headers={**headers, "Idempotency-Key": "pay-1"})
+
+    assert first.status_code == retry.status_code == from_table.status_code == 201
+    assert retry.json() == first.json() == from_table.json()
+    assert retry.headers["idempotent-replayed"] == "true" and "idempotent-replayed" not in first.headers
+    assert reused.status_code == 422
+    assert paid.status_code == paid_again.status_code == 200
+    assert paid_again.json()["id"] == paid.json()["id"]
+    db = SessionLocal()
+    assert db.query(models.Booking).filter(models.Booking.user_id == user_id).count() == 1
+    assert db.query(models.Payment).filter(models.Payment.booking_id == first.json()["id"]).count() == 1
+    db.close()
+
+
+def test_failed_requests_free_their_key_and_expired_keys_are_swept():
+    _, puja_id, headers = _devotee_and_puja("918500000112")
+    headers = {**headers, "Idempotency-Key": "book-2"}
+
+    with TestClient(app) as client:
+        missing = client.post(
+            "/api/bookings", json={"puja_type_id": str(uuid4()), "scheduled_at": "2031-01-05T10:00:00"},
+            headers=headers,
+        )
+        fixed = client.post("/api/bookings", json={"puja_type_id": puja_id, "scheduled_at": "2031-01-05T10:00:00"}, headers=headers)
+
+    assert missing.status_code == 404
+    assert fixed.status_code == 201 and "idempotent-replayed" not in fixed.headers
+
+    db = SessionLocal()
+    now = datetime.utcnow()
+    db.add(models.IdempotencyKey(
+        owner="someone", key="old", fingerprint="0" * 64, status_code=201, response_body="{}",
+        locked_at=now - timedelta(days=2), expires_at=now - timedelta(days=1),
+    ))
+    db.commit()
+    assert idempotency.sweep(db) >= 1
+    assert db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == "old").count() == 0
+    db.close()
@@ -0,0 +1,39 @@
+import json
+import os
+
+from app.intents import Automaton, Intent, IntentMatcher, canonical
+
+
+def test_automaton_finds_overlapping_whole_word_patterns_in_one_pass():
+    shanti, griha, navgraha = Intent("peace", 30, ""), Intent("griha_pravesh", 40, ""), Intent("dosha", 40, "")
+    automaton = Automaton([("shanti", shanti), ("griha pravesh", griha), ("graha", navgraha), ("navgraha shanti", navgraha)])
+    text = canonical("Navgraha Shanti before our Griha-Pravesh; grahan?")
+
+    found = [(match.intent.name, text[match.start:match.end]) for match in automaton.find(text)]
+
+    # "navgraha" does not contain the whole word "graha", nor "grahan"
+    assert found == [("dosha", "navgraha shanti"), ("peace", "shanti"), ("griha_pravesh", "griha pravesh")]
+
+
+def test_matcher_picks_by_priority_and_reloads_the_table(tmp_path):
+    path = tmp_path / "intents.json"
+    table = [
+        {"intent": "puja_info", "priority": 10, "answer": "About pujas", "patterns": ["puja", "पूजा"]},
+        {"intent": "price", "priority": 50, "answer": "About prices", "patterns": ["kitna", "कीमत"]},
+    ]
+    path.write_text(json.dumps(table), encoding="utf-8")
+    matcher = IntentMatcher(str(path), reload_seconds=0)
+
+    assert matcher.intent("Satyanarayan puja kitna hai?").name == "price"
+    assert matcher.intent("पूजा की कीमत").name == "price"
+    assert matcher.intent("shaadi ki puja").name == "puja_info"
+
+    table.append({"intent": "marriage", "priority": 40, "answer": "About marriage", "patterns": ["shaadi"]})
+    path.write_text(json.dumps(table), encoding="utf-8")
+    os.utime(path, (0, 1))
+    assert matcher.intent("shaadi ki puja").name == "marriage"
+
+    # A broken table leaves the last good one in place
+    path.write_text("[{", encoding="utf-8")
+    os.utime(path, (0, 2))
+    assert matcher.intent("shaadi ki puja").name == "marriage"
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal
+from app.hashing import get_password_hash
+from app.main import app
+from app.migrations import upgrade_to_head
+
+# Create tables for testing
+upgrade_to_head()
+
+
+@pytest.fixture(scope="module")
+def booking_user():
+    """A user with seven bookings, all created in the same instant, across two puja types"""
+    db = SessionLocal()
+    user = models.User(name="Paging User", phone="918700000001", hashed_password=get_password_hash("Test@123"))
+    pujas = [
+        models.PujaType(name_local="पूजा", name_en=f"Paging Puja {i}", min_price=500, default_price=1100)
+        for i in range(2)
+    ]
+    db.add_all([user] + pujas)
+    db.flush()
+    created_at = datetime.utcnow()  # identical timestamps exercise the id tie-break
+    for i in range(7):
+        db.add(models.Booking(
+            user_id=user.id, puja_type_id=pujas[i % 2].id, price=1100, created_at=created_at,
+            scheduled_at=created_at + timedelta(days=i + 1),
+            status=models.BookingStatus.CONFIRMED if i < 3 else models.BookingStatus.PENDING,
+        ))
+    db.commit()
+    data = {
+        "headers": {"Authorization": f"Bearer {auth.create_access_token({'sub': user.phone}, user=user)}"},
+        "puja_type_id": str(pujas[0].id),
+    }
+    db.close()
+    return data
+
+
+def test_cursor_walks_every_booking_once(booking_user):
+    seen = []
+    cursor = None
+    with TestClient(app) as client:
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/bookings/my-bookings", params=params, headers=booking_user["headers"])
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= 3
+            seen.extend(booking["id"] for booking in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_filters_apply_server_side(booking_user):
+    with TestClient(app) as client:
+        confirmed = client.get(
+            "/api/bookings/my-bookings", params={"status": "confirmed"}, headers=booking_user["headers"]
+        ).json()
+        by_puja = client.get(
+            "/api/bookings/my-bookings", params={"puja_type_id": booking_user["puja_type_id"]},
+            headers=booking_user["headers"]
+        ).json()
+    assert len(confirmed["items"]) == 3 and confirmed["next_cursor"] is None
+    assert {b["puja_type_id"] for b in by_puja["items"]} == {booking_user["puja_type_id"]}
+    assert len(by_puja["items"]) == 4
+
+
+def test_invalid_cursor_and_limit_rejected(booking_user):
+    with TestClient(app) as client:
+        bad_cursor = client.get("/api/bookings/my-bookings?cursor=not-a-cursor", headers=booking_user["headers"])
+        too_large = client.get("/api/bookings/my-bookings?limit=1000", headers=booking_user["headers"])
+    assert bad_cursor.status_code == 400
+    assert too_large.status_code == 422
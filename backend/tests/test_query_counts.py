@@ -0,0 +1,178 @@
+import hashlib
+import hmac
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth, crud, models, schemas
+from app.database import SessionLocal
+from app.hashing import get_password_hash
+from app.main import app
+from app.migrations import upgrade_to_head
+from app.routers import payments
+from tests.query_counter import assert_max_queries, count_queries
+
+# Create tables for testing
+upgrade_to_head()
+
+ROWS = 12  # well above every budget below, so an N+1 cannot slip under it
+
+
+@pytest.fixture(scope="module")
+def listing_data():
+    """A pandit with bookings from several users across several puja types"""
+    db = SessionLocal()
+    hashed_password = get_password_hash("Test@123")
+    users = [
+        models.User(name=f"Listing User {i}", phone=f"9188000000{i:02d}", hashed_password=hashed_password)
+        for i in range(ROWS)
+    ]
+    admin = models.User(
+        name="Listing Admin", phone="918800009999", hashed_password=hashed_password, role=models.UserRole.ADMIN
+    )
+    pandit_user = models.User(
+        name="Listing Pandit", phone="918800008888", hashed_password=hashed_password, role=models.UserRole.PANDIT
+    )
+    db.add_all(users + [admin, pandit_user])
+    db.flush()
+    pandit = models.Pandit(user_id=pandit_user.id, city="Varanasi", state="Uttar Pradesh", approved=True)
+    pujas = [
+        models.PujaType(name_local=f"पूजा {i}", name_en=f"Listing Puja {i}", min_price=500, default_price=1100)
+        for i in range(4)
+    ]
+    db.add_all([pandit] + pujas)
+    db.flush()
+    for i, user in enumerate(users):
+        db.add(models.Booking(
+            user_id=user.id, pandit_id=pandit.id, puja_type_id=pujas[i % len(pujas)].id,
+            scheduled_at=datetime.utcnow() + timedelta(days=i + 1), price=1100,
+        ))
+    db.commit()
+    # Admin claims are checked against the cached user row; budgets below are for a warm cache
+    auth.user_cache.set(admin.phone, auth.AuthenticatedUser.from_model(admin))
+    data = {
+        "admin_token": auth.create_access_token({"sub": admin.phone}, user=admin),
+        "user_token": auth.create_access_token({"sub": users[0].phone}, user=users[0]),
+        "pandit_id": str(pandit.id),
+    }
+    db.close()
+    return data
+
+
+def auth_header(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_admin_bookings_query_budget(listing_data):
+    """Bookings, then one IN query each for puja types and users"""
+    with TestClient(app) as client, assert_max_queries(3):
+        response = client.get("/api/admin/bookings?limit=100", headers=auth_header(listing_data["admin_token"]))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) >= ROWS
+    assert all(booking["puja_type"] and booking["user"] for booking in response.json()["items"])
+
+
+def test_pandit_bookings_query_budget(listing_data):
+    """Pandit lookup plus the three booking list queries"""
+    pandit_id = listing_data["pandit_id"]
+    with TestClient(app) as client, assert_max_queries(4):
+        response = client.get(f"/api/pandits/{pandit_id}/bookings?limit=100", headers=auth_header(listing_data["admin_token"]))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == ROWS
+
+
+def test_my_bookings_query_budget(listing_data):
+    with TestClient(app) as client, assert_max_queries(3):
+        response = client.get("/api/bookings/my-bookings", headers=auth_header(listing_data["user_token"]))
+    assert response.status_code == 200
+    assert response.json()["items"][0]["user"]["phone"] == "918800000000"
+
+
+@pytest.mark.parametrize("path", ["/api/pandits", "/api/admin/pandits"])
+def test_pandit_list_query_budget(listing_data, path):
+    """Pandits and their users come back in a single joined query"""
+    with TestClient(app) as client, assert_max_queries(1):
+        response = client.get(path, headers=auth_header(listing_data["admin_token"]))
+    assert response.status_code == 200
+    assert all(pandit["user"] for pandit in response.json()["items"])
+
+
+def test_booking_transitions_are_single_guarded_updates(listing_data):
+    """A cancel is one UPDATE; a second one, or completing it afterwards, is refused with 409"""
+    db = SessionLocal()
+    user = db.query(models.User).filter(models.User.phone == "918800000000").one()
+    booking = models.Booking(
+        user_id=user.id, puja_type_id=db.query(models.PujaType).filter(models.PujaType.name_en == "Listing Puja 0").one().id,
+        scheduled_at=datetime.utcnow() + timedelta(days=40), price=1100,
+    )
+    db.add(booking)
+    db.commit()
+    booking_id, user_id = booking.id, user.id
+    db.close()
+
+    db = SessionLocal()
+    with count_queries() as counter:
+        cancelled = crud.cancel_booking(db, booking_id, user_id=user_id)
+    assert cancelled.status == models.BookingStatus.CANCELLED
+    db.close()
+    assert [statement.split()[0] for statement in counter.statements] == ["UPDATE"]
+
+    headers = auth_header(listing_data["user_token"])
+    admin_headers = auth_header(listing_data["admin_token"])
+    with TestClient(app) as client:
+        again = client.patch(f"/api/bookings/{booking_id}/cancel", headers=headers)
+        completed = client.patch(f"/api/bookings/{booking_id}", json={"status": "completed"}, headers=admin_headers)
+    assert again.status_code == completed.status_code == 409
+    assert again.json()["detail"] == "Cannot cancel a cancelled booking"
+
+
+def test_late_payment_does_not_confirm_a_cancelled_booking(listing_data, monkeypatch):
+    """Verify and the webhook confirm through the same guarded UPDATE, so a cancelled booking stays cancelled"""
+    monkeypatch.setattr(payments, "RAZORPAY_KEY_SECRET", "test-secret")
+    db = SessionLocal()
+    user = db.query(models.User).filter(models.User.phone == "918800000000").one()
+    booking = models.Booking(
+        user_id=user.id, puja_type_id=db.query(models.PujaType).filter(models.PujaType.name_en == "Listing Puja 0").one().id,
+        scheduled_at=datetime.utcnow() + timedelta(days=41), price=1100,
+    )
+    db.add(booking)
+    db.flush()
+    db.add(models.Payment(booking_id=booking.id, provider="razorpay", provider_payment_id="order_late", amount=1100))
+    db.commit()
+    booking_id, user_id = booking.id, user.id
+    crud.cancel_booking(db, booking_id, user_id=user_id)
+    db.close()
+
+    signature = hmac.new(b"test-secret", b"order_late|pay_late", hashlib.sha256).hexdigest()
+    with TestClient(app) as client:
+        verified = client.post("/api/payments/razorpay/verify", json={
+            "razorpay_order_id": "order_late", "razorpay_payment_id": "pay_late", "razorpay_signature": signature,
+        }, headers=auth_header(listing_data["user_token"]))
+        hooked = client.post("/api/payments/webhook", json={
+            "event": "payment.captured", "payload": {"payment": {"entity": {"id": "pay_late", "order_id": "order_late"}}},
+        })
+    assert verified.status_code == 409
+    assert verified.json()["detail"] == "Cannot confirm a cancelled booking"
+    assert hooked.status_code == 200
+
+    db = SessionLocal()
+    assert crud.get_booking_by_id(db, booking_id).status == models.BookingStatus.CANCELLED
+    db.close()
+
+
+def test_created_rows_are_not_selected_again():
+    """The create functions return the row as inserted, with no SELECT after the commit"""
+    db = SessionLocal()
+    with count_queries() as counter:
+        puja = crud.create_puja_type(db, schemas.PujaTypeCreate(
+            name_local="नई पूजा", name_en="Fresh Puja", min_price=101, default_price=251,
+        ))
+        session = crud.create_virtual_session(db, schemas.VirtualSessionCreate(
+            title="Fresh Aarti", stream_url="https://example.com/live", scheduled_at=datetime.utcnow(),
+            puja_type_id=puja.id,
+        ))
+    db.close()
+    assert "SELECT" not in [statement.split()[0] for statement in counter.statements]
+    # Still readable once the session is gone
+    assert puja.created_at is not None and session.is_active and session.puja_type_id == puja.id
@@ -0,0 +1,57 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+from app.recommendations import PriceIndex, PricedPuja, estimate_price
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def priced(min_price, max_price, default_price):
+    return PricedPuja(id=uuid4(), name_local="पूजा", min_price=min_price, max_price=max_price, default_price=default_price)
+
+
+def test_price_index_returns_ranges_overlapping_the_budget():
+    cheap, middle, costly = priced(500, 1500, 1100), priced(2000, 5000, 3100), priced(11000, 51000, 21000)
+    index = PriceIndex(pujas=[costly, cheap, middle], popularity={}, loaded_at=0)
+
+    assert index.within(1000, 2500) == [cheap, middle]
+    assert index.within(None, 1000) == [cheap]
+    assert index.within(6000, None) == [costly]
+    assert index.within(None, None) == [cheap, middle, costly]
+    assert estimate_price(middle, None, 2500) == 2500
+    assert estimate_price(cheap, 1200, None) == 1200
+
+
+def test_recommendations_rank_purpose_then_popularity():
+    db = SessionLocal()
+    admin = models.User(name="Reco Admin", phone="918500006666", hashed_password="x", role=models.UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        def create(name, benefits, price):
+            return client.post(
+                "/api/admin/pujas",
+                json={"name_local": name, "name_en": name, "benefits": benefits, "min_price": price, "default_price": price},
+                headers=headers,
+            ).json()["id"]
+
+        peace = create("Shanti Havan", "Brings lasting peace to the household", 90001)
+        wealth = create("Dhan Puja", "Attracts wealth", 90002)
+        create("Out Of Budget Puja", "Brings peace", 200000)
+
+        body = {"purpose": "peace at home", "budget_min": 90000, "budget_max": 100000}
+        first = client.post("/api/chatbot/recommend", json=body).json()
+        second = client.post("/api/chatbot/recommend", json=body).json()
+
+    assert first == second
+    assert [item["puja_type_id"] for item in first][:2] == [peace, wealth]
+    assert first[0]["reason"] == "Recommended for peace at home"
@@ -0,0 +1,38 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+
+
+def test_saturated_replica_pool_fails_over_to_the_primary(monkeypatch):
+    # A one-connection replica pool whose only connection is checked out
+    replica = create_engine(database.DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    async_replica = create_async_engine(database.ASYNC_DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    monkeypatch.setattr(database, "replica_router", database.ReplicaRouter(1))
+    monkeypatch.setattr(database, "ReplicaSessions", [sessionmaker(bind=replica)])
+    monkeypatch.setattr(database, "AsyncReplicaSessions", [async_sessionmaker(async_replica)])
+
+    held = replica.connect()
+    db = database.open_read_session()
+    assert db.get_bind() is database.engine
+    assert database.replica_router.order() == []
+    db.close()
+    held.close()
+    replica.dispose()
+
+    async def read_async():
+        database.replica_router._down_until[0] = 0.0
+        held = await async_replica.connect()
+        db = await database.open_async_read_session()
+        try:
+            return db.bind is database.async_engine, database.replica_router.order()
+        finally:
+            await db.close()
+            await held.close()
+            await async_replica.dispose()
+            await database.async_engine.dispose()
+
+    assert asyncio.run(read_async()) == (True, [])
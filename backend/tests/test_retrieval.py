@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+from app.retrieval import FaqEntry, TfidfMatrix, build_index, top_k
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_tfidf_scores_are_cosine_similarities():
+    matrix = TfidfMatrix([["peace", "home"], ["wealth", "wealth", "business"], []])
+    scores = matrix.scores(["peace", "home"])
+
+    assert abs(scores[0] - 1.0) < 1e-6
+    assert scores[1] == scores[2] == 0
+    assert [position for position, _ in top_k(matrix.scores(["wealth", "peace", "unknown"]), 5, 0.1)] == [1, 0]
+    assert [position for position, _ in top_k(matrix.scores(["wealth"]), 5, 0.1)] == [1]
+
+
+def test_index_answers_from_the_faq_and_matches_pujas_by_benefits():
+    faqs = [
+        FaqEntry(question="How do I cancel a booking?", answer="Cancel it under My Bookings.", tags="refund"),
+        FaqEntry(question="Which payment methods are accepted?", answer="UPI and cards.", tags="pay"),
+    ]
+    health = SimpleNamespace(
+        id=uuid4(), name_en="Mahamrityunjaya Jaap", name_local="महामृत्युंजय जाप",
+        description="Chanting for Lord Shiva", benefits="Good health and recovery from illness",
+    )
+    wealth = SimpleNamespace(id=uuid4(), name_en="Kuber Puja", name_local=None, description=None, benefits="Wealth")
+    index = build_index(faqs, [health, wealth])
+
+    faq, pujas = index.retrieve("Can I get a refund if I cancel?")
+    assert faq[0] is faqs[0]
+    assert pujas == []
+
+    faq, pujas = index.retrieve("something for health after an illness")
+    assert faq is None
+    assert [puja.id for puja, _ in pujas] == [str(health.id)]
+    assert pujas[0][0].name == "महामृत्युंजय जाप"
+
+
+def test_chatbot_suggests_pujas_added_after_the_matrix_was_built():
+    db = SessionLocal()
+    admin = models.User(name="Retrieval Admin", phone="918500005555", hashed_password="x", role=models.UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        puja_id = client.post(
+            "/api/admin/pujas",
+            json={
+                "name_local": "गृह प्रवेश पूजा", "name_en": "Griha Pravesh Puja", "min_price": 2100, "default_price": 5100,
+                "benefits": "Blesses a newly built house before the family moves in",
+            },
+            headers=headers,
+        ).json()["id"]
+        reply = client.post("/api/chatbot", json={"question": "We are moving into a newly built house"}).json()
+        faq_reply = client.post("/api/chatbot", json={"question": "Which payment methods do you accept?"}).json()
+
+    assert {"id": puja_id, "name": "गृह प्रवेश पूजा"} in reply["suggested_pujas"]
+    assert "Razorpay" in faq_reply["answer"]
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal, async_engine
+from app.main import app
+from app.migrations import upgrade_to_head
+from app.search import PujaSearchIndex, tokenize
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def make_puja(name_local, name_en, description=None, benefits=None):
+    return models.PujaType(
+        id=uuid4(), name_local=name_local, name_en=name_en, description=description, benefits=benefits,
+        min_price=500, default_price=1100, is_virtual=False, created_at=datetime.utcnow(),
+    )
+
+
+def test_tokenize_keeps_devanagari_words_whole():
+    assert tokenize("रुद्राभिषेक पूजा।") == ["रुद्राभिषेक", "पूजा"]
+    assert tokenize("शांति") == tokenize("शाँति")
+    assert tokenize("The Ganesh-Puja") == ["ganesh", "puja"]
+
+
+def test_prefix_search_ranks_name_matches_first():
+    index = PujaSearchIndex()
+    rudra = make_puja("रुद्राभिषेक", "Rudrabhishek", "Abhishek of Lord Shiva")
+    shanti = make_puja("नवग्रह शांति", "Navgraha Shanti", "Peace of the nine planets", "Removes rudra dosha")
+    index.rebuild([rudra, shanti])
+
+    assert [puja.id for puja, _ in index.search("rud")] == [rudra.id, shanti.id]
+    assert [puja.id for puja, _ in index.search("रुद्रा")] == [rudra.id]
+    assert [puja.id for puja, _ in index.search("nine pla")] == [shanti.id]
+
+    index.remove(rudra.id)
+    assert [puja.id for puja, _ in index.search("rud")] == [shanti.id]
+
+
+def test_admin_writes_update_the_search_index():
+    db = SessionLocal()
+    admin = models.User(name="Search Admin", phone="918500008888", hashed_password="x", role=models.UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        puja_id = client.post(
+            "/api/admin/pujas",
+            json={"name_local": "सुंदरकांड", "name_en": "Sundarkand Path", "min_price": 500, "default_price": 1100},
+            headers=headers,
+        ).json()["id"]
+        assert [puja["id"] for puja in client.get("/api/pujas/search?q=sundark").json()] == [puja_id]
+
+        client.patch(f"/api/admin/pujas/{puja_id}", json={"name_en": "Hanuman Path"}, headers=headers)
+        assert client.get("/api/pujas/search?q=sundark").json() == []
+        assert client.get("/api/pujas/search?q=सुंदर").json()[0]["name_en"] == "Hanuman Path"
+
+
+def test_reload_picks_up_other_workers_writes_but_not_over_a_local_one():
+    db = SessionLocal()
+    puja = models.PujaType(name_local="गोवर्धन पूजा", name_en="Govardhan Puja", min_price=500, default_price=1100)
+    db.add(puja)
+    db.commit()
+    index = PujaSearchIndex()
+
+    async def reload():
+        await index.load()
+        # Its connections belong to this loop, which closes after the reload
+        await async_engine.dispose()
+
+    # Written by another worker: only a reload from the database sees it
+    asyncio.run(reload())
+    assert [found.id for found, _ in index.search("govardh")] == [puja.id]
+
+    writes = index._writes
+    local = make_puja("अन्नकूट", "Annakut Utsav")
+    index.upsert(local)
+    # A rebuild from rows read before that write is skipped, not applied over it
+    index.rebuild([puja], writes)
+    assert [found.id for found, _ in index.search("annak")] == [local.id]
+    db.close()
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import upgrade_to_head
+from app.phonetic import NameIndex, phonetic_key
+
+# Create tables for testing
+upgrade_to_head()
+
+
+def test_spellings_share_a_phonetic_key():
+    assert phonetic_key("rudrabhishek") == phonetic_key("rudra abhishek") == phonetic_key("रुद्राभिषेक")
+    assert phonetic_key("Navgraha Shanti") == phonetic_key("नवग्रह शांति")
+    assert phonetic_key("Pandit Ramesh Sharma") == phonetic_key("पंडित रमेश शर्मा")
+
+
+def test_suggest_matches_partial_input_in_either_script():
+    index = NameIndex()
+    rudra = SimpleNamespace(id=uuid4(), name_en="Rudrabhishek", name_local="रुद्राभिषेक")
+    durga = SimpleNamespace(id=uuid4(), name_en="Durga Puja", name_local="दुर्गा पूजा")
+    pandit = SimpleNamespace(id=uuid4(), user=SimpleNamespace(name="Pandit Rudra Dev Sharma"))
+    index.add_puja(rudra)
+    index.add_puja(durga)
+    index.add_pandit(pandit)
+
+    assert index.suggest("rudrabh")[0][0].id == str(rudra.id)
+    assert index.suggest("रुद्रा", kind="puja")[0][0].id == str(rudra.id)
+    assert index.suggest("doorga pooja")[0][0].id == str(durga.id)
+    assert [entry.id for entry, _ in index.suggest("rudra dev", kind="pandit")] == [str(pandit.id)]
+    assert [entry.name for entry in index.mentions("Tell me about rudra abhishek", kind="puja")] == ["Rudrabhishek"]
+
+    index.remove("puja", rudra.id)
+    assert all(entry.id != str(rudra.id) for entry, _ in index.suggest("rudrabh"))
+
+
+def test_suggest_endpoint_follows_admin_writes():
+    db = SessionLocal()
+    admin = models.User(name="Suggest Admin", phone="918500007777", hashed_password="x", role=models.UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.phone}, user=admin)}"}
+    db.close()
+
+    with TestClient(app) as client:
+        puja_id = client.post(
+            "/api/admin/pujas",
+            json={"name_local": "महामृत्युंजय जाप", "name_en": "Mahamrityunjaya Jaap", "min_price": 500, "default_price": 2100},
+            headers=headers,
+        ).json()["id"]
+        suggestions = client.get("/api/suggest", params={"q": "maha mrityunjay", "kind": "puja"}).json()
+        reply = client.post("/api/chatbot", json={"question": "What does mahamrityunjay jap cost?"}).json()
+
+    assert suggestions[0]["id"] == puja_id
+    assert suggestions[0]["name_local"] == "महामृत्युंजय जाप"
+    assert reply["suggested_pujas"][0] == {"id": puja_id, "name": "महामृत्युंजय जाप"}
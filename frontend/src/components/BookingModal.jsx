@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion'
 import { X, Calendar, MapPin, User, Video } from 'lucide-react'
 import axios from 'axios'
 import { useAuth } from '../context/AuthContext'
+import { fetchAllPages } from '../utils'
 
 const BookingModal = ({ puja, isOpen, onClose }) => {
   const { token, user } = useAuth()
@@ -22,8 +23,8 @@ const BookingModal = ({ puja, isOpen, onClose }) => {
   useEffect(() => {
     if (isOpen) {
       // Fetch available pandits
-      axios.get('/api/pandits').then(res => {
-        setPandits(res.data)
+      fetchAllPages('/api/pandits').then(items => {
+        setPandits(items)
         // Don't auto-select, let user choose
       }).catch(err => {
         console.error('Error fetching pandits:', err)
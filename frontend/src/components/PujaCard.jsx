@@ -1,4 +1,5 @@
 import { useState } from 'react'
+import axios from 'axios'
 import { motion, AnimatePresence } from 'framer-motion'
 import { X, Clock, Sparkles } from 'lucide-react'
 import { useAuth } from '../context/AuthContext'
@@ -8,9 +9,20 @@ import BookingModal from './BookingModal'
 const PujaCard = ({ puja }) => {
   const [showDetails, setShowDetails] = useState(false)
   const [showBooking, setShowBooking] = useState(false)
+  const [details, setDetails] = useState(null)
   const { user } = useAuth()
   const navigate = useNavigate()
 
+  // The catalog listing only carries summaries; fetch the full text on demand
+  const openDetails = () => {
+    setShowDetails(true)
+    if (!details) {
+      axios.get(`/api/pujas/${puja.id}`)
+        .then(res => setDetails(res.data))
+        .catch(err => console.error('Error fetching puja details:', err))
+    }
+  }
+
   const handleBookClick = () => {
     if (!user) {
       navigate('/login')
@@ -60,7 +72,7 @@ const PujaCard = ({ puja }) => {
 
           <div className="mt-4 flex gap-2">
             <button
-              onClick={() => setShowDetails(true)}
+              onClick={openDetails}
               className="flex-1 bg-primary-500 text-white py-2 rounded-lg hover:bg-primary-600 transition font-semibold shadow-md"
             >
               Read More
@@ -127,15 +139,15 @@ const PujaCard = ({ puja }) => {
                     <Sparkles className="w-6 h-6 mr-2 text-primary-500" />
                     About This Puja
                   </h3>
-                  <p className="text-gray-700 leading-relaxed whitespace-pre-line">{puja.description || puja.detailed_description}</p>
+                  <p className="text-gray-700 leading-relaxed whitespace-pre-line">{details?.detailed_description || puja.description}</p>
                 </div>
 
                 {/* Benefits */}
-                {puja.benefits && (
+                {details?.benefits && (
                   <div className="mb-6">
                     <h3 className="text-2xl font-bold text-gray-800 mb-3">Benefits</h3>
                     <div className="bg-primary-50 p-6 rounded-xl">
-                      <p className="text-gray-700 whitespace-pre-line">{puja.benefits}</p>
+                      <p className="text-gray-700 whitespace-pre-line">{details.benefits}</p>
                     </div>
                   </div>
                 )}
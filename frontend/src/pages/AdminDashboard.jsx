@@ -4,6 +4,7 @@ import { useNavigate } from 'react-router-dom'
 import axios from 'axios'
 import { Users, BookOpen, DollarSign, UserCheck, Check, X, TrendingUp } from 'lucide-react'
 import Navbar from '../components/Navbar'
+import { fetchAllPages } from '../utils'
 
 const AdminDashboard = () => {
   const { user, logout } = useAuth()
@@ -22,12 +23,12 @@ const AdminDashboard = () => {
 
   const fetchData = async () => {
     try {
-      const [statsRes, panditsRes] = await Promise.all([
+      const [statsRes, allPandits] = await Promise.all([
         axios.get('/api/admin/stats'),
-        axios.get('/api/admin/pandits')
+        fetchAllPages('/api/admin/pandits')
       ])
       setStats(statsRes.data)
-      setPandits(panditsRes.data)
+      setPandits(allPandits)
     } catch (error) {
       console.error('Error:', error)
     } finally {
@@ -4,6 +4,7 @@ import { useNavigate } from 'react-router-dom'
 import axios from 'axios'
 import { Calendar, MapPin, Clock, Package, TrendingUp, Home } from 'lucide-react'
 import Navbar from '../components/Navbar'
+import { fetchAllPages } from '../utils'
 
 const Dashboard = () => {
   const { user, logout } = useAuth()
@@ -22,11 +23,11 @@ const Dashboard = () => {
 
   const fetchData = async () => {
     try {
-      const [bookingsRes, pujasRes] = await Promise.all([
-        axios.get('/api/bookings/my-bookings'),
+      const [myBookings, pujasRes] = await Promise.all([
+        fetchAllPages('/api/bookings/my-bookings'),
         axios.get('/api/pujas')
       ])
-      setBookings(bookingsRes.data)
+      setBookings(myBookings)
       setPujas(pujasRes.data)
     } catch (error) {
       console.error('Error fetching data:', error)
@@ -3,6 +3,7 @@ import { useAuth } from '../context/AuthContext'
 import { useNavigate } from 'react-router-dom'
 import axios from 'axios'
 import Navbar from '../components/Navbar'
+import { fetchAllPages } from '../utils'
 import { Calendar, Users, DollarSign, Check, X, Clock, MapPin, Video, Phone, Mail, User as UserIcon, TrendingUp } from 'lucide-react'
 
 const PanditDashboard = () => {
@@ -23,10 +24,10 @@ const PanditDashboard = () => {
   const fetchData = async () => {
     try {
       // Get pandit profile
-      const profileRes = await axios.get('/api/pandits', {
+      const pandits = await fetchAllPages('/api/pandits', {
         headers: { Authorization: `Bearer ${token}` }
       })
-      const panditProfile = profileRes.data.find(p => p.user.id === user.id)
+      const panditProfile = pandits.find(p => p.user.id === user.id)
       
       if (!panditProfile) {
         console.error('Pandit profile not found')
@@ -35,16 +36,16 @@ const PanditDashboard = () => {
       }
 
       // Fetch pandit's bookings
-      const bookingsRes = await axios.get(`/api/pandits/${panditProfile.id}/bookings`, {
+      const panditBookings = await fetchAllPages(`/api/pandits/${panditProfile.id}/bookings`, {
         headers: { Authorization: `Bearer ${token}` }
       })
-      setBookings(bookingsRes.data)
+      setBookings(panditBookings)
 
       // Calculate stats
-      const pending = bookingsRes.data.filter(b => b.status === 'pending').length
-      const confirmed = bookingsRes.data.filter(b => b.status === 'confirmed').length
-      const completed = bookingsRes.data.filter(b => b.status === 'completed').length
-      const total_earnings = bookingsRes.data
+      const pending = panditBookings.filter(b => b.status === 'pending').length
+      const confirmed = panditBookings.filter(b => b.status === 'confirmed').length
+      const completed = panditBookings.filter(b => b.status === 'completed').length
+      const total_earnings = panditBookings
         .filter(b => b.status === 'completed')
         .reduce((sum, b) => sum + b.price, 0)
 
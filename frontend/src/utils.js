@@ -1,5 +1,6 @@
 import { clsx } from 'clsx';
 import { twMerge } from 'tailwind-merge';
+import axios from 'axios';
 
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
@@ -58,3 +59,16 @@ export const debounce = (func, wait) => {
     timeout = setTimeout(later, wait);
   };
 };
+
+// List endpoints return { items, next_cursor }; follow the cursor until the last page
+export const fetchAllPages = async (url, config = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = { ...config.params, limit: 100, ...(cursor ? { cursor } : {}) };
+    const res = await axios.get(url, { ...config, params });
+    items.push(...res.data.items);
+    cursor = res.data.next_cursor;
+  } while (cursor);
+  return items;
+};